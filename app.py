@@ -1,24 +1,62 @@
+import time
+import threading
 import streamlit as st
 from dotenv import load_dotenv
 from src.pages.state import init_session_state
 from src.pages.navigation import render_sidebar_navigation
-from src.pages.quiz_page import render_quiz_page
-from src.pages.chat_page import render_chat_page
+from src.config.settings import settings
+from src.common.metrics import registry, start_exporters
+from src.common.logger import bind_log_context
 
 load_dotenv()
 
+PAGE_RENDER_SECONDS = registry.histogram(
+    "study_buddy_page_render_seconds",
+    "Script run time of each page render.",
+    ("page",),
+)
+
+
+@st.cache_resource
+def warm_up():
+    # runs once per process, in the background so the first render is not
+    # held up by the provider SDK imports
+    if not settings.WARM_UP_CLIENTS:
+        return None
+
+    from src.llms.llm_client import warm_up_clients
+
+    thread = threading.Thread(target=warm_up_clients, name="warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+@st.cache_resource
+def metrics_exporters():
+    return start_exporters()
+
 
 def main():
     st.set_page_config(page_title="Study Buddy AI", page_icon="🎧🎧")
     st.title("Study Buddy AI")
 
+    warm_up()
+    metrics_exporters()
     init_session_state()
+    bind_log_context(session_id=st.session_state.session_id)
     render_sidebar_navigation()
 
-    if st.session_state.page == "quiz":
+    page = st.session_state.page
+    start = time.perf_counter()
+    if page == "quiz":
+        from src.pages.quiz_page import render_quiz_page
+
         render_quiz_page()
     else:
+        from src.pages.chat_page import render_chat_page
+
         render_chat_page()
+    PAGE_RENDER_SECONDS.observe(time.perf_counter() - start, page)
 
     if st.session_state.get("rerun_trigger"):
         st.session_state["rerun_trigger"] = False
@@ -0,0 +1,115 @@
+"""
+Grading many submissions of one quiz: the vectorized bulk grader against
+grading each submission with grade_quiz. Both are checked to agree.
+
+Run from the repository root:
+    python -m benchmarks.bench_bulk_grading
+"""
+
+import random
+import time
+
+import pandas as pd
+
+from src.grading.bulk import grade_submissions
+from src.grading.grader import grade_quiz
+
+NUM_QUESTIONS = 20
+SUBMISSION_COUNTS = [1000, 10000, 100000]
+OPTIONS = ["alpha", "beta", "gamma", "delta"]
+
+
+def make_quiz():
+    kinds = ["MCQ", "Multiple Answer", "Fill in the Blank"]
+    questions = []
+    for i in range(NUM_QUESTIONS):
+        kind = kinds[i % 3]
+        if kind == "MCQ":
+            questions.append(
+                {"type": kind, "question": f"Q{i}", "options": OPTIONS, "correct_answer": "beta"}
+            )
+        elif kind == "Multiple Answer":
+            questions.append(
+                {
+                    "type": kind,
+                    "question": f"Q{i}",
+                    "options": OPTIONS,
+                    "correct_answer": ["alpha", "gamma"],
+                }
+            )
+        else:
+            questions.append(
+                {"type": kind, "question": f"Q{i} ____", "correct_answer": "Mitochondria"}
+            )
+    return questions
+
+
+def random_answer(rng, question):
+    if rng.random() < 0.05:
+        return None
+    if question["type"] == "MCQ":
+        return rng.choice(OPTIONS)
+    if question["type"] == "Multiple Answer":
+        return rng.sample(OPTIONS, rng.randint(1, 3))
+    return rng.choice(["mitochondria", " Mitochondria ", "MITOCHONDRIA", "ribosome", ""])
+
+
+def make_submissions(questions, count, seed=0):
+    rng = random.Random(seed)
+    rows = [[random_answer(rng, q) for q in questions] for _ in range(count)]
+    columns = {"student_id": [f"student-{i}" for i in range(count)]}
+    for i in range(len(questions)):
+        columns[f"q{i + 1}"] = [row[i] for row in rows]
+    return rows, columns
+
+
+def grade_in_loop(questions, rows):
+    """Per-student scores and per-question correct counts from grade_quiz."""
+    scores = []
+    question_correct = [0] * len(questions)
+    for row in rows:
+        results, summary = grade_quiz(questions, row)
+        scores.append(summary["correct"])
+        for i, result in enumerate(results):
+            question_correct[i] += result["is_correct"]
+    return scores, question_correct
+
+
+def main():
+    questions = make_quiz()
+    print(
+        f"{'submissions':>12} {'loop (s)':>10} {'bulk (s)':>10} {'speedup':>8} "
+        f"{'frame (s)':>10}"
+    )
+    for count in SUBMISSION_COUNTS:
+        rows, columns = make_submissions(questions, count)
+
+        start = time.perf_counter()
+        scores, question_correct = grade_in_loop(questions, rows)
+        loop_seconds = time.perf_counter() - start
+
+        # building the DataFrame is reported separately, callers may already have one
+        start = time.perf_counter()
+        frame = pd.DataFrame(columns)
+        frame_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        per_question, per_student = grade_submissions(questions, frame)
+        bulk_seconds = time.perf_counter() - start
+
+        if (
+            per_student["correct"].tolist() != scores
+            or per_question["correct"].tolist() != question_correct
+        ):
+            raise SystemExit(f"bulk and per-submission grading disagree at {count}")
+        print(
+            f"{count:>12} {loop_seconds:>10.3f} {bulk_seconds:>10.3f} "
+            f"{loop_seconds / bulk_seconds:>7.1f}x {frame_seconds:>10.3f}"
+        )
+
+    print()
+    print(per_question.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
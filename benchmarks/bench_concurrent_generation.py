@@ -0,0 +1,64 @@
+"""
+Wall time of QuizManager.generate_questions against a fake LLM with fixed latency.
+
+Run from the repository root:
+    python -m benchmarks.bench_concurrent_generation
+"""
+
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import src.generator.question_generator as question_generator
+from src.config.settings import settings
+from src.utils.helper_functions import QuizManager
+
+LATENCY = 0.2
+NUM_QUESTIONS = 10
+CONCURRENCY_LEVELS = [1, 2, 4, 8]
+
+MCQ_RESPONSE = json.dumps(
+    {
+        "question": "What is the capital of France?",
+        "options": ["London", "Berlin", "Paris", "Madrid"],
+        "correct_answer": "Paris",
+    }
+)
+
+
+class FakeLLM:
+
+    def invoke(self, prompt, **kwargs):
+        time.sleep(LATENCY)
+        return SimpleNamespace(content=MCQ_RESPONSE)
+
+    async def ainvoke(self, prompt, **kwargs):
+        await asyncio.sleep(LATENCY)
+        return SimpleNamespace(content=MCQ_RESPONSE)
+
+
+def main():
+    question_generator.get_llm = lambda model, **kwargs: FakeLLM()
+    # the fake model always returns the same question
+    settings.DEDUP_ENABLED = False
+    generator = question_generator.QuestionGenerator("fake-model")
+    manager = QuizManager()
+
+    print(f"{'concurrency':>12} {'questions':>10} {'wall time (s)':>14}")
+    for concurrency in CONCURRENCY_LEVELS:
+        settings.GENERATION_CONCURRENCY = concurrency
+        start = time.perf_counter()
+        manager.generate_questions(
+            generator=generator,
+            topic="Geography",
+            question_type="Single Choice",
+            difficulty="Medium",
+            num_questions=NUM_QUESTIONS,
+        )
+        elapsed = time.perf_counter() - start
+        print(f"{concurrency:>12} {len(manager.questions):>10} {elapsed:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Cold-start import cost of the app, measured with `python -X importtime` in a
+fresh interpreter. Exits non-zero when a module goes over its budget or when
+a heavy dependency is loaded before it is needed.
+
+Run from the repository root:
+    python -m benchmarks.bench_import_time
+"""
+
+import subprocess
+import sys
+
+# cumulative import time per module, in milliseconds
+IMPORT_BUDGET_MS = {
+    "app": 1500,
+    "src.pages.quiz_page": 1500,
+    "src.pages.chat_page": 1500,
+}
+DEFERRED_MODULES = ["pandas", "langchain_core", "langchain_groq", "langchain_openai"]
+TOP_OFFENDERS = 10
+RUNS = 3
+
+
+def measure(module: str):
+    code = (
+        f"import sys, {module}\n"
+        f"print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative_us, name = line.split("|")
+        try:
+            cumulative[name.strip()] = int(cumulative_us)
+        except ValueError:
+            continue  # header line
+
+    loaded = [m for m in result.stdout.strip().split(",") if m]
+    return cumulative, loaded
+
+
+def main():
+    failed = False
+
+    for module, budget_ms in IMPORT_BUDGET_MS.items():
+        runs = [measure(module) for _ in range(RUNS)]
+        cumulative, loaded = min(runs, key=lambda run: run[0].get(module, 0))
+        total_ms = cumulative.get(module, 0) / 1000
+
+        status = "ok" if total_ms <= budget_ms else "OVER BUDGET"
+        print(f"{module}: {total_ms:.0f} ms (budget {budget_ms} ms) {status}")
+
+        offenders = sorted(
+            (item for item in cumulative.items() if item[0] != module),
+            key=lambda item: item[1],
+            reverse=True,
+        )[:TOP_OFFENDERS]
+        for name, us in offenders:
+            print(f"    {us / 1000:8.1f} ms  {name}")
+
+        if loaded:
+            print(f"    loaded at import: {', '.join(loaded)}")
+
+        failed = failed or total_ms > budget_ms or bool(loaded)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
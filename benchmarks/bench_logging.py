@@ -0,0 +1,134 @@
+"""
+Cost of a log call on the calling thread: the previous synchronous
+FileHandler against the queue handler that writes from a background thread.
+The slow-disk rows add a 0.2 ms stall to every file write, as a loaded or
+network disk would.
+
+Run from the repository root:
+    python -m benchmarks.bench_logging
+"""
+
+import logging
+import os
+import queue
+import tempfile
+import time
+from logging.handlers import QueueListener
+
+from src.common.logger import (
+    TEXT_FORMAT,
+    JSONFormatter,
+    SizeAndTimeRotatingFileHandler,
+    _ContextFilter,
+    _NonBlockingQueueHandler,
+    bind_log_context,
+)
+
+CALLS = 20000
+WRITE_STALL_SECONDS = 0.0002
+TOPIC, DIFFICULTY, MODEL = "Photosynthesis", "Medium", "llama-3.1-8b-instant"
+
+
+class SlowStream:
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, text):
+        time.sleep(WRITE_STALL_SECONDS)
+        return self.stream.write(text)
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+def isolated_logger(name, handler):
+    logger = logging.getLogger(name)
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+def sync_handler(path, slow=False):
+    handler = logging.FileHandler(path)
+    handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    if slow:
+        handler.stream = SlowStream(handler.stream)
+    return handler
+
+
+def queued_pipeline(path, slow=False):
+    log_queue = queue.SimpleQueue()
+    handler = _NonBlockingQueueHandler(log_queue, CALLS * 2)
+    handler.addFilter(_ContextFilter())
+    rotating = SizeAndTimeRotatingFileHandler(
+        path, max_bytes=2 * 1024 * 1024, when="midnight", backupCount=3
+    )
+    rotating.setFormatter(JSONFormatter())
+    if slow:
+        rotating.stream = SlowStream(rotating.stream)
+    return handler, QueueListener(log_queue, rotating), rotating
+
+
+def per_call_us(log, calls=CALLS):
+    start = time.perf_counter()
+    for _ in range(calls):
+        log()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def sync_call(logger):
+    return lambda: logger.info(
+        f"Generating question for topic {TOPIC} with difficulty {DIFFICULTY}"
+    )
+
+
+def queued_call(logger, level=logging.INFO):
+    return lambda: logger.log(
+        level,
+        "Generating question for topic %s with difficulty %s",
+        TOPIC,
+        DIFFICULTY,
+        extra={"model": MODEL, "latency": 0.42},
+    )
+
+
+def main():
+    bind_log_context(session_id="bench-session")
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        for slow in (False, True):
+            disk = "slow disk" if slow else "fast disk"
+
+            handler = sync_handler(os.path.join(directory, f"sync-{slow}.log"), slow)
+            logger = isolated_logger(f"bench.sync.{slow}", handler)
+            rows.append((f"sync FileHandler, {disk}", per_call_us(sync_call(logger))))
+            handler.close()
+
+            handler, listener, rotating = queued_pipeline(
+                os.path.join(directory, f"queued-{slow}.log"), slow
+            )
+            logger = isolated_logger(f"bench.queued.{slow}", handler)
+            listener.start()
+            rows.append((f"queue + JSON, {disk}", per_call_us(queued_call(logger))))
+            start = time.perf_counter()
+            listener.stop()
+            drain = (time.perf_counter() - start) * 1e6 / CALLS
+            rows.append(("  listener drain after the calls", drain))
+            rotating.close()
+
+        debug = per_call_us(queued_call(logger, logging.DEBUG))
+        rows.append(("queue, below level (debug)", debug))
+        rotated = sorted(
+            name for name in os.listdir(directory) if name.startswith("queued-False")
+        )
+
+    for label, micros in rows:
+        print(f"{label:<34} {micros:8.2f} us/call")
+    print(f"rotated files: {', '.join(rotated)}")
+    print(f"dropped records: {_NonBlockingQueueHandler.dropped}")
+
+
+if __name__ == "__main__":
+    main()
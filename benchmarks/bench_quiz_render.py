@@ -0,0 +1,122 @@
+"""
+Script-run time of the quiz page per interaction, measured headlessly with
+streamlit's AppTest. A quiz of synthetic questions is put in session state so
+no model is called.
+
+AppTest always reruns the whole script, so the page numbers are the cost of a
+full rerun. In a live session an interaction inside a question only reruns
+that question's fragment; "question fragment" approximates that cost by
+running a script that renders a single question.
+
+Run from the repository root:
+    python -m benchmarks.bench_quiz_render
+"""
+
+import statistics
+import time
+
+from streamlit.testing.v1 import AppTest
+
+from src.config.settings import settings
+from src.utils.helper_functions import QuizManager
+
+NUM_QUESTIONS = 10
+PAGE_SIZES = [0, 5]
+RUNS = 3
+
+
+def make_manager():
+    manager = QuizManager()
+    manager.questions = [
+        {
+            "type": "MCQ",
+            "question": f"Which option is correct for question {i + 1}?",
+            "options": ["A", "B", "C", "D"],
+            "correct_answer": "A",
+        }
+        for i in range(NUM_QUESTIONS)
+    ]
+    return manager
+
+
+def timed(timings, label, run):
+    start = time.perf_counter()
+    run()
+    timings.setdefault(label, []).append(time.perf_counter() - start)
+
+
+def go_to_page(app, index, page_size):
+    # pagination only shows the current page of questions
+    if page_size and app.session_state["quiz_page_index"] != index // page_size:
+        app.session_state["quiz_page_index"] = index // page_size
+        app.run()
+
+
+def run_session(timings, page_size):
+    settings.QUIZ_PAGE_SIZE = page_size
+    app = AppTest.from_file("../app.py", default_timeout=30)
+    app.session_state["quiz_manager"] = make_manager()
+    app.session_state["quiz_generated"] = True
+
+    timed(timings, "initial render", app.run)
+
+    for i in range(NUM_QUESTIONS):
+        go_to_page(app, i, page_size)
+        timed(
+            timings,
+            "select answer",
+            app.radio(key=f"mcq_{i + 1}").set_value("A" if i % 2 else "B").run,
+        )
+        timed(timings, "submit answer", app.button(key=f"submit_{i + 1}").click().run)
+
+    submit = next(b for b in app.button if b.label == "Submit Quiz")
+    timed(timings, "submit quiz", submit.click().run)
+    timed(timings, "results rerun", app.run)
+
+    assert not app.exception, app.exception
+
+
+def render_one_question():
+    import streamlit as st
+
+    st.session_state.quiz_manager._render_question(0)
+
+
+def run_fragment(timings):
+    app = AppTest.from_function(render_one_question, default_timeout=30)
+    app.session_state["quiz_manager"] = make_manager()
+    app.session_state["user_answers"] = [None] * NUM_QUESTIONS
+    app.session_state["submitted"] = [False] * NUM_QUESTIONS
+    app.run()
+
+    timed(timings, "select answer", app.radio(key="mcq_1").set_value("A").run)
+    timed(timings, "submit answer", app.button(key="submit_1").click().run)
+
+    assert not app.exception, app.exception
+
+
+def main():
+    print(f"{'page size':>10} {'interaction':>16} {'mean (ms)':>10} {'max (ms)':>10}")
+    for page_size in PAGE_SIZES:
+        timings = {}
+        for _ in range(RUNS):
+            run_session(timings, page_size)
+
+        for label, samples in timings.items():
+            print(
+                f"{page_size or 'all':>10} {label:>16} "
+                f"{statistics.mean(samples) * 1000:>10.1f} {max(samples) * 1000:>10.1f}"
+            )
+
+    timings = {}
+    for _ in range(RUNS):
+        run_fragment(timings)
+    for label, samples in timings.items():
+        print(
+            f"{'fragment':>10} {label:>16} "
+            f"{statistics.mean(samples) * 1000:>10.1f} {max(samples) * 1000:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
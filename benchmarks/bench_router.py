@@ -0,0 +1,89 @@
+"""
+Quiz questions generated through each fixed model against the Auto router,
+with fake models that differ in latency, JSON quality and availability.
+Time per question includes the retries a failed parse or call costs.
+
+Run from the repository root:
+    python -m benchmarks.bench_router
+"""
+
+import asyncio
+import time
+
+from src.config.settings import settings
+
+settings.FAKE_LLM = True
+settings.RATE_LIMIT_ENABLED = False
+settings.HEDGING_ENABLED = False
+settings.CACHE_ENABLED = False
+
+from src.llms import llm_client  # noqa: E402
+from src.llms.fake_llm import FakeChatModel  # noqa: E402
+from src.llms.router import get_model_router  # noqa: E402
+from src.generator.question_generator import QuestionGenerator  # noqa: E402
+
+QUESTIONS = 300
+CONCURRENCY = 8
+
+# model: (median latency, malformed JSON rate, failure rate)
+PROFILES = {
+    "llama-3.1-8b-instant": (0.10, 0.45, 0.0),
+    "llama-3.3-70b-versatile": (0.25, 0.02, 0.0),
+    "openai/gpt-oss-120b": (0.60, 0.01, 0.0),
+    "meta-llama/llama-4-scout-17b-16e-instruct": (0.15, 0.0, 0.95),
+}
+
+
+def install_fake_models():
+    for model, (latency, malformed, failures) in PROFILES.items():
+        key = (llm_client.get_provider(model), model, settings.TEMPERATURE)
+        llm_client._clients[key] = FakeChatModel(
+            model,
+            latency=latency,
+            latency_spread=0.3,
+            malformed_rate=malformed,
+            failure_rate=failures,
+        )
+
+
+async def generate(generator):
+    slots = asyncio.Semaphore(CONCURRENCY)
+    failed = 0
+
+    async def one(i):
+        nonlocal failed
+        async with slots:
+            try:
+                await generator.agenerate_mcq(f"topic {i}", "Medium")
+            except Exception:
+                failed += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(QUESTIONS)))
+    return time.perf_counter() - start, failed
+
+
+def main():
+    settings.ROUTER_MODELS = list(PROFILES)
+    install_fake_models()
+
+    print(f"{'model':<44} {'wall (s)':>9} {'q/s':>7} {'failed':>7}")
+    for model in [*PROFILES, settings.AUTO_MODEL]:
+        elapsed, failed = asyncio.run(generate(QuestionGenerator(model)))
+        print(
+            f"{model:<44} {elapsed:>9.2f} {(QUESTIONS - failed) / elapsed:>7.1f} "
+            f"{failed:>7}"
+        )
+
+    print()
+    for model, stats in get_model_router().stats()["quiz"].items():
+        p90 = stats["latency_p90"]
+        print(
+            f"{model:<44} samples {stats['samples']:>4}  "
+            f"success {stats['success_rate']:.2f}  "
+            f"p90 {'n/a' if p90 is None else f'{p90:.2f}s'}  {stats['circuit']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
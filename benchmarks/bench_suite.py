@@ -0,0 +1,298 @@
+"""
+Offline benchmark suite. Every model call goes to the deterministic fake chat
+model (FAKE_LLM), so it runs without provider keys and results are
+comparable between runs. Results are written as JSON.
+
+Run from the repository root:
+    python -m benchmarks.bench_suite --output bench_results.json
+    python -m benchmarks.bench_suite --failure-rate 0.1 --malformed-rate 0.2
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from src.config.settings import settings
+
+MODEL = "llama-3.1-8b-instant"
+QUESTION_TYPES = ["Single Choice", "Multiple Choice", "Fill in the Blank"]
+QUIZ_SIZES = [1, 5, 10]
+CHAT_HISTORY_TURNS = [0, 10, 50, 200]
+RESULT_SIZES = [10, 100, 1000]
+
+
+def summarize(samples, errors=0):
+    ordered = sorted(samples)
+    return {
+        "runs": len(samples),
+        "errors": errors,
+        "mean_s": statistics.mean(samples),
+        "p50_s": ordered[len(ordered) // 2],
+        "p95_s": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "min_s": ordered[0],
+        "max_s": ordered[-1],
+    }
+
+
+def measure(runs, setup, run):
+    samples = []
+    errors = 0
+    for _ in range(runs):
+        state = setup()
+        start = time.perf_counter()
+        try:
+            run(state)
+        except Exception:
+            # injected failures that are not retried, such as a failed chat turn
+            errors += 1
+        samples.append(time.perf_counter() - start)
+    return summarize(samples, errors)
+
+
+@contextmanager
+def working_directory(path):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def make_results(count):
+    kinds = ["MCQ", "Multiple Answer", "Fill in the Blank"]
+    questions, answers = [], []
+    for i in range(count):
+        kind = kinds[i % 3]
+        if kind == "Fill in the Blank":
+            questions.append(
+                {
+                    "type": kind,
+                    "question": f"Question {i} ____",
+                    "correct_answer": "answer",
+                }
+            )
+            answers.append("answer" if i % 2 else "wrong")
+        else:
+            options = ["a", "b", "c", "d"]
+            correct = "a" if kind == "MCQ" else ["a", "b"]
+            questions.append(
+                {
+                    "type": kind,
+                    "question": f"Question {i}",
+                    "options": options,
+                    "correct_answer": correct,
+                }
+            )
+            answers.append(correct if i % 2 else ("c" if kind == "MCQ" else ["c"]))
+    return questions, answers
+
+
+def bench_quiz_generation(runs):
+    from src.generator.question_generator import QuestionGenerator
+    from src.generator.generation_stats import generation_stats
+    from src.utils.helper_functions import QuizManager
+
+    results = []
+    for question_type in QUESTION_TYPES:
+        for size in QUIZ_SIZES:
+            generation_stats.reset()
+            delivered = []
+
+            def run(manager):
+                manager.generate_questions(
+                    generator=QuestionGenerator(MODEL),
+                    topic="Photosynthesis and cellular respiration",
+                    question_type=question_type,
+                    difficulty="Medium",
+                    num_questions=size,
+                )
+                delivered.append(len(manager.questions))
+
+            stats = measure(runs, QuizManager, run)
+            report = generation_stats.report().get(MODEL, {})
+            results.append(
+                {
+                    "name": "quiz_generation",
+                    "params": {"question_type": question_type, "questions": size},
+                    **stats,
+                    "questions_delivered": statistics.mean(delivered),
+                    "parse_failure_rate": report.get("parse_failure_rate", 0.0),
+                    "retry_rate": report.get("retry_rate", 0.0),
+                }
+            )
+    return results
+
+
+def bench_chat_turns(runs):
+    from src.chat.chat_engine import ChatEngine
+    from src.chat.context_window import ChatContextWindow
+    from src.storage.chat_store import system_message
+
+    results = []
+    for turns in CHAT_HISTORY_TURNS:
+        engine = ChatEngine(MODEL)
+
+        def setup():
+            messages = [system_message("study")]
+            for i in range(turns):
+                messages.append(
+                    {"role": "user", "content": f"Question {i} about enzymes?"}
+                )
+                messages.append(
+                    {
+                        "role": "assistant",
+                        "content": "Enzymes lower activation energy. " * 8,
+                    }
+                )
+            messages.append({"role": "user", "content": "Summarize what we covered."})
+            return {"messages": messages}
+
+        def run(chat):
+            context = ChatContextWindow(MODEL, engine.llm).prepare(chat)
+            "".join(engine.stream(context))
+
+        results.append(
+            {
+                "name": "chat_turn",
+                "params": {"history_turns": turns},
+                **measure(runs, setup, run),
+                "time_to_first_token_s": engine.last_metrics.get(
+                    "time_to_first_token"
+                ),
+            }
+        )
+    return results
+
+
+def bench_results(runs):
+    # imported up front so the first DataFrame does not pay for the import
+    import pandas  # noqa: F401
+    import streamlit as st
+    from src.utils.helper_functions import QuizManager
+
+    results = []
+    for size in RESULT_SIZES:
+        questions, answers = make_results(size)
+
+        def setup():
+            manager = QuizManager()
+            manager.questions = questions
+            st.session_state["user_answers"] = list(answers)
+            return manager
+
+        results.append(
+            {
+                "name": "evaluate_quiz",
+                "params": {"questions": size},
+                **measure(runs, setup, lambda manager: manager.evaluate_quiz()),
+            }
+        )
+
+        evaluated = setup()
+        evaluated.evaluate_quiz()
+
+        def fresh_dataframe():
+            evaluated._results_df = None
+            return evaluated
+
+        results.append(
+            {
+                "name": "results_dataframe",
+                "params": {"questions": size},
+                **measure(
+                    runs,
+                    fresh_dataframe,
+                    lambda manager: manager.generate_result_dataframe(),
+                ),
+            }
+        )
+
+        with tempfile.TemporaryDirectory() as directory, working_directory(directory):
+            results.append(
+                {
+                    "name": "save_to_csv",
+                    "params": {"questions": size},
+                    **measure(runs, fresh_dataframe, lambda m: m.save_to_csv()),
+                }
+            )
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--distribution", default="lognormal")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    settings.FAKE_LLM = True
+    settings.FAKE_LLM_LATENCY = args.latency
+    settings.FAKE_LLM_LATENCY_DISTRIBUTION = args.distribution
+    settings.FAKE_LLM_FAILURE_RATE = args.failure_rate
+    settings.FAKE_LLM_MALFORMED_RATE = args.malformed_rate
+    settings.FAKE_LLM_SEED = args.seed
+    settings.RETRY_BASE_DELAY = 0.0
+    # provider rate limits would measure the limiter rather than the code
+    settings.RATE_LIMIT_ENABLED = False
+    # streamlit warns about the missing script context on every call
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+    results = []
+    for bench in (bench_quiz_generation, bench_chat_turns, bench_results):
+        started = time.perf_counter()
+        results.extend(bench(args.runs))
+        print(f"{bench.__name__}: {time.perf_counter() - started:.1f}s")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "model": MODEL,
+            "fake_llm": {
+                "latency": args.latency,
+                "distribution": args.distribution,
+                "failure_rate": args.failure_rate,
+                "malformed_rate": args.malformed_rate,
+                "seed": args.seed,
+            },
+            "generation_concurrency": settings.GENERATION_CONCURRENCY,
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    for result in results:
+        params = ", ".join(f"{k}={v}" for k, v in result["params"].items())
+        print(f"{result['name']:>18}  {params:<45} {result['mean_s'] * 1000:9.1f} ms")
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+from src.config.settings import settings
+
+
+def main():
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("The API service needs uvicorn: pip install uvicorn")
+
+    uvicorn.run(
+        "src.api.server:app",
+        host=settings.API_HOST,
+        port=settings.API_PORT,
+        workers=settings.API_WORKERS,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import json
+import threading
+import httpx
+from src.config.settings import settings
+
+
+class APIError(Exception):
+    pass
+
+
+class StudyBuddyClient:
+    """
+    Synchronous client for the API service, used by the Streamlit pages when
+    API_BASE_URL is set. One instance is shared per process so connections
+    to the service are pooled.
+    """
+
+    def __init__(self, base_url: str, timeout: float = None):
+        self._http = httpx.Client(
+            base_url=base_url.rstrip("/"),
+            timeout=timeout or settings.API_GENERATION_TIMEOUT_SECONDS + 10,
+        )
+
+    @staticmethod
+    def _error(response) -> APIError:
+        # proxies and the server's own crash page may not answer with JSON
+        try:
+            return APIError(response.json().get("error", response.text))
+        except (ValueError, AttributeError):
+            return APIError(response.text or f"HTTP {response.status_code}")
+
+    def _post(self, path: str, payload: dict):
+        response = self._http.post(path, json=payload)
+        if response.status_code != 200:
+            raise self._error(response)
+        return response.json()
+
+    def generate_quiz(
+        self,
+        model: str,
+        topic,
+        question_type: str,
+        difficulty: str,
+        count: int,
+        user_id: str = None,
+    ):
+        return self._post(
+            "/quiz/generate",
+            {
+                "model": model,
+                "topic": topic,
+                "question_type": question_type,
+                "difficulty": difficulty,
+                "count": count,
+                "user_id": user_id,
+            },
+        )
+
+    def grade(self, questions, answers):
+        return self._post("/quiz/grade", {"questions": questions, "answers": answers})
+
+    def grade_bulk(self, questions, answers, student_ids=None):
+        """answers holds one list per question, with every student's answer to it."""
+        return self._post(
+            "/quiz/grade/bulk",
+            {"questions": questions, "answers": answers, "student_ids": student_ids},
+        )
+
+    def chat(self, chat: dict):
+        response = self._post("/chat", self._chat_payload(chat))
+        self._update_chat(chat, response)
+        return response["content"]
+
+    def stream_chat(self, chat: dict):
+        """
+        Yields the response text chunk by chunk. The chat's summary state and
+        metrics are updated from the stream as they arrive.
+        """
+        with self._http.stream(
+            "POST", "/chat/stream", json=self._chat_payload(chat)
+        ) as response:
+            if response.status_code != 200:
+                response.read()
+                raise self._error(response)
+
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                message = json.loads(line)
+                if "delta" in message:
+                    yield message["delta"]
+                elif "state" in message:
+                    self._update_chat(chat, message["state"])
+                elif "metrics" in message:
+                    self._update_chat(chat, message)
+                elif "error" in message:
+                    raise APIError(message["error"])
+
+    @staticmethod
+    def _chat_payload(chat: dict):
+        return {
+            "model": chat["model"],
+            "messages": chat["messages"],
+            "summary": chat.get("summary", ""),
+            "summarized_upto": chat.get("summarized_upto", 0),
+        }
+
+    @staticmethod
+    def _update_chat(chat: dict, message: dict):
+        for key in ("summary", "summarized_upto"):
+            if key in message:
+                chat[key] = message[key]
+        if message.get("metrics"):
+            chat.setdefault("metrics", []).append(message["metrics"])
+
+    def close(self):
+        self._http.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_api_client():
+    global _client
+
+    if not settings.API_BASE_URL:
+        return None
+
+    with _client_lock:
+        if _client is None:
+            _client = StudyBuddyClient(settings.API_BASE_URL)
+        return _client
@@ -0,0 +1,432 @@
+"""
+ASGI service exposing quiz generation, grading and chat.
+
+    python -m src.api                      # uvicorn on API_HOST:API_PORT
+    uvicorn src.api.server:app --workers 4
+
+Routes:
+    GET  /health
+    GET  /metrics          Prometheus text
+    POST /quiz/generate    {model, topic, question_type, difficulty, count, user_id}
+    POST /quiz/grade       {questions, answers}
+    POST /quiz/grade/bulk  {questions, answers: one list per question, student_ids}
+    POST /chat             {model, messages, summary, summarized_upto}
+    POST /chat/stream      same body, NDJSON lines: {"state"}, {"delta"}..., {"metrics"}
+"""
+
+import json
+import time
+import asyncio
+from src.config.settings import settings
+from src.common.logger import bind_log_context, get_logger
+from src.common.metrics import registry
+from src.generator.quiz_builder import QUESTION_SCHEMAS, QuizBuilder
+from src.grading.grader import grade_quiz
+
+logger = get_logger(__name__)
+
+API_REQUESTS = registry.counter(
+    "study_buddy_api_requests_total",
+    "API requests by route and status code.",
+    ("route", "status"),
+)
+API_SECONDS = registry.histogram(
+    "study_buddy_api_request_seconds",
+    "API request handling time, until the last byte for streams.",
+    ("route",),
+)
+
+
+class HTTPError(Exception):
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Limiter:
+    """
+    Caps concurrent requests of one kind. Requests wait up to
+    `queue_timeout` seconds for a slot and are then rejected with 503, so
+    overload shows up as fast failures instead of an unbounded queue.
+    """
+
+    def __init__(self, limit: int, queue_timeout: float):
+        self.limit = limit
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(limit)
+
+    async def __aenter__(self):
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise HTTPError(503, "Server busy, try again later")
+
+    async def __aexit__(self, *exc):
+        self._semaphore.release()
+
+
+generation_limiter = Limiter(
+    settings.API_MAX_CONCURRENT_GENERATIONS, settings.API_QUEUE_TIMEOUT_SECONDS
+)
+chat_limiter = Limiter(
+    settings.API_MAX_CONCURRENT_CHATS, settings.API_QUEUE_TIMEOUT_SECONDS
+)
+
+_generators = {}
+
+
+def _generator(model: str):
+    from src.generator.question_generator import QuestionGenerator
+
+    if model not in _generators:
+        _generators[model] = QuestionGenerator(model)
+    return _generators[model]
+
+
+def _require(body: dict, *fields):
+    missing = [field for field in fields if body.get(field) in (None, "", [])]
+    if missing:
+        raise HTTPError(400, f"Missing fields: {', '.join(missing)}")
+
+
+def _check_model(model: str):
+    if model != settings.AUTO_MODEL and model not in settings.MODELS:
+        raise HTTPError(400, f"Unknown model {model}")
+
+
+def _check_topic(topic, count: int):
+    """A topic string, or one context string per question."""
+    if isinstance(topic, str) and topic.strip():
+        return
+    if not isinstance(topic, list) or not all(
+        isinstance(context, str) and context.strip() for context in topic
+    ):
+        raise HTTPError(400, "topic must be a string or a list of strings")
+    if len(topic) != count:
+        raise HTTPError(400, "topic lists must have one entry per question")
+
+
+async def generate_quiz(body: dict):
+    _require(body, "model", "topic")
+    _check_model(body["model"])
+    question_type = body.get("question_type", "Single Choice")
+    if question_type not in QUESTION_SCHEMAS:
+        raise HTTPError(400, f"Unknown question type {question_type}")
+    try:
+        count = int(body.get("count", 5))
+    except (TypeError, ValueError):
+        raise HTTPError(400, "count must be an integer")
+    if body.get("user_id"):
+        # each request runs in its own context, so this only tags its own records
+        bind_log_context(session_id=body["user_id"])
+    if not 1 <= count <= settings.API_MAX_QUESTIONS:
+        raise HTTPError(
+            400, f"count must be between 1 and {settings.API_MAX_QUESTIONS}"
+        )
+    _check_topic(body["topic"], count)
+
+    async with generation_limiter:
+        try:
+            outcomes = await asyncio.wait_for(
+                QuizBuilder(body.get("user_id") or "api").agenerate(
+                    _generator(body["model"]),
+                    body["topic"],
+                    question_type,
+                    body.get("difficulty", "Medium"),
+                    count,
+                ),
+                settings.API_GENERATION_TIMEOUT_SECONDS,
+            )
+        except asyncio.TimeoutError:
+            raise HTTPError(504, "Quiz generation timed out")
+
+    return {
+        "questions": [
+            QuizBuilder.to_question_dict(question_type, o)
+            for o in outcomes
+            if not isinstance(o, Exception)
+        ],
+        "errors": [str(o) for o in outcomes if isinstance(o, Exception)],
+    }
+
+
+async def grade(body: dict):
+    _require(body, "questions")
+    answers = body.get("answers") or []
+    if not isinstance(body["questions"], list) or not isinstance(answers, list):
+        raise HTTPError(400, "questions and answers must be lists")
+    if len(answers) != len(body["questions"]):
+        raise HTTPError(400, "answers must have one entry per question")
+
+    try:
+        results, summary = grade_quiz(body["questions"], answers)
+    except (KeyError, TypeError, AttributeError) as e:
+        raise HTTPError(400, f"Invalid questions or answers : {str(e)}")
+    return {"results": results, "summary": summary}
+
+
+async def grade_bulk(body: dict):
+    """Columnar submissions: answers[i] holds every student's answer to question i."""
+    from src.grading.bulk import STUDENT_COLUMN, grade_submissions
+
+    _require(body, "questions", "answers")
+    questions, answers = body["questions"], body["answers"]
+    if not isinstance(questions, list) or not all(
+        isinstance(question, dict) for question in questions
+    ):
+        raise HTTPError(400, "questions must be a list of objects")
+    if not isinstance(answers, list) or not all(
+        isinstance(column, list) for column in answers
+    ):
+        raise HTTPError(400, "answers must be a list of lists")
+    if len(answers) != len(questions):
+        raise HTTPError(400, "answers must have one column per question")
+
+    columns = dict(enumerate(answers))
+    if body.get("student_ids"):
+        columns[STUDENT_COLUMN] = body["student_ids"]
+    if not isinstance(body.get("student_ids") or [], list) or (
+        len({len(column) for column in columns.values()}) > 1
+    ):
+        raise HTTPError(400, "every answer column needs one entry per student")
+
+    try:
+        # CPU bound, so it runs off the event loop
+        per_question, per_student = await asyncio.to_thread(
+            grade_submissions, questions, columns
+        )
+    except (KeyError, TypeError, ValueError) as e:
+        raise HTTPError(400, f"Invalid submissions : {str(e)}")
+
+    return {
+        "questions": _records(per_question),
+        "students": _records(per_student),
+    }
+
+
+def _records(frame):
+    # NaN is not valid JSON
+    return frame.astype(object).where(frame.notna(), None).to_dict("records")
+
+
+async def _prepare_chat(body: dict, deadline: float):
+    from src.chat.chat_engine import ChatEngine
+    from src.chat.context_window import ChatContextWindow
+
+    _require(body, "model", "messages")
+    _check_model(body["model"])
+    if not isinstance(body["messages"], list) or not all(
+        isinstance(message, dict)
+        and isinstance(message.get("role"), str)
+        and isinstance(message.get("content"), str)
+        for message in body["messages"]
+    ):
+        raise HTTPError(400, "messages must be objects with a role and content")
+    if not isinstance(body.get("summary", ""), str) or not isinstance(
+        body.get("summarized_upto", 0), int
+    ):
+        raise HTTPError(400, "summary must be a string, summarized_upto an integer")
+
+    chat = {
+        "messages": body["messages"],
+        "summary": body.get("summary", ""),
+        "summarized_upto": body.get("summarized_upto", 0),
+    }
+    engine = ChatEngine(body["model"])
+    window = ChatContextWindow(body["model"], engine.llm)
+    # summarizing evicted turns is a blocking call, keep it off the event loop;
+    # it counts towards the chat timeout like the response itself
+    try:
+        messages = await asyncio.wait_for(
+            asyncio.to_thread(window.prepare, chat),
+            max(deadline - time.monotonic(), 0),
+        )
+    except asyncio.TimeoutError:
+        raise HTTPError(504, "Chat response timed out")
+    state = {"summary": chat["summary"], "summarized_upto": chat["summarized_upto"]}
+    return engine, messages, state
+
+
+async def chat(body: dict):
+    async with chat_limiter:
+        deadline = time.monotonic() + settings.API_CHAT_TIMEOUT_SECONDS
+        engine, messages, state = await _prepare_chat(body, deadline)
+        try:
+            content = await asyncio.wait_for(
+                engine.arespond(messages), max(deadline - time.monotonic(), 0)
+            )
+        except asyncio.TimeoutError:
+            raise HTTPError(504, "Chat response timed out")
+
+    return {"content": content, **state, "metrics": engine.last_metrics}
+
+
+async def chat_stream(body: dict):
+    """Yields NDJSON lines; the limiter slot is held until the stream ends."""
+    async with chat_limiter:
+        deadline = time.monotonic() + settings.API_CHAT_TIMEOUT_SECONDS
+        engine, messages, state = await _prepare_chat(body, deadline)
+        yield {"state": state}
+
+        stream = engine.astream(messages).__aiter__()
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                try:
+                    delta = await asyncio.wait_for(
+                        stream.__anext__(), max(remaining, 0)
+                    )
+                except StopAsyncIteration:
+                    break
+                except asyncio.TimeoutError:
+                    yield {"error": "Chat response timed out"}
+                    return
+                yield {"delta": delta}
+        finally:
+            await stream.aclose()
+
+        yield {"metrics": engine.last_metrics}
+
+
+ROUTES = {
+    ("POST", "/quiz/generate"): generate_quiz,
+    ("POST", "/quiz/grade"): grade,
+    ("POST", "/quiz/grade/bulk"): grade_bulk,
+    ("POST", "/chat"): chat,
+}
+STREAM_ROUTES = {("POST", "/chat/stream"): chat_stream}
+
+
+async def _read_json(receive):
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > settings.API_MAX_BODY_BYTES:
+            raise HTTPError(413, "Request body too large")
+        chunks.append(chunk)
+        if not message.get("more_body"):
+            break
+
+    try:
+        body = json.loads(b"".join(chunks) or b"{}")
+    except json.JSONDecodeError:
+        raise HTTPError(400, "Request body is not valid JSON")
+    if not isinstance(body, dict):
+        raise HTTPError(400, "Request body must be a JSON object")
+    return body
+
+
+async def _send(send, status: int, body: bytes, content_type: str):
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", content_type.encode()),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _send_json(send, status: int, payload):
+    await _send(send, status, json.dumps(payload).encode("utf-8"), "application/json")
+
+
+async def _stream_ndjson(send, lines):
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"application/x-ndjson")],
+        }
+    )
+    async for line in lines:
+        await send(
+            {
+                "type": "http.response.body",
+                "body": (json.dumps(line) + "\n").encode("utf-8"),
+                "more_body": True,
+            }
+        )
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+
+    route = (scope["method"], scope["path"])
+    start = time.perf_counter()
+    status = 200
+
+    try:
+        if route == ("GET", "/health"):
+            await _send_json(send, 200, {"status": "ok"})
+        elif route == ("GET", "/metrics"):
+            await _send(
+                send,
+                200,
+                registry.render().encode("utf-8"),
+                "text/plain; version=0.0.4; charset=utf-8",
+            )
+        elif route in ROUTES:
+            body = await _read_json(receive)
+            await _send_json(send, 200, await ROUTES[route](body))
+        elif route in STREAM_ROUTES:
+            body = await _read_json(receive)
+            lines = STREAM_ROUTES[route](body)
+            try:
+                # errors raised before the first line get a normal error response
+                first = await lines.__anext__()
+
+                async def replay():
+                    yield first
+                    try:
+                        async for line in lines:
+                            yield line
+                    except Exception as e:
+                        logger.error("API stream %s failed : %s", scope["path"], e)
+                        yield {"error": str(e)}
+
+                await _stream_ndjson(send, replay())
+            finally:
+                # releases the limiter slot even if the client went away
+                await lines.aclose()
+        else:
+            raise HTTPError(404, "Not found")
+
+    except HTTPError as e:
+        status = e.status
+        await _send_json(send, status, {"error": e.message})
+
+    except Exception as e:
+        status = 500
+        logger.error(
+            "API request %s %s failed : %s", scope["method"], scope["path"], e
+        )
+        await _send_json(send, status, {"error": str(e)})
+
+    finally:
+        known = route in ROUTES or route in STREAM_ROUTES
+        label = scope["path"] if known else "other"
+        API_REQUESTS.inc(label, str(status))
+        API_SECONDS.observe(time.perf_counter() - start, label)
@@ -0,0 +1,267 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict, deque
+from src.models.question_schemas import (
+    MCQQuestion,
+    FillBlankQuestion,
+    MultipleAnswerQuestion,
+)
+from src.config.settings import settings
+from src.common.logger import get_logger
+
+QUESTION_MODELS = {
+    model.__name__: model
+    for model in (MCQQuestion, FillBlankQuestion, MultipleAnswerQuestion)
+}
+
+
+class GenerationCache:
+    """
+    Two tier cache of parsed questions: an in-memory LRU of question pools in
+    front of a SQLite file. Each key holds up to `pool_size` variants and is
+    only served from cache once its pool is full, so repeat quizzes rotate
+    through different questions instead of returning the same one.
+    """
+
+    # last_access updates are written together, at most this many at a time
+    ACCESS_FLUSH_SIZE = 64
+
+    def __init__(
+        self,
+        directory: str = None,
+        max_entries: int = 256,
+        max_disk_entries: int = 10000,
+        ttl_seconds: int = 7 * 24 * 3600,
+        pool_size: int = 5,
+    ):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+        self.pool_size = max(1, pool_size)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._memory = OrderedDict()
+        self._accessed = {}
+        self._lock = threading.Lock()
+        self._db = None
+        self.logger = get_logger(self.__class__.__name__)
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(
+                os.path.join(directory, "generation_cache.sqlite3"),
+                check_same_thread=False,
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS questions ("
+                "cache_key TEXT NOT NULL, created_at REAL NOT NULL, "
+                "last_access REAL NOT NULL, question_type TEXT NOT NULL, "
+                "payload TEXT NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_questions_key ON questions (cache_key)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_questions_access "
+                "ON questions (last_access)"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def make_key(model: str, template: str, topic: str, difficulty: str) -> str:
+        template_hash = hashlib.sha256(template.encode("utf-8")).hexdigest()[:16]
+        topic_hash = hashlib.sha256(
+            " ".join(topic.lower().split()).encode("utf-8")
+        ).hexdigest()
+        return f"{model}|{template_hash}|{topic_hash}|{difficulty.lower()}"
+
+    def _is_fresh(self, created_at, now):
+        return now - created_at < self.ttl_seconds
+
+    def _load_pool(self, key, now):
+        pool = deque()
+        if self._db is None:
+            return pool
+
+        rows = self._db.execute(
+            "SELECT created_at, question_type, payload FROM questions "
+            "WHERE cache_key = ? AND created_at > ? ORDER BY created_at",
+            (key, now - self.ttl_seconds),
+        ).fetchall()
+        for created_at, question_type, payload in rows:
+            model = QUESTION_MODELS[question_type]
+            pool.append((created_at, model.model_validate(json.loads(payload))))
+        return pool
+
+    def _remember(self, key, pool):
+        self._memory[key] = pool
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key):
+        questions = self.draw(key, 1)
+        return questions[0] if questions else None
+
+    def draw(self, key, count: int):
+        """
+        Up to `count` distinct variants, never more than one pool's worth, so
+        a quiz does not get the same cached question twice.
+        """
+        now = time.time()
+
+        with self._lock:
+            pool = self._memory.get(key)
+            if pool is None:
+                pool = self._load_pool(key, now)
+
+            pool = deque(
+                (created_at, q)
+                for created_at, q in pool
+                if self._is_fresh(created_at, now)
+            )
+            self._remember(key, pool)
+
+            if len(pool) < self.pool_size:
+                self.misses += 1
+                return []
+
+            # rotate so consecutive requests get different variants
+            drawn = []
+            for _ in range(min(count, len(pool))):
+                entry = pool.popleft()
+                pool.append(entry)
+                drawn.append(entry[1].model_copy(deep=True))
+            self.hits += len(drawn)
+
+            if self._db is not None:
+                self._accessed[key] = now
+                if len(self._accessed) >= self.ACCESS_FLUSH_SIZE:
+                    self._flush_access()
+                    self._db.commit()
+            return drawn
+
+    def _flush_access(self):
+        if self._accessed:
+            self._db.executemany(
+                "UPDATE questions SET last_access = ? WHERE cache_key = ?",
+                [(now, key) for key, now in self._accessed.items()],
+            )
+            self._accessed.clear()
+
+    def put(self, key, question):
+        now = time.time()
+
+        with self._lock:
+            pool = self._memory.get(key)
+            if pool is None:
+                pool = self._load_pool(key, now)
+            pool.append((now, question.model_copy(deep=True)))
+            while len(pool) > self.pool_size:
+                pool.popleft()
+            self._remember(key, pool)
+
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT INTO questions VALUES (?, ?, ?, ?, ?)",
+                    (
+                        key,
+                        now,
+                        now,
+                        type(question).__name__,
+                        question.model_dump_json(),
+                    ),
+                )
+                self._flush_access()
+                self._trim_disk(key, now)
+                self._db.commit()
+
+    def _trim_disk(self, key, now):
+        self._db.execute(
+            "DELETE FROM questions WHERE rowid IN ("
+            "SELECT rowid FROM questions WHERE cache_key = ? "
+            "ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (key, self.pool_size),
+        )
+        self._db.execute(
+            "DELETE FROM questions WHERE created_at <= ?", (now - self.ttl_seconds,)
+        )
+
+        (count,) = self._db.execute("SELECT COUNT(*) FROM questions").fetchone()
+        overflow = count - self.max_disk_entries
+        if overflow > 0:
+            self._db.execute(
+                "DELETE FROM questions WHERE rowid IN ("
+                "SELECT rowid FROM questions ORDER BY last_access LIMIT ?)",
+                (overflow,),
+            )
+            self.evictions += overflow
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._accessed.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM questions")
+                self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "memory_keys": len(self._memory),
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_generation_cache():
+    global _cache
+
+    if not settings.CACHE_ENABLED:
+        return None
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = GenerationCache(
+                directory=settings.CACHE_DIR,
+                max_entries=settings.CACHE_MAX_ENTRIES,
+                max_disk_entries=settings.CACHE_MAX_DISK_ENTRIES,
+                ttl_seconds=settings.CACHE_TTL_SECONDS,
+                pool_size=settings.CACHE_POOL_SIZE,
+            )
+            _export_metrics(_cache)
+        return _cache
+
+
+def _export_metrics(cache: GenerationCache):
+    from src.common.metrics import registry
+
+    # hits and misses are counted per model by the question generator
+    registry.callback(
+        "study_buddy_generation_cache_evictions_total",
+        "Entries evicted from the in-memory generation cache.",
+        (),
+        lambda: {(): cache.stats()["evictions"]},
+        kind="counter",
+    )
+    registry.callback(
+        "study_buddy_generation_cache_memory_keys",
+        "Keys held in the in-memory generation cache.",
+        (),
+        lambda: {(): cache.stats()["memory_keys"]},
+    )
@@ -1,17 +1,40 @@
-from langchain.prompts import PromptTemplate
-from langchain.output_parsers import PydanticOutputParser
-from src.config.settings import settings
+import time
 from src.common.logger import get_logger
+from src.common.metrics import registry
 from src.common.custom_exception import CustomException
-from src.llms.llm_client import get_groq_llm, get_openai_llm
+from src.llms.llm_client import get_llm
+from src.llms.router import RoutedLLM
+
+CHAT_RESPONSES = registry.counter(
+    "study_buddy_chat_responses_total",
+    "Chat responses by mode (invoke, stream) and outcome (success, error).",
+    ("model", "mode", "outcome"),
+)
+CHAT_SECONDS = registry.histogram(
+    "study_buddy_chat_response_seconds",
+    "Total time to produce a chat response.",
+    ("model", "mode"),
+)
+CHAT_TTFT_SECONDS = registry.histogram(
+    "study_buddy_chat_time_to_first_token_seconds",
+    "Time until the first streamed chunk of a chat response.",
+    ("model",),
+)
+CHAT_CHARACTERS = registry.counter(
+    "study_buddy_chat_response_characters_total",
+    "Characters of chat responses returned to users.",
+    ("model",),
+)
 
 
 class ChatEngine:
 
     def __init__(self, llm: str):
-        self.llm = get_openai_llm(llm) if llm.startswith("gpt") else get_groq_llm(llm)
-        self.logger = get_logger(self.__class__.__name__)
+        self.model = llm
+        self.llm = get_llm(llm, priority="chat")
+        self.logger = get_logger(self.__class__.__name__, model=llm)
         self.logger.info("Conversation started")
+        self.last_metrics = {}
 
     def respond(self, messages):
         """
@@ -19,9 +42,105 @@ class ChatEngine:
         """
 
         try:
+            start = time.perf_counter()
             response = self.llm.invoke(messages)
+            total = time.perf_counter() - start
+            self._record_metrics(None, total, len(response.content), "invoke")
+            return response.content
+
+        except Exception as e:
+            CHAT_RESPONSES.inc(self._served_model(), "invoke", "error")
+            self.logger.error("Failed to generate chat response")
+            raise CustomException("Chat engine failed", e)
+
+    async def arespond(self, messages):
+        try:
+            start = time.perf_counter()
+            response = await self.llm.ainvoke(messages)
+            total = time.perf_counter() - start
+            self._record_metrics(None, total, len(response.content), "invoke")
             return response.content
 
         except Exception as e:
+            CHAT_RESPONSES.inc(self._served_model(), "invoke", "error")
             self.logger.error("Failed to generate chat response")
             raise CustomException("Chat engine failed", e)
+
+    def stream(self, messages):
+        """
+        messages: [{role, content}]
+        Yields the response text chunk by chunk as the model produces it.
+        """
+
+        start = time.perf_counter()
+        first_token = None
+        length = 0
+
+        try:
+            for chunk in self.llm.stream(messages):
+                if not chunk.content:
+                    continue
+                if first_token is None:
+                    first_token = time.perf_counter() - start
+                length += len(chunk.content)
+                yield chunk.content
+
+        except Exception as e:
+            CHAT_RESPONSES.inc(self._served_model(), "stream", "error")
+            self.logger.error("Failed to stream chat response")
+            raise CustomException("Chat engine failed", e)
+
+        self._record_metrics(first_token, time.perf_counter() - start, length, "stream")
+
+    async def astream(self, messages):
+        start = time.perf_counter()
+        first_token = None
+        length = 0
+
+        try:
+            async for chunk in self.llm.astream(messages):
+                if not chunk.content:
+                    continue
+                if first_token is None:
+                    first_token = time.perf_counter() - start
+                length += len(chunk.content)
+                yield chunk.content
+
+        except Exception as e:
+            CHAT_RESPONSES.inc(self._served_model(), "stream", "error")
+            self.logger.error("Failed to stream chat response")
+            raise CustomException("Chat engine failed", e)
+
+        self._record_metrics(first_token, time.perf_counter() - start, length, "stream")
+
+    def _served_model(self):
+        # with Auto, the model the router picked for the latest call
+        if isinstance(self.llm, RoutedLLM):
+            return self.llm.last_model or self.model
+        return self.model
+
+    def _record_metrics(self, time_to_first_token, total_time, length, mode):
+        model = self._served_model()
+        CHAT_RESPONSES.inc(model, mode, "success")
+        CHAT_SECONDS.observe(total_time, model, mode)
+        CHAT_CHARACTERS.inc(model, amount=length)
+        if time_to_first_token is not None:
+            CHAT_TTFT_SECONDS.observe(time_to_first_token, model)
+
+        self.last_metrics = {
+            "model": model,
+            "time_to_first_token": time_to_first_token,
+            "total_time": total_time,
+            "characters": length,
+        }
+        self.logger.info(
+            "Chat response from %s : ttft %s, total %.3fs",
+            model,
+            "n/a" if time_to_first_token is None else f"{time_to_first_token:.3f}s",
+            total_time,
+            extra={
+                "model": model,
+                "latency": total_time,
+                "time_to_first_token": time_to_first_token,
+            },
+        )
@@ -0,0 +1,174 @@
+import re
+import math
+from collections import Counter
+from src.config.settings import settings
+from src.chat.tokens import estimate_tokens
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = {
+    "a",
+    "an",
+    "and",
+    "are",
+    "as",
+    "at",
+    "be",
+    "but",
+    "by",
+    "can",
+    "do",
+    "does",
+    "for",
+    "from",
+    "how",
+    "i",
+    "if",
+    "in",
+    "is",
+    "it",
+    "its",
+    "me",
+    "of",
+    "on",
+    "or",
+    "so",
+    "that",
+    "the",
+    "their",
+    "them",
+    "there",
+    "these",
+    "they",
+    "this",
+    "to",
+    "was",
+    "we",
+    "what",
+    "when",
+    "which",
+    "who",
+    "why",
+    "will",
+    "with",
+    "you",
+    "your",
+}
+
+
+def tokenize(text: str):
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+
+class ConversationIndex:
+    """
+    Incremental BM25 index over chunks of a chat conversation. `update` only
+    indexes messages appended since the previous call, and `slices` returns
+    one token-budgeted context per quiz question, each built around a
+    different part of the conversation.
+    """
+
+    K1 = 1.5
+    B = 0.75
+
+    def __init__(self, chunk_tokens: int = None):
+        self.chunk_tokens = chunk_tokens or settings.CHAT_CONTEXT_CHUNK_TOKENS
+        self.chunks = []
+        self.term_counts = []
+        self.document_frequency = Counter()
+        self.total_length = 0
+        self.queries = []
+        self.indexed_upto = 0
+
+    def update(self, messages):
+        for message in messages[self.indexed_upto :]:
+            if message["role"] == "system":
+                continue
+
+            first_chunk = len(self.chunks)
+            role = "User" if message["role"] == "user" else "Assistant"
+            for text in self._split(message["content"]):
+                self._add_chunk(f"{role}: {text}")
+
+            if message["role"] == "user" and len(self.chunks) > first_chunk:
+                self.queries.append(first_chunk)
+
+        self.indexed_upto = len(messages)
+        return self
+
+    def _split(self, content: str):
+        words = content.split()
+        size = max(1, int(self.chunk_tokens * 0.75))
+        for start in range(0, len(words), size):
+            yield " ".join(words[start : start + size])
+
+    def _add_chunk(self, text: str):
+        counts = Counter(tokenize(text))
+        self.chunks.append(text)
+        self.term_counts.append(counts)
+        self.document_frequency.update(counts.keys())
+        self.total_length += sum(counts.values())
+
+    def score(self, query_terms):
+        count = len(self.chunks)
+        average_length = self.total_length / count if count else 0
+        scores = []
+
+        for counts in self.term_counts:
+            length = sum(counts.values())
+            score = 0.0
+            for term in query_terms:
+                frequency = counts.get(term)
+                if not frequency:
+                    continue
+                df = self.document_frequency[term]
+                idf = math.log(1 + (count - df + 0.5) / (df + 0.5))
+                norm = 1 - self.B + self.B * length / (average_length or 1)
+                score += idf * frequency * (self.K1 + 1) / (frequency + self.K1 * norm)
+            scores.append(score)
+        return scores
+
+    def search(self, query: str, k: int = 5):
+        scores = self.score(set(tokenize(query)))
+        ranked = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)
+        return [self.chunks[i] for i in ranked[:k] if scores[i] > 0]
+
+    def slices(self, count: int, token_budget: int = None):
+        token_budget = token_budget or settings.CHAT_CONTEXT_TOKEN_BUDGET
+        if not self.chunks:
+            return [""] * count
+
+        seeds = self.queries or list(range(len(self.chunks)))
+        used = Counter()
+        contexts = []
+
+        for i in range(count):
+            # spread the seeds across the conversation rather than taking the first few
+            if count <= len(seeds):
+                seed = seeds[(i * len(seeds)) // count]
+            else:
+                seed = seeds[i % len(seeds)]
+            scores = self.score(set(self.term_counts[seed]))
+            scores[seed] = max(scores) + 1
+
+            # chunks already used by earlier slices are pushed down the ranking
+            ranked = sorted(
+                range(len(scores)),
+                key=lambda j: scores[j] / (1 + used[j]),
+                reverse=True,
+            )
+
+            selected, tokens = [], 0
+            for j in ranked:
+                chunk_tokens = estimate_tokens(self.chunks[j])
+                if selected and (
+                    scores[j] <= 0 or tokens + chunk_tokens > token_budget
+                ):
+                    continue
+                selected.append(j)
+                tokens += chunk_tokens
+
+            used.update(selected)
+            contexts.append("\n".join(self.chunks[j] for j in sorted(selected)))
+
+        return contexts
@@ -0,0 +1,116 @@
+from src.config.settings import settings
+from src.common.logger import get_logger
+from src.prompts.templates import chat_summary_prompt_template
+from src.chat.tokens import MESSAGE_OVERHEAD_TOKENS, message_tokens
+
+# evicting down to a fraction of the budget means the summary is refreshed
+# every few turns instead of on every turn once the window is full
+EVICTION_TARGET = 0.75
+
+
+class ChatContextWindow:
+    """
+    Keeps chat requests within a per-model token budget. The system prompt and
+    the most recent turns are sent verbatim; older turns are folded into a
+    rolling summary stored on the chat under "summary", and "summarized_upto"
+    marks how many messages it already covers.
+    """
+
+    def __init__(self, model: str, llm):
+        self.llm = llm
+        self.budget = settings.CONTEXT_TOKEN_BUDGETS.get(
+            model, settings.DEFAULT_CONTEXT_TOKEN_BUDGET
+        )
+        self.logger = get_logger(self.__class__.__name__)
+
+    def prepare(self, chat):
+        messages = chat["messages"]
+        system = [m for m in messages[:1] if m["role"] == "system"]
+        start = max(chat.get("summarized_upto", 0), len(system))
+        recent = messages[start:]
+
+        available = (
+            self.budget
+            - sum(message_tokens(m) for m in system)
+            - settings.CHAT_SUMMARY_MAX_TOKENS
+            - MESSAGE_OVERHEAD_TOKENS
+        )
+
+        if sum(message_tokens(m) for m in recent) > available:
+            cut = self._cut_index(recent, int(available * EVICTION_TARGET))
+            if cut:
+                chat["summary"] = self._summarize(
+                    chat.get("summary", ""), recent[:cut]
+                )
+                chat["summarized_upto"] = start + cut
+                recent = recent[cut:]
+                self.logger.info(
+                    "Summarized %d chat messages into the rolling summary", cut
+                )
+
+        # only the newest message can still be over budget: it is never evicted
+        overflow = sum(message_tokens(m) for m in recent) - available
+        if recent and overflow > 0:
+            newest = recent[-1]
+            recent = recent[:-1] + [
+                self._shorten(newest, message_tokens(newest) - overflow)
+            ]
+
+        context = list(system)
+        if chat.get("summary"):
+            context.append(
+                {
+                    "role": "system",
+                    "content": (
+                        f"Summary of the earlier conversation:\n{chat['summary']}"
+                    ),
+                }
+            )
+        return context + recent
+
+    @staticmethod
+    def _cut_index(messages, target_tokens):
+        kept_tokens = 0
+        keep = 0
+        for message in reversed(messages):
+            tokens = message_tokens(message)
+            if keep and kept_tokens + tokens > target_tokens:
+                break
+            kept_tokens += tokens
+            keep += 1
+        return len(messages) - keep
+
+    def _shorten(self, message, max_tokens):
+        """Copy of the message with its content cut down to max_tokens."""
+        content = message["content"]
+        while content and message_tokens({"content": content}) > max_tokens:
+            excess = message_tokens({"content": content}) / max(max_tokens, 1)
+            content = content[: int(len(content) / excess * 0.95)]
+        self.logger.warning(
+            "Truncated a %d token chat message to fit the context budget",
+            message_tokens(message),
+        )
+        return {**message, "content": content}
+
+    def _summarize(self, summary, messages):
+        conversation = "\n".join(
+            f"{'User' if m['role'] == 'user' else 'Assistant'}: {m['content']}"
+            for m in messages
+        )
+
+        try:
+            response = self.llm.invoke(
+                chat_summary_prompt_template.format(
+                    summary=summary or "(empty)", conversation=conversation
+                )
+            )
+            return self._truncate(response.content.strip())
+
+        except Exception as e:
+            self.logger.error("Failed to update chat summary : %s", e)
+            return self._truncate(f"{summary}\n{conversation}".strip())
+
+    @staticmethod
+    def _truncate(text):
+        max_chars = settings.CHAT_SUMMARY_MAX_TOKENS * 4
+        return text if len(text) <= max_chars else text[-max_chars:]
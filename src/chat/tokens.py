@@ -0,0 +1,14 @@
+from functools import lru_cache
+
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+@lru_cache(maxsize=8192)
+def estimate_tokens(text: str) -> int:
+    if not text:
+        return 0
+    return max(len(text) // 4, len(text.split()))
+
+
+def message_tokens(message) -> int:
+    return MESSAGE_OVERHEAD_TOKENS + estimate_tokens(message["content"])
@@ -0,0 +1,59 @@
+import asyncio
+import queue
+import threading
+
+_loop = None
+_lock = threading.Lock()
+
+
+def get_event_loop():
+    global _loop
+
+    with _lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=_loop.run_forever, name="study-buddy-async", daemon=True
+            )
+            thread.start()
+        return _loop
+
+
+def run_async(coro, timeout=None):
+    """
+    Run a coroutine on the shared background event loop and wait for its result.
+
+    Async LLM clients keep their connection pools bound to the loop they were
+    first used on, so every caller goes through the same long-lived loop.
+    """
+
+    future = asyncio.run_coroutine_threadsafe(coro, get_event_loop())
+    return future.result(timeout)
+
+
+def iterate_async(async_iterable):
+    """
+    Consume an async iterator on the shared event loop from synchronous code.
+    """
+
+    items = queue.Queue()
+    done = object()
+
+    async def pump():
+        try:
+            async for item in async_iterable:
+                items.put(item)
+        except BaseException as e:
+            items.put(e)
+        else:
+            items.put(done)
+
+    asyncio.run_coroutine_threadsafe(pump(), get_event_loop())
+
+    while True:
+        item = items.get()
+        if item is done:
+            return
+        if isinstance(item, BaseException):
+            raise item
+        yield item
@@ -1,20 +1,193 @@
 import os
+import json
+import queue
+import atexit
 import logging
-from datetime import datetime
+import threading
+import contextvars
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+from src.config.settings import settings
 
-LOGS_DIR = 'logs'
+LOGS_DIR = settings.LOG_DIR
+LOG_FILE = os.path.join(LOGS_DIR, settings.LOG_FILE_NAME)
 
-os.makedirs(LOGS_DIR,exist_ok=True)
+TEXT_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
 
-LOG_FILE = os.path.join(LOGS_DIR, f"log_{datetime.now().strftime('%Y-%m-%d')}.log")
+# attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
 
-logging.basicConfig(
-    filename=LOG_FILE,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    level=logging.INFO
-)
+_IMMUTABLE = (str, int, float, bool, bytes, type(None))
 
-def get_logger(name):
+# fields such as session_id added to every record logged in this context
+_log_context = contextvars.ContextVar("log_context", default={})
+
+
+def bind_log_context(**fields):
+    """
+    Adds fields to the records logged from the current context, including
+    coroutines it starts on the shared event loop. Returns a token for
+    reset_log_context.
+    """
+    return _log_context.set({**_log_context.get(), **fields})
+
+
+def reset_log_context(token):
+    _log_context.reset(token)
+
+
+class JSONFormatter(logging.Formatter):
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SizeAndTimeRotatingFileHandler(TimedRotatingFileHandler):
+    """
+    Rolls the file over at the configured time and also whenever it grows
+    past `max_bytes`. Files rotated twice in one period get a numbered suffix.
+    """
+
+    def __init__(self, filename, max_bytes=0, **kwargs):
+        super().__init__(filename, **kwargs)
+        self.max_bytes = max_bytes
+
+    def shouldRollover(self, record):
+        if super().shouldRollover(record):
+            return True
+        if not self.max_bytes or self.stream is None:
+            return False
+        return self.stream.tell() >= self.max_bytes
+
+    def rotation_filename(self, default_name):
+        name = super().rotation_filename(default_name)
+        index = 1
+        candidate = name
+        while os.path.exists(candidate):
+            candidate = f"{name}.{index}"
+            index += 1
+        return candidate
+
+
+class _ContextFilter(logging.Filter):
+
+    def filter(self, record):
+        for key, value in _log_context.get().items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
+        return True
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    """
+    Hands records to the listener thread as they are. Messages are formatted
+    there, and records are dropped rather than blocking once `max_size` are
+    waiting.
+    """
+
+    dropped = 0
+
+    def __init__(self, log_queue, max_size: int = 0):
+        super().__init__(log_queue)
+        self.max_size = max_size
+
+    def prepare(self, record):
+        # arguments that could change before the listener formats the record
+        # are rendered into the message now
+        if not isinstance(record.msg, str) or (
+            record.args
+            and (
+                not isinstance(record.args, tuple)
+                or not all(isinstance(a, _IMMUTABLE) for a in record.args)
+            )
+        ):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record):
+        if self.max_size and self.queue.qsize() >= self.max_size:
+            _NonBlockingQueueHandler.dropped += 1
+            return
+        self.queue.put_nowait(record)
+
+
+def _file_handler():
+    os.makedirs(LOGS_DIR, exist_ok=True)
+    handler = SizeAndTimeRotatingFileHandler(
+        LOG_FILE,
+        max_bytes=settings.LOG_MAX_BYTES,
+        when=settings.LOG_ROTATE_WHEN,
+        backupCount=settings.LOG_BACKUP_COUNT,
+        encoding="utf-8",
+    )
+    if settings.LOG_FORMAT == "json":
+        handler.setFormatter(JSONFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    return handler
+
+
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def configure_logging():
+    """
+    Creates the log directory and starts the writer thread. Runs once, on
+    the first get_logger call, so importing this module has no side effects.
+    """
+    global _listener
+
+    if _listener is not None:
+        return _listener
+    with _listener_lock:
+        if _listener is None:
+            _listener = _start_listener()
+    return _listener
+
+
+def _start_listener():
+    log_queue = queue.SimpleQueue()
+    handler = _NonBlockingQueueHandler(log_queue, settings.LOG_QUEUE_SIZE)
+    handler.addFilter(_ContextFilter())
+
+    root = logging.getLogger()
+    root.addHandler(handler)
+    root.setLevel(settings.LOG_LEVEL)
+
+    listener = QueueListener(log_queue, _file_handler(), respect_handler_level=True)
+    listener.start()
+    # flushes what is still queued when the process exits
+    atexit.register(listener.stop)
+    return listener
+
+
+def dropped_records() -> int:
+    return _NonBlockingQueueHandler.dropped
+
+
+class _FieldsAdapter(logging.LoggerAdapter):
+
+    def process(self, msg, kwargs):
+        kwargs["extra"] = {**self.extra, **kwargs.get("extra", {})}
+        return msg, kwargs
+
+
+def get_logger(name, **fields):
+    """fields, such as model, are added to every record the logger writes."""
+    configure_logging()
     logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
-    return logger
\ No newline at end of file
+    logger.setLevel(settings.LOG_LEVEL)
+    return _FieldsAdapter(logger, fields) if fields else logger
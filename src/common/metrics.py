@@ -0,0 +1,334 @@
+import os
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.config.settings import settings
+from src.common.logger import get_logger
+
+# upper bounds in seconds, wide enough for page renders and LLM calls alike
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    float("inf"),
+)
+
+logger = get_logger(__name__)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs += [f'{name}="{value}"' for name, value in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        """Label values are passed positionally, in the declared order."""
+        if not registry.enabled:
+            return
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values):
+        with self._lock:
+            return self._values.get(label_values, 0)
+
+    def values(self):
+        with self._lock:
+            return dict(self._values)
+
+    def render(self):
+        with self._lock:
+            values = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labels, key)} {_format_number(value)}"
+            for key, value in values
+        ]
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Gauge:
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def set(self, value, *label_values):
+        if not registry.enabled:
+            return
+        with self._lock:
+            self._values[label_values] = value
+
+    def inc(self, *label_values, amount=1):
+        if not registry.enabled:
+            return
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def dec(self, *label_values, amount=1):
+        self.inc(*label_values, amount=-amount)
+
+    def value(self, *label_values):
+        with self._lock:
+            return self._values.get(label_values, 0)
+
+    def render(self):
+        with self._lock:
+            values = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labels, key)} {_format_number(value)}"
+            for key, value in values
+        ]
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram:
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # label values -> [bucket counts, sum, count]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        if not registry.enabled:
+            return
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(label_values)
+            if series is None:
+                series = self._values[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *label_values):
+        with self._lock:
+            series = self._values.get(label_values)
+            return series[2] if series else 0
+
+    def render(self):
+        with self._lock:
+            values = [
+                (key, list(counts), total, count)
+                for key, (counts, total, count) in self._values.items()
+            ]
+
+        lines = []
+        for key, counts, total, count in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(
+                    self.labels, key, [("le", _format_number(bound))]
+                )
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {_format_number(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+class CallbackMetric:
+    """
+    Counter or gauge read from a component at render time, for state the
+    component already keeps. `collect` returns {label values: value}.
+    """
+
+    def __init__(self, name: str, help: str, labels=(), collect=None, kind="gauge"):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.collect = collect
+        self.kind = kind
+
+    def render(self):
+        if not registry.enabled:
+            return []
+        try:
+            values = self.collect()
+        except Exception as e:
+            logger.error("Failed to collect metric %s : %s", self.name, e)
+            return []
+        return [
+            f"{self.name}{_format_labels(self.labels, key)} {_format_number(value)}"
+            for key, value in values.items()
+        ]
+
+    def reset(self):
+        pass
+
+
+class MetricsRegistry:
+    """
+    Process-wide counters, gauges and histograms, rendered in the Prometheus
+    text exposition format. Registering a name twice returns the existing metric.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric_class, name, help, labels, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = metric_class(name, help, labels, **kwargs)
+                self._metrics[name] = metric
+            return metric
+
+    def counter(self, name: str, help: str, labels=()):
+        return self._register(Counter, name, help, labels)
+
+    def gauge(self, name: str, help: str, labels=()):
+        return self._register(Gauge, name, help, labels)
+
+    def histogram(self, name: str, help: str, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram, name, help, labels, buckets=buckets)
+
+    def callback(self, name: str, help: str, labels, collect, kind="gauge"):
+        """Registering again replaces the callback, e.g. for a new instance."""
+        metric = self._register(
+            CallbackMetric, name, help, labels, collect=collect, kind=kind
+        )
+        metric.collect = collect
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # written to a temporary file first so scrapers never read a partial file
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+    def reset(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+
+registry = MetricsRegistry(enabled=settings.METRICS_ENABLED)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+
+        body = registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1"):
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(
+        target=server.serve_forever, name="metrics-server", daemon=True
+    ).start()
+    logger.info("Serving metrics on http://%s:%d/metrics", host, port)
+    return server
+
+
+def start_metrics_file_writer(path: str, interval_seconds: float):
+    stop = threading.Event()
+
+    def run():
+        while not stop.wait(interval_seconds):
+            try:
+                registry.write(path)
+            except Exception as e:
+                logger.error("Failed to write metrics to %s : %s", path, e)
+
+    threading.Thread(target=run, name="metrics-file-writer", daemon=True).start()
+    return stop
+
+
+def start_exporters():
+    exporters = {}
+    if settings.METRICS_PORT:
+        try:
+            exporters["server"] = start_metrics_server(
+                settings.METRICS_PORT, settings.METRICS_HOST
+            )
+        except OSError as e:
+            logger.error("Failed to start metrics server : %s", e)
+    if settings.METRICS_FILE:
+        exporters["file"] = start_metrics_file_writer(
+            settings.METRICS_FILE, settings.METRICS_FILE_INTERVAL_SECONDS
+        )
+    return exporters
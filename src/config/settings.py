@@ -9,20 +9,199 @@ class Settings:
     GROQ_API_KEY = os.getenv("GROQ_API_KEY")
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
+    # generation and chat models users can pick; safety classifiers such as
+    # llama-guard cannot write quiz JSON and are left out
     MODELS = [
         "openai/gpt-oss-120b",
         "openai/gpt-oss-20b",
         "gpt-4o-mini",
         "meta-llama/llama-4-maverick-17b-128e-instruct",
         "meta-llama/llama-4-scout-17b-16e-instruct",
-        "meta-llama/llama-guard-4-12b",
         "llama-3.3-70b-versatile",
         "llama-3.1-8b-instant",
     ]
 
     TEMPERATURE = 0.9
 
+    # "Auto" sends each request to the model with the lowest expected time
+    # per usable answer for its task, from rolling per-model latency
+    # percentiles and success rates; every failed attempt also costs
+    # ROUTER_FAILURE_PENALTY_SECONDS. Models that keep failing are skipped
+    # until a probe succeeds after the cool-down, which doubles per failed probe
+    AUTO_MODEL = "Auto"
+    ROUTER_MODELS = MODELS
+    ROUTER_WINDOW = 100
+    ROUTER_MIN_SAMPLES = 3
+    ROUTER_EXPLORE_RATE = float(os.getenv("ROUTER_EXPLORE_RATE", 0.05))
+    ROUTER_LATENCY_PERCENTILE = 0.9
+    ROUTER_MIN_SUCCESS_RATE = 0.05
+    ROUTER_FAILURE_PENALTY_SECONDS = 1.0
+    ROUTER_BREAKER_FAILURES = 3
+    ROUTER_BREAKER_COOLDOWN_SECONDS = 30.0
+    ROUTER_BREAKER_MAX_COOLDOWN_SECONDS = 600.0
+
+    WARM_UP_CLIENTS = os.getenv("WARM_UP_CLIENTS", "true").lower() == "true"
+
     MAX_RETRIES = 3
+    RETRY_BASE_DELAY = 0.5
+    RETRY_MAX_DELAY = 8.0
+
+    # ask providers for a JSON object response where the model supports it
+    JSON_MODE = os.getenv("JSON_MODE", "true").lower() == "true"
+    JSON_MODE_UNSUPPORTED_MODELS = []
+
+    # prompt token budget per chat request, leaves room for the model's answer
+    DEFAULT_CONTEXT_TOKEN_BUDGET = 6000
+    CONTEXT_TOKEN_BUDGETS = {
+        "gpt-4o-mini": 16000,
+        "llama-3.1-8b-instant": 6000,
+    }
+    CHAT_SUMMARY_MAX_TOKENS = 400
+
+    # chat-to-quiz context: chunk size of the conversation index and the
+    # token budget of the slice sent with each question prompt
+    CHAT_CONTEXT_CHUNK_TOKENS = 120
+    CHAT_CONTEXT_TOKEN_BUDGET = 800
+
+    # hedged requests: when a call is slower than HEDGE_PERCENTILE of the model's
+    # recent latency, the same request is sent to a backup model as well
+    HEDGING_ENABLED = os.getenv("HEDGING_ENABLED", "false").lower() == "true"
+    HEDGE_PERCENTILE = 0.9
+    HEDGE_MIN_SAMPLES = 20
+    HEDGE_DEFAULT_DELAY = 5.0
+    HEDGE_BUDGET_RATIO = 0.1
+    HEDGE_BUDGET_BURST = 5.0
+    HEDGE_DEFAULT_BACKUP = "llama-3.1-8b-instant"
+    HEDGE_BACKUP_MODELS = {
+        "llama-3.1-8b-instant": "openai/gpt-oss-20b",
+    }
+
+    # process-wide requests and tokens per minute for each model, queued by
+    # priority (chat, quiz, background); None leaves that limit off
+    RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_DEFAULTS = {
+        "groq": {"rpm": 30, "tpm": 6000},
+        "openai": {"rpm": 500, "tpm": 200000},
+    }
+    RATE_LIMITS = {
+        "openai/gpt-oss-120b": {"rpm": 30, "tpm": 8000},
+        "openai/gpt-oss-20b": {"rpm": 30, "tpm": 8000},
+        "meta-llama/llama-4-scout-17b-16e-instruct": {"rpm": 30, "tpm": 30000},
+        "llama-3.3-70b-versatile": {"rpm": 30, "tpm": 12000},
+    }
+    # tokens reserved for the answer until the provider reports actual usage
+    RATE_LIMIT_OUTPUT_TOKENS = 512
+    # pause after a 429 that carries no Retry-After header
+    RATE_LIMIT_DEFAULT_RETRY_AFTER = 5.0
+    RATE_LIMIT_MAX_WAIT_SECONDS = float(os.getenv("RATE_LIMIT_MAX_WAIT_SECONDS", 120))
+
+    GENERATION_CONCURRENCY = int(os.getenv("GENERATION_CONCURRENCY", 4))
+
+    # identical quiz requests in flight share one generation; shared, shuffle
+    # (same questions reordered per requester) or variants (each requester
+    # samples a pool SINGLE_FLIGHT_VARIANT_POOL_FACTOR times larger)
+    SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+    SINGLE_FLIGHT_MODE = os.getenv("SINGLE_FLIGHT_MODE", "shuffle")
+    SINGLE_FLIGHT_VARIANT_POOL_FACTOR = 2.0
+    # finished generations stay joinable this long for late arrivals; 0 only
+    # shares running ones, so a user asking again gets a fresh quiz
+    SINGLE_FLIGHT_LINGER_SECONDS = float(os.getenv("SINGLE_FLIGHT_LINGER_SECONDS", 0))
+
+    # concurrent LLM calls per provider for headless batch generation
+    BATCH_PROVIDER_CONCURRENCY = {"groq": 4, "openai": 8}
+
+    # questions requested per LLM call, 1 keeps one prompt per question
+    GENERATION_BATCH_SIZE = int(os.getenv("GENERATION_BATCH_SIZE", 1))
+
+    CACHE_ENABLED = os.getenv("CACHE_ENABLED", "false").lower() == "true"
+    CACHE_DIR = os.getenv("CACHE_DIR", "cache")
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 256))
+    CACHE_MAX_DISK_ENTRIES = int(os.getenv("CACHE_MAX_DISK_ENTRIES", 10000))
+    CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", 7 * 24 * 3600))
+    # cached variants kept per key before repeat requests are served from cache
+    CACHE_POOL_SIZE = int(os.getenv("CACHE_POOL_SIZE", 5))
+
+    PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "false").lower() == "true"
+    PREFETCH_STOCK_DEPTH = int(os.getenv("PREFETCH_STOCK_DEPTH", 10))
+    PREFETCH_MAX_AGE_SECONDS = int(os.getenv("PREFETCH_MAX_AGE_SECONDS", 3600))
+    PREFETCH_TOP_KEYS = 20
+    PREFETCH_INTERVAL_SECONDS = 5.0
+    # pause between refills, and while user-facing quizzes are generating
+    PREFETCH_REFILL_PAUSE_SECONDS = 1.0
+    PREFETCH_BUSY_BACKOFF_SECONDS = 2.0
+
+    QUESTION_BANK_ENABLED = (
+        os.getenv("QUESTION_BANK_ENABLED", "false").lower() == "true"
+    )
+    QUESTION_BANK_PATH = os.getenv("QUESTION_BANK_PATH", "data/question_bank.sqlite3")
+    # assemble quizzes from unseen bank questions before generating new ones
+    QUESTION_BANK_SERVE = True
+    QUESTION_BANK_MAX_AGE_SECONDS = 30 * 24 * 3600
+
+    RESULTS_DB_PATH = os.getenv("RESULTS_DB_PATH", "results/results.sqlite3")
+    RESULTS_BATCH_SIZE = 50
+    RESULTS_FLUSH_SECONDS = 5.0
+
+    # offline stand-in for the providers, used by the benchmarks
+    FAKE_LLM = os.getenv("FAKE_LLM", "false").lower() == "true"
+    FAKE_LLM_LATENCY = float(os.getenv("FAKE_LLM_LATENCY", 0.2))
+    FAKE_LLM_LATENCY_SPREAD = float(os.getenv("FAKE_LLM_LATENCY_SPREAD", 0.5))
+    # fixed, uniform or lognormal
+    FAKE_LLM_LATENCY_DISTRIBUTION = os.getenv(
+        "FAKE_LLM_LATENCY_DISTRIBUTION", "lognormal"
+    )
+    FAKE_LLM_FAILURE_RATE = float(os.getenv("FAKE_LLM_FAILURE_RATE", 0.0))
+    FAKE_LLM_MALFORMED_RATE = float(os.getenv("FAKE_LLM_MALFORMED_RATE", 0.0))
+    FAKE_LLM_SEED = int(os.getenv("FAKE_LLM_SEED", 0))
+
+    # pages call the API service instead of the models when this is set
+    API_BASE_URL = os.getenv("API_BASE_URL", "")
+    API_HOST = os.getenv("API_HOST", "127.0.0.1")
+    API_PORT = int(os.getenv("API_PORT", 8000))
+    API_WORKERS = int(os.getenv("API_WORKERS", 1))
+    API_MAX_CONCURRENT_GENERATIONS = int(
+        os.getenv("API_MAX_CONCURRENT_GENERATIONS", 16)
+    )
+    API_MAX_CONCURRENT_CHATS = int(os.getenv("API_MAX_CONCURRENT_CHATS", 64))
+    API_QUEUE_TIMEOUT_SECONDS = 5.0
+    API_GENERATION_TIMEOUT_SECONDS = 120.0
+    API_CHAT_TIMEOUT_SECONDS = 60.0
+    API_MAX_QUESTIONS = 20
+    API_MAX_BODY_BYTES = 1024 * 1024
+
+    # log records are written by a background thread; json or text lines,
+    # rotated at LOG_ROTATE_WHEN and whenever the file exceeds LOG_MAX_BYTES
+    LOG_DIR = os.getenv("LOG_DIR", "logs")
+    LOG_FILE_NAME = os.getenv("LOG_FILE_NAME", "study_buddy.log")
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+    LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", 20 * 1024 * 1024))
+    LOG_ROTATE_WHEN = "midnight"
+    LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", 14))
+    # records logged while this many are waiting to be written are dropped
+    LOG_QUEUE_SIZE = 10000
+
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    # Prometheus text exporters, a local /metrics endpoint and/or a file
+    METRICS_PORT = int(os.getenv("METRICS_PORT", 0))
+    METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+    METRICS_FILE = os.getenv("METRICS_FILE", "")
+    METRICS_FILE_INTERVAL_SECONDS = 15.0
+
+    # chats kept in memory across all sessions, the rest are reloaded from disk
+    CHAT_STORE_PATH = os.getenv("CHAT_STORE_PATH", "data/chat_sessions.sqlite3")
+    CHAT_STORE_MAX_ACTIVE = int(os.getenv("CHAT_STORE_MAX_ACTIVE", 200))
+    CHAT_STORE_MAX_AGE_SECONDS = 7 * 24 * 3600
+
+    # questions shown per page of the quiz and results, 0 shows them all
+    QUIZ_PAGE_SIZE = int(os.getenv("QUIZ_PAGE_SIZE", 0))
+
+    DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+    # MinHash similarity of question text and options above which two
+    # questions count as near-duplicates
+    DEDUP_SIMILARITY_THRESHOLD = float(os.getenv("DEDUP_SIMILARITY_THRESHOLD", 0.5))
+    DEDUP_HISTORY_SIZE = 50
+    DEDUP_MAX_ROUNDS = 2
 
 
 settings = Settings()
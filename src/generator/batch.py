@@ -0,0 +1,253 @@
+"""
+Headless batch quiz generation.
+
+    python -m src.generator.batch jobs.jsonl --output quizzes.jsonl
+
+Each input line is a job such as
+    {"topic": "Photosynthesis", "question_type": "Single Choice",
+     "difficulty": "Medium", "count": 5, "model": "llama-3.1-8b-instant"}
+where only "topic" is required. Results are appended to the output file as
+each job finishes. Jobs already written there with status "ok" are skipped,
+so an interrupted run resumes where it stopped.
+"""
+
+import sys
+import json
+import time
+import asyncio
+import hashlib
+import argparse
+from collections import Counter
+from src.config.settings import settings
+from src.common.logger import get_logger
+from src.generator.quiz_builder import QUESTION_SCHEMAS, QuizBuilder
+from src.llms.llm_client import get_provider
+
+logger = get_logger(__name__)
+
+QUESTION_TYPE_ALIASES = {
+    "mcq": "Single Choice",
+    "single_choice": "Single Choice",
+    "multiple_answer": "Multiple Choice",
+    "multiple_choice": "Multiple Choice",
+    "fill_blank": "Fill in the Blank",
+    "fill_in_the_blank": "Fill in the Blank",
+}
+
+
+def normalize_job(raw: dict, default_model: str) -> dict:
+    if not raw.get("topic"):
+        raise ValueError("job has no topic")
+
+    question_type = raw.get("question_type", "Single Choice")
+    question_type = QUESTION_TYPE_ALIASES.get(question_type.lower(), question_type)
+    if question_type not in QUESTION_SCHEMAS:
+        raise ValueError(f"unknown question type {question_type}")
+
+    count = int(raw.get("count", 5))
+    if count < 1:
+        raise ValueError(f"count must be at least 1, got {count}")
+
+    return {
+        "topic": raw["topic"],
+        "question_type": question_type,
+        "difficulty": raw.get("difficulty", "Medium"),
+        "count": count,
+        "model": raw.get("model", default_model),
+    }
+
+
+def read_jobs(path: str, default_model: str):
+    """Returns (job_id, job) pairs, with ids stable across runs of the same file."""
+    jobs = []
+    seen = Counter()
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                raw = json.loads(line)
+                job = normalize_job(raw, default_model)
+            except Exception as e:
+                logger.error("Skipping job on line %d : %s", line_number, e)
+                continue
+
+            if raw.get("id"):
+                job_id = str(raw["id"])
+            else:
+                digest = hashlib.sha1(
+                    json.dumps(job, sort_keys=True).encode("utf-8")
+                ).hexdigest()[:16]
+                # identical jobs are numbered so each one still runs
+                seen[digest] += 1
+                job_id = f"{digest}-{seen[digest]}"
+            jobs.append((job_id, job))
+    return jobs
+
+
+def completed_job_ids(path: str):
+    done = set()
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # a line cut short by an interrupted run
+                if record.get("status") == "ok":
+                    done.add(record["job_id"])
+    except FileNotFoundError:
+        pass
+    return done
+
+
+class BatchRunner:
+    """
+    Runs quiz jobs on one event loop. LLM calls are bounded per provider by a
+    shared semaphore, so a large batch cannot exceed a provider's
+    concurrency. Jobs in flight are bounded the same way so they finish, and
+    are checkpointed, steadily instead of all at the end.
+    """
+
+    def __init__(self, output_path: str, provider_concurrency: dict, use_stock=False):
+        self.output_path = output_path
+        self.provider_concurrency = provider_concurrency
+        self.use_stock = use_stock
+        self.generators = {}
+        self.stats = Counter()
+        self.started = None
+
+    def _generator(self, model: str):
+        from src.generator.question_generator import QuestionGenerator
+
+        if model not in self.generators:
+            self.generators[model] = QuestionGenerator(model, priority="background")
+        return self.generators[model]
+
+    async def _run_job(self, job_id, job, builder, job_slots):
+        async with job_slots:
+            start = time.perf_counter()
+            try:
+                outcomes = await builder.agenerate(
+                    self._generator(job["model"]),
+                    job["topic"],
+                    job["question_type"],
+                    job["difficulty"],
+                    job["count"],
+                )
+            except Exception as e:
+                outcomes = [e] * job["count"]
+
+        questions = [
+            QuizBuilder.to_question_dict(job["question_type"], o)
+            for o in outcomes
+            if not isinstance(o, Exception)
+        ]
+        errors = sorted({str(o) for o in outcomes if isinstance(o, Exception)})
+        status = "ok" if not errors else "partial" if questions else "failed"
+
+        return {
+            "job_id": job_id,
+            **job,
+            "status": status,
+            "questions": questions,
+            "errors": errors,
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+
+    def _report(self, total: int, final=False):
+        elapsed = time.perf_counter() - self.started
+        done = self.stats["ok"] + self.stats["partial"] + self.stats["failed"]
+        line = (
+            f"{done}/{total} jobs ({self.stats['ok']} ok, "
+            f"{self.stats['partial']} partial, {self.stats['failed']} failed), "
+            f"{self.stats['questions']} questions in {elapsed:.1f}s, "
+            f"{done / elapsed:.2f} jobs/s, "
+            f"{self.stats['questions'] / elapsed:.2f} questions/s"
+        )
+        if final:
+            logger.info("Batch generation finished : %s", line)
+            line = f"Finished: {line}"
+        print(line, file=sys.stderr)
+
+    async def run(self, jobs):
+        builders, job_slots = {}, {}
+        for _, job in jobs:
+            provider = get_provider(job["model"])
+            if provider not in builders:
+                limit = max(1, self.provider_concurrency.get(provider, 4))
+                builders[provider] = QuizBuilder(
+                    "batch",
+                    semaphore=asyncio.Semaphore(limit),
+                    use_stock=self.use_stock,
+                    # identical jobs are meant to produce separate quizzes
+                    coalesce=False,
+                )
+                job_slots[provider] = asyncio.Semaphore(limit)
+
+        self.started = time.perf_counter()
+        tasks = []
+        for job_id, job in jobs:
+            provider = get_provider(job["model"])
+            tasks.append(
+                asyncio.create_task(
+                    self._run_job(job_id, job, builders[provider], job_slots[provider])
+                )
+            )
+
+        with open(self.output_path, "a", encoding="utf-8") as output:
+            # written in completion order, each line is the checkpoint for its job
+            for finished in asyncio.as_completed(tasks):
+                record = await finished
+                output.write(json.dumps(record) + "\n")
+                output.flush()
+
+                self.stats[record["status"]] += 1
+                self.stats["questions"] += len(record["questions"])
+                self._report(len(jobs))
+
+        self._report(len(jobs), final=True)
+        return dict(self.stats)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Generate quizzes for a JSONL file of jobs."
+    )
+    parser.add_argument("jobs", help="input JSONL, one job per line")
+    parser.add_argument("--output", required=True, help="output JSONL, appended to")
+    parser.add_argument("--model", default=settings.MODELS[-1], help="default model")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        help="concurrent LLM calls per provider, overrides BATCH_PROVIDER_CONCURRENCY",
+    )
+    parser.add_argument(
+        "--use-stock",
+        action="store_true",
+        help="serve prefetched and banked questions instead of always generating",
+    )
+    args = parser.parse_args(argv)
+
+    jobs = read_jobs(args.jobs, args.model)
+    done = completed_job_ids(args.output)
+    pending = [(job_id, job) for job_id, job in jobs if job_id not in done]
+    print(
+        f"{len(jobs)} jobs, {len(jobs) - len(pending)} already done, "
+        f"{len(pending)} to run",
+        file=sys.stderr,
+    )
+    if not pending:
+        return 0
+
+    concurrency = dict(settings.BATCH_PROVIDER_CONCURRENCY)
+    if args.concurrency:
+        concurrency = {provider: args.concurrency for provider in ("groq", "openai")}
+
+    runner = BatchRunner(args.output, concurrency, use_stock=args.use_stock)
+    stats = asyncio.run(runner.run(pending))
+    return 0 if not stats.get("failed") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
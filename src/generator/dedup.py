@@ -0,0 +1,162 @@
+import re
+import random
+import hashlib
+import threading
+from collections import OrderedDict, deque
+from src.config.settings import settings
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+
+def _shingles(text: str, size: int = 3):
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    if len(tokens) <= size:
+        return {" ".join(tokens)}
+    return {" ".join(tokens[i : i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def _hash(shingle: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(), "big"
+    )
+
+
+class QuestionDeduplicator:
+    """
+    MinHash based near-duplicate detection over question text and options.
+    Questions are compared with the rest of the quiz and with the recent
+    history of questions generated for the same topic and question type.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.5,
+        num_permutations: int = 64,
+        history_size: int = 50,
+        max_topics: int = 1000,
+    ):
+        self.threshold = threshold
+        self.history_size = history_size
+        self.max_topics = max_topics
+
+        # fixed seed so signatures stay comparable across processes
+        rng = random.Random(1337)
+        self.permutations = [
+            (rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME))
+            for _ in range(num_permutations)
+        ]
+
+        self.history = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.checked = 0
+        self.duplicates_in_quiz = 0
+        self.duplicates_in_history = 0
+
+    @staticmethod
+    def history_key(topic, question_type: str) -> str:
+        text = "\n".join(topic) if isinstance(topic, list) else topic
+        normalized = " ".join(text.lower().split())
+        return (
+            f"{question_type}|{hashlib.sha256(normalized.encode('utf-8')).hexdigest()}"
+        )
+
+    def signature(self, question):
+        text = " ".join([question.question, *sorted(getattr(question, "options", []))])
+        hashes = [_hash(s) for s in _shingles(text)]
+        return tuple(
+            min(((a * h + b) % MERSENNE_PRIME) & MAX_HASH for h in hashes)
+            for a, b in self.permutations
+        )
+
+    @staticmethod
+    def similarity(first, second) -> float:
+        return sum(x == y for x, y in zip(first, second)) / len(first)
+
+    def is_duplicate(
+        self, key: str, signature, quiz_signatures, check_history: bool = True
+    ) -> bool:
+        with self._lock:
+            self.checked += 1
+
+            for other in quiz_signatures:
+                if self.similarity(signature, other) >= self.threshold:
+                    self.duplicates_in_quiz += 1
+                    return True
+
+            for other in self.history.get(key, ()) if check_history else ():
+                if self.similarity(signature, other) >= self.threshold:
+                    self.duplicates_in_history += 1
+                    return True
+
+        return False
+
+    def remember(self, key: str, signatures):
+        with self._lock:
+            history = self.history.get(key)
+            if history is None:
+                history = deque(maxlen=self.history_size)
+            history.extend(signatures)
+
+            self.history[key] = history
+            self.history.move_to_end(key)
+            while len(self.history) > self.max_topics:
+                self.history.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "checked": self.checked,
+                "duplicates_in_quiz": self.duplicates_in_quiz,
+                "duplicates_in_history": self.duplicates_in_history,
+            }
+
+
+_deduplicator = None
+_deduplicator_lock = threading.Lock()
+
+
+def get_deduplicator():
+    global _deduplicator
+
+    if not settings.DEDUP_ENABLED:
+        return None
+
+    with _deduplicator_lock:
+        if _deduplicator is None:
+            _deduplicator = QuestionDeduplicator(
+                threshold=settings.DEDUP_SIMILARITY_THRESHOLD,
+                history_size=settings.DEDUP_HISTORY_SIZE,
+            )
+            _export_metrics(_deduplicator)
+        return _deduplicator
+
+
+def _export_metrics(deduplicator: QuestionDeduplicator):
+    from src.common.metrics import registry
+
+    registry.callback(
+        "study_buddy_dedup_checked_total",
+        "Generated questions checked for duplicates.",
+        (),
+        lambda: {(): deduplicator.stats()["checked"]},
+        kind="counter",
+    )
+
+    def duplicates():
+        stats = deduplicator.stats()
+        return {
+            ("quiz",): stats["duplicates_in_quiz"],
+            ("history",): stats["duplicates_in_history"],
+        }
+
+    registry.callback(
+        "study_buddy_dedup_duplicates_total",
+        "Duplicate questions found, by scope (quiz, history).",
+        ("scope",),
+        duplicates,
+        kind="counter",
+    )
@@ -0,0 +1,75 @@
+from src.common.metrics import registry
+
+# counted here; requests, attempts and failures come from the generator metrics
+EVENTS = (
+    "retries",
+    "parse_failures",
+    "validation_failures",
+    "llm_errors",
+    "repaired",
+    "json_mode",
+)
+COUNTERS = ("requests", "attempts", *EVENTS, "failed")
+
+GENERATION_EVENTS = registry.counter(
+    "study_buddy_generation_events_total",
+    "Question generator events by kind (" + ", ".join(EVENTS) + ").",
+    ("model", "event"),
+)
+
+
+class GenerationStats:
+    """
+    Per-model parse failure and retry rates, reported from counters in the
+    metrics registry.
+    """
+
+    def record(self, model: str, counter: str, amount: int = 1):
+        GENERATION_EVENTS.inc(model, counter, amount=amount)
+
+    def report(self):
+        from src.generator.question_generator import (
+            GENERATION_ATTEMPTS,
+            GENERATION_REQUESTS,
+        )
+
+        counts = {}
+
+        def add(model, counter, value):
+            counts.setdefault(model, dict.fromkeys(COUNTERS, 0))[counter] += value
+
+        for (model, counter), value in GENERATION_EVENTS.values().items():
+            add(model, counter, value)
+        for (model, _, outcome), value in GENERATION_REQUESTS.values().items():
+            add(model, "requests", value)
+            if outcome == "failed":
+                add(model, "failed", value)
+        for (model, _, _), value in GENERATION_ATTEMPTS.values().items():
+            add(model, "attempts", value)
+
+        report = {}
+        for model, model_counts in counts.items():
+            attempts = model_counts["attempts"] or 1
+            requests = model_counts["requests"] or 1
+            report[model] = {
+                **model_counts,
+                "parse_failure_rate": (
+                    model_counts["parse_failures"] + model_counts["validation_failures"]
+                )
+                / attempts,
+                "retry_rate": model_counts["retries"] / requests,
+                "failure_rate": model_counts["failed"] / requests,
+            }
+        return report
+
+    def reset(self):
+        from src.generator.question_generator import (
+            GENERATION_ATTEMPTS,
+            GENERATION_REQUESTS,
+        )
+
+        for counter in (GENERATION_EVENTS, GENERATION_REQUESTS, GENERATION_ATTEMPTS):
+            counter.reset()
+
+
+generation_stats = GenerationStats()
@@ -0,0 +1,58 @@
+import re
+import ast
+import json
+
+CODE_FENCE = re.compile(r"```(?:json|JSON)?\s*(.*?)```", re.DOTALL)
+TRAILING_COMMA = re.compile(r",\s*([}\]])")
+SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})
+
+
+class JSONRepairError(ValueError):
+    pass
+
+
+def _outermost_block(text: str):
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    if not starts:
+        raise JSONRepairError("No JSON object found in the response")
+
+    start = min(starts)
+    closing = "}" if text[start] == "{" else "]"
+    end = text.rfind(closing)
+    if end <= start:
+        raise JSONRepairError("Unterminated JSON object in the response")
+    return text[start : end + 1]
+
+
+def extract_json(content: str):
+    """
+    Parse the JSON object in an LLM response. Returns the parsed value and
+    whether a local repair was needed (code fences, surrounding prose,
+    trailing commas, smart quotes or Python-style literals).
+    """
+
+    try:
+        return json.loads(content), False
+    except (TypeError, ValueError):
+        pass
+
+    fenced = CODE_FENCE.search(content)
+    text = fenced.group(1) if fenced else content
+    text = _outermost_block(text.translate(SMART_QUOTES))
+
+    try:
+        return json.loads(text), True
+    except ValueError:
+        pass
+
+    text = TRAILING_COMMA.sub(r"\1", text)
+    try:
+        return json.loads(text), True
+    except ValueError:
+        pass
+
+    try:
+        # single quoted keys/strings and True/False/None
+        return ast.literal_eval(text), True
+    except (ValueError, SyntaxError) as e:
+        raise JSONRepairError(f"Could not repair JSON response: {e}")
@@ -0,0 +1,253 @@
+import time
+import heapq
+import threading
+from functools import partial
+from contextlib import contextmanager
+from collections import deque
+from src.config.settings import settings
+from src.common.logger import get_logger
+from src.generator.question_generator import QuestionGenerator
+
+GENERATOR_METHODS = {
+    "Single Choice": "generate_mcq",
+    "Multiple Choice": "generate_multiple_answer",
+    "Fill in the Blank": "generate_fill_blank",
+}
+
+
+def normalize_topic(topic: str) -> str:
+    return " ".join(topic.lower().split())
+
+
+_interactive = 0
+_interactive_lock = threading.Lock()
+
+
+@contextmanager
+def interactive_generation():
+    """Marks a user-facing generation in flight; prefetching waits for it."""
+    global _interactive
+
+    with _interactive_lock:
+        _interactive += 1
+    try:
+        yield
+    finally:
+        with _interactive_lock:
+            _interactive -= 1
+
+
+def interactive_in_flight() -> bool:
+    return _interactive > 0
+
+
+class QuestionPrefetcher:
+    """
+    Keeps a stock of validated questions for the most requested
+    (model, question type, difficulty, topic) keys. A background thread tops
+    the stock up one question at a time, pausing `refill_pause_seconds`
+    between questions and backing off while interactive generation is in
+    flight, so it never competes with users for more than a single request.
+
+    Popularity decays with a half-life of `max_age_seconds`, and keys not
+    requested for `forget_after_seconds` (three times that by default) are
+    dropped along with their stock.
+    """
+
+    def __init__(
+        self,
+        depth: int = 10,
+        max_age_seconds: int = 3600,
+        top_keys: int = 20,
+        interval_seconds: float = 5.0,
+        refill_pause_seconds: float = 1.0,
+        busy_backoff_seconds: float = 2.0,
+        forget_after_seconds: float = None,
+        generator_factory=partial(QuestionGenerator, priority="background"),
+    ):
+        self.depth = depth
+        self.max_age_seconds = max_age_seconds
+        self.forget_after_seconds = forget_after_seconds or 3 * max_age_seconds
+        self.top_keys = top_keys
+        self.interval_seconds = interval_seconds
+        self.refill_pause_seconds = refill_pause_seconds
+        self.busy_backoff_seconds = busy_backoff_seconds
+        self.generator_factory = generator_factory
+
+        # key -> (decayed request count, time of the last request)
+        self.popularity = {}
+        self.topics = {}
+        self.stock = {}
+
+        self.requested = 0
+        self.served = 0
+        self.generated = 0
+        self.expired = 0
+
+        self._generators = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.logger = get_logger(self.__class__.__name__)
+
+    @staticmethod
+    def make_key(model: str, question_type: str, difficulty: str, topic: str):
+        return (model, question_type, difficulty.lower(), normalize_topic(topic))
+
+    def _score(self, key, now):
+        score, last = self.popularity[key]
+        return score * 0.5 ** ((now - last) / self.max_age_seconds)
+
+    def record_request(self, key, topic: str):
+        now = time.time()
+        with self._lock:
+            score = self._score(key, now) if key in self.popularity else 0.0
+            self.popularity[key] = (score + 1, now)
+            self.topics[key] = topic
+
+    def _forget_idle(self, now):
+        idle = [
+            key
+            for key, (_, last) in self.popularity.items()
+            if now - last > self.forget_after_seconds
+        ]
+        for key in idle:
+            del self.popularity[key]
+            del self.topics[key]
+            self.expired += len(self.stock.pop(key, ()))
+
+    def _drop_stale(self, key, now):
+        stock = self.stock.get(key)
+        while stock and now - stock[0][0] > self.max_age_seconds:
+            stock.popleft()
+            self.expired += 1
+
+    def take(self, key, count: int):
+        now = time.time()
+        with self._lock:
+            self.requested += count
+            self._drop_stale(key, now)
+            stock = self.stock.get(key, deque())
+            taken = [stock.popleft()[1] for _ in range(min(count, len(stock)))]
+            self.served += len(taken)
+            return taken
+
+    def _next_refill(self):
+        now = time.time()
+        with self._lock:
+            self._forget_idle(now)
+            popular = heapq.nlargest(
+                self.top_keys,
+                self.popularity,
+                key=lambda key: self._score(key, now),
+            )
+            for key in popular:
+                self._drop_stale(key, now)
+                if len(self.stock.get(key, ())) < self.depth:
+                    return key, self.topics[key]
+        return None, None
+
+    def _generator_for(self, model: str):
+        if model not in self._generators:
+            self._generators[model] = self.generator_factory(model)
+        return self._generators[model]
+
+    def refill_once(self) -> bool:
+        key, topic = self._next_refill()
+        if key is None:
+            return False
+
+        model, question_type, difficulty, _ = key
+        generate = getattr(self._generator_for(model), GENERATOR_METHODS[question_type])
+
+        try:
+            # stock should be fresh variants, not copies of cached ones
+            question = generate(topic=topic, difficulty=difficulty, use_cache=False)
+        except Exception as e:
+            self.logger.error(
+                "Prefetch failed for %s on %s : %s", question_type, model, e
+            )
+            return False
+
+        with self._lock:
+            self.stock.setdefault(key, deque()).append((time.time(), question))
+            self.generated += 1
+        return True
+
+    def _run(self):
+        while not self._stop.is_set():
+            if interactive_in_flight():
+                self._stop.wait(self.busy_backoff_seconds)
+            elif self.refill_once():
+                self._stop.wait(self.refill_pause_seconds)
+            else:
+                self._stop.wait(self.interval_seconds)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="question-prefetcher", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "requested": self.requested,
+                "served": self.served,
+                "hit_rate": self.served / self.requested if self.requested else 0.0,
+                "generated": self.generated,
+                "expired": self.expired,
+                "stock": {
+                    " | ".join(key[:3]) + f" | {key[3][:40]}": len(stock)
+                    for key, stock in self.stock.items()
+                },
+            }
+
+
+_prefetcher = None
+_prefetcher_lock = threading.Lock()
+
+
+def get_prefetcher():
+    global _prefetcher
+
+    if not settings.PREFETCH_ENABLED:
+        return None
+
+    with _prefetcher_lock:
+        if _prefetcher is None:
+            _prefetcher = QuestionPrefetcher(
+                depth=settings.PREFETCH_STOCK_DEPTH,
+                max_age_seconds=settings.PREFETCH_MAX_AGE_SECONDS,
+                top_keys=settings.PREFETCH_TOP_KEYS,
+                interval_seconds=settings.PREFETCH_INTERVAL_SECONDS,
+                refill_pause_seconds=settings.PREFETCH_REFILL_PAUSE_SECONDS,
+                busy_backoff_seconds=settings.PREFETCH_BUSY_BACKOFF_SECONDS,
+            )
+            _export_metrics(_prefetcher)
+            _prefetcher.start()
+        return _prefetcher
+
+
+def _export_metrics(prefetcher: QuestionPrefetcher):
+    from src.common.metrics import registry
+
+    events = ("requested", "served", "generated", "expired")
+    registry.callback(
+        "study_buddy_prefetch_questions_total",
+        "Prefetched questions by event (" + ", ".join(events) + ").",
+        ("event",),
+        lambda: {(event,): prefetcher.stats()[event] for event in events},
+        kind="counter",
+    )
+    registry.callback(
+        "study_buddy_prefetch_stock",
+        "Prefetched questions in stock across all keys.",
+        (),
+        lambda: {(): sum(prefetcher.stats()["stock"].values())},
+    )
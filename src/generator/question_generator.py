@@ -1,65 +1,511 @@
-from langchain.output_parsers import PydanticOutputParser
+import time
+import random
+import asyncio
 from langchain.prompts import PromptTemplate
+from pydantic import BaseModel, ValidationError
 from src.models.question_schemas import (
     MCQQuestion,
     FillBlankQuestion,
     MultipleAnswerQuestion,
+    QuestionBatch,
+    MCQQuestionBatch,
+    FillBlankQuestionBatch,
+    MultipleAnswerQuestionBatch,
 )
 from src.prompts.templates import (
     mcq_prompt_template,
     fill_blank_prompt_template,
     multiple_answer_prompt_template,
+    mcq_batch_prompt_template,
+    fill_blank_batch_prompt_template,
+    multiple_answer_batch_prompt_template,
 )
-from src.llms.llm_client import get_groq_llm, get_openai_llm
+from src.llms.llm_client import get_llm
+from src.llms.hedging import HedgedLLM
+from src.llms.router import get_model_router
+from src.cache.generation_cache import GenerationCache, get_generation_cache
+from src.generator.json_repair import JSONRepairError, extract_json
+from src.generator.generation_stats import generation_stats
 from src.config.settings import settings
+from src.common.metrics import registry
 from src.common.logger import get_logger
 from src.common.custom_exception import CustomException
 
+PROMPTS = {
+    MCQQuestion.__name__: mcq_prompt_template,
+    FillBlankQuestion.__name__: fill_blank_prompt_template,
+    MultipleAnswerQuestion.__name__: multiple_answer_prompt_template,
+}
+
+# models that rejected the provider JSON mode at runtime
+_json_mode_unsupported = set(settings.JSON_MODE_UNSUPPORTED_MODELS)
+
+GENERATION_REQUESTS = registry.counter(
+    "study_buddy_generation_requests_total",
+    "Question generation requests by outcome (success, failed).",
+    ("model", "question_type", "outcome"),
+)
+GENERATION_SECONDS = registry.histogram(
+    "study_buddy_generation_seconds",
+    "Time to produce a parsed question, including retries.",
+    ("model", "question_type", "outcome"),
+)
+GENERATION_ATTEMPTS = registry.counter(
+    "study_buddy_generation_attempts_total",
+    "LLM attempts by outcome (success, llm_error, parse_failure, validation_failure).",
+    ("model", "question_type", "outcome"),
+)
+LLM_CALL_SECONDS = registry.histogram(
+    "study_buddy_llm_call_seconds",
+    "Latency of a single LLM call made by the question generator.",
+    ("model",),
+)
+LLM_TOKENS = registry.counter(
+    "study_buddy_llm_tokens_total",
+    "Tokens reported by the provider, by kind (input_tokens, output_tokens).",
+    ("model", "kind"),
+)
+CACHE_LOOKUPS = registry.counter(
+    "study_buddy_generation_cache_lookups_total",
+    "Generation cache lookups by result (hit, miss, bypass).",
+    ("model", "result"),
+)
+
 
 class QuestionGenerator:
 
-    def __init__(self, llm: str):
-        self.llm = get_openai_llm(llm) if llm.startswith("gpt") else get_groq_llm(llm)
-        self.logger = get_logger(self.__class__.__name__)
+    def __init__(self, llm: str, priority: str = "quiz"):
+        self.model = llm
+        self.priority = priority
+        # Auto picks a model for every attempt, so retries can move elsewhere
+        self.router = get_model_router() if llm == settings.AUTO_MODEL else None
+        self.llm = None if self.router else get_llm(llm, priority=priority)
+        self.logger = get_logger(self.__class__.__name__, model=llm)
+        self.cache = get_generation_cache()
+
+    @staticmethod
+    def _avoid_hint(avoid):
+        if not avoid:
+            return ""
+        listed = "\n".join(f"- {question}" for question in avoid)
+        return (
+            "Do NOT repeat or paraphrase any of these existing questions:\n"
+            f"{listed}\n\n"
+        )
+
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        # exponential backoff with full jitter
+        return random.uniform(
+            0, min(settings.RETRY_MAX_DELAY, settings.RETRY_BASE_DELAY * 2**attempt)
+        )
+
+    def _route(self):
+        """The model for the next attempt and its client."""
+        if self.router is None:
+            return self.model, self.llm
+        model = self.router.choose("quiz")
+        return model, get_llm(model, priority=self.priority)
+
+    def _report(self, model: str, outcome: str, start: float):
+        if self.router is None:
+            return
+        if outcome == "success":
+            self.router.record("quiz", model, "success", time.perf_counter() - start)
+        elif outcome == "llm_error":
+            self.router.record("quiz", model, "error")
+        else:
+            self.router.record(
+                "quiz", model, "parse_failure", time.perf_counter() - start
+            )
+
+    @staticmethod
+    def _invoke_kwargs(model: str):
+        if settings.JSON_MODE and model not in _json_mode_unsupported:
+            return {"response_format": {"type": "json_object"}}
+        return {}
+
+    @staticmethod
+    def _json_mode_rejected(error: Exception) -> bool:
+        """
+        Whether a 400 says the model does not support response_format. Other
+        400s, such as Groq's json_validate_failed for one bad answer or a
+        context length error, leave JSON mode on.
+        """
+        if getattr(error, "status_code", None) != 400:
+            return False
+        message = str(getattr(error, "body", None) or error).lower()
+        return "response_format" in message and any(
+            phrase in message
+            for phrase in ("not supported", "unsupported", "does not support")
+        )
+
+    def _handle_llm_error(self, error: Exception, kwargs, model: str):
+        generation_stats.record(model, "llm_errors")
+        if kwargs and self._json_mode_rejected(error):
+            self.logger.error("Disabling JSON mode for %s : %s", model, error)
+            _json_mode_unsupported.add(model)
+
+    @staticmethod
+    def _record_usage(response, start: float, model: str):
+        LLM_CALL_SECONDS.observe(time.perf_counter() - start, model)
+        usage = getattr(response, "usage_metadata", None) or {}
+        for kind in ("input_tokens", "output_tokens"):
+            if usage.get(kind):
+                LLM_TOKENS.inc(model, kind, amount=usage[kind])
+
+    @staticmethod
+    def _attempt_outcome(error: Exception) -> str:
+        # pydantic's ValidationError is itself a ValueError
+        if isinstance(error, ValidationError):
+            return "validation_failure"
+        if isinstance(error, ValueError):
+            return "parse_failure"
+        return "llm_error"
+
+    def _record_request(self, question_type: str, outcome: str, start: float):
+        GENERATION_REQUESTS.inc(self.model, question_type, outcome)
+        GENERATION_SECONDS.observe(
+            time.perf_counter() - start, self.model, question_type, outcome
+        )
+
+    def _call(self, text: str, model: str, llm) -> str:
+        kwargs = self._invoke_kwargs(model)
+        if kwargs:
+            generation_stats.record(model, "json_mode")
+
+        start = time.perf_counter()
+        try:
+            response = llm.invoke(text, **kwargs)
+        except Exception as e:
+            self._handle_llm_error(e, kwargs, model)
+            raise
+
+        self._record_usage(response, start, model)
+        return response.content
+
+    async def _acall(
+        self, text: str, model: str, llm, schema: type[BaseModel] = None
+    ) -> str:
+        kwargs = self._invoke_kwargs(model)
+        if kwargs:
+            generation_stats.record(model, "json_mode")
+
+        start = time.perf_counter()
+        try:
+            if schema is not None and isinstance(llm, HedgedLLM):
+                # take the first hedged response that actually parses
+                response = await llm.arace(
+                    text,
+                    validate=lambda r: self._is_valid(r.content, schema),
+                    **kwargs,
+                )
+            else:
+                response = await llm.ainvoke(text, **kwargs)
+        except Exception as e:
+            self._handle_llm_error(e, kwargs, model)
+            raise
+
+        self._record_usage(response, start, model)
+        return response.content
+
+    @staticmethod
+    def _extract(content: str, model: str):
+        try:
+            data, repaired = extract_json(content)
+        except JSONRepairError:
+            generation_stats.record(model, "parse_failures")
+            raise
+
+        if repaired:
+            generation_stats.record(model, "repaired")
+        return data
+
+    @staticmethod
+    def _is_valid(content: str, schema: type[BaseModel]) -> bool:
+        try:
+            schema.model_validate(extract_json(content)[0])
+            return True
+        except Exception:
+            return False
+
+    def _parse(self, content: str, schema: type[BaseModel], model: str):
+        data = self._extract(content, model)
+        try:
+            return schema.model_validate(data)
+        except ValidationError:
+            generation_stats.record(model, "validation_failures")
+            raise
 
     def _retry_and_parse(
-        self, prompt: PromptTemplate, parser: PydanticOutputParser, topic, difficulty
+        self,
+        prompt: PromptTemplate,
+        schema: type[BaseModel],
+        topic,
+        difficulty,
+        avoid=None,
     ):
+        question_type = schema.__name__
+        start = time.perf_counter()
+        text = prompt.format(
+            topic=topic, difficulty=difficulty, avoid=self._avoid_hint(avoid)
+        )
+
         for attempt in range(settings.MAX_RETRIES):
+            if attempt:
+                generation_stats.record(self.model, "retries")
+                time.sleep(self._backoff(attempt - 1))
+
+            model, llm = self._route()
+            attempt_start = time.perf_counter()
             try:
                 self.logger.info(
-                    f"Generating question for topic {topic} with difficulty {difficulty}"
+                    "Generating question for topic %s with difficulty %s",
+                    topic,
+                    difficulty,
+                    extra={"model": model},
+                )
+
+                parsed = self._parse(self._call(text, model, llm), schema, model)
+                self.logger.info(
+                    "Sucessfully parsed the question",
+                    extra={"model": model, "latency": time.perf_counter() - start},
                 )
+                GENERATION_ATTEMPTS.inc(model, question_type, "success")
+                self._report(model, "success", attempt_start)
+                self._record_request(question_type, "success", start)
+                return parsed
+
+            except Exception as e:
+                self.logger.error("Error coming : %s", e, extra={"model": model})
+                outcome = self._attempt_outcome(e)
+                GENERATION_ATTEMPTS.inc(model, question_type, outcome)
+                self._report(model, outcome, attempt_start)
+                if attempt == settings.MAX_RETRIES - 1:
+                    self._record_request(question_type, "failed", start)
+                    raise CustomException(
+                        f"Generation failed after {settings.MAX_RETRIES} attempts", e
+                    )
+
+    async def _aretry_and_parse(
+        self,
+        prompt: PromptTemplate,
+        schema: type[BaseModel],
+        topic,
+        difficulty,
+        avoid=None,
+    ):
+        question_type = schema.__name__
+        start = time.perf_counter()
+        text = prompt.format(
+            topic=topic, difficulty=difficulty, avoid=self._avoid_hint(avoid)
+        )
+
+        for attempt in range(settings.MAX_RETRIES):
+            if attempt:
+                generation_stats.record(self.model, "retries")
+                await asyncio.sleep(self._backoff(attempt - 1))
 
-                response = self.llm.invoke(
-                    prompt.format(topic=topic, difficulty=difficulty)
+            model, llm = self._route()
+            attempt_start = time.perf_counter()
+            try:
+                self.logger.info(
+                    "Generating question for topic %s with difficulty %s",
+                    topic,
+                    difficulty,
+                    extra={"model": model},
                 )
 
-                parsed = parser.parse(response.content)
-                self.logger.info("Sucessfully parsed the question")
+                content = await self._acall(text, model, llm, schema)
+                parsed = self._parse(content, schema, model)
+                self.logger.info(
+                    "Sucessfully parsed the question",
+                    extra={"model": model, "latency": time.perf_counter() - start},
+                )
+                GENERATION_ATTEMPTS.inc(model, question_type, "success")
+                self._report(model, "success", attempt_start)
+                self._record_request(question_type, "success", start)
                 return parsed
 
             except Exception as e:
-                self.logger.error(f"Error coming : {str(e)}")
+                self.logger.error("Error coming : %s", e, extra={"model": model})
+                outcome = self._attempt_outcome(e)
+                GENERATION_ATTEMPTS.inc(model, question_type, outcome)
+                self._report(model, outcome, attempt_start)
                 if attempt == settings.MAX_RETRIES - 1:
+                    self._record_request(question_type, "failed", start)
                     raise CustomException(
                         f"Generation failed after {settings.MAX_RETRIES} attempts", e
                     )
 
-    def generate_mcq(self, topic: str, difficulty: str = "medium") -> MCQQuestion:
+    async def _aretry_and_parse_batch(
+        self,
+        prompt: PromptTemplate,
+        batch_model: type[QuestionBatch],
+        topic,
+        difficulty,
+        count: int,
+        avoid=None,
+    ):
+        question_type = batch_model.item_model.__name__
+        start = time.perf_counter()
+        questions = []
 
-        try:
-            parser = PydanticOutputParser(pydantic_object=MCQQuestion)
+        for attempt in range(settings.MAX_RETRIES):
+            missing = count - len(questions)
+            if missing <= 0:
+                break
+
+            if attempt:
+                generation_stats.record(self.model, "retries")
+                await asyncio.sleep(self._backoff(attempt - 1))
+
+            model, llm = self._route()
+            attempt_start = time.perf_counter()
+            try:
+                self.logger.info(
+                    "Generating %d questions for topic %s with difficulty %s",
+                    missing,
+                    topic,
+                    difficulty,
+                    extra={"model": model},
+                )
+
+                content = await self._acall(
+                    prompt.format(
+                        topic=topic,
+                        difficulty=difficulty,
+                        count=missing,
+                        avoid=self._avoid_hint(
+                            (avoid or []) + [q.question for q in questions]
+                        ),
+                    ),
+                    model,
+                    llm,
+                )
+
+                data = self._extract(content, model)
+                items = data.get("questions", []) if isinstance(data, dict) else data
+                if not isinstance(items, list):
+                    generation_stats.record(model, "parse_failures")
+                    raise ValueError(
+                        "Batch response does not contain a list of questions"
+                    )
 
-            question = self._retry_and_parse(
-                mcq_prompt_template, parser, topic, difficulty
+                batch, errors = batch_model.validate_items(items)
+                questions.extend(batch.questions[:missing])
+
+                if errors:
+                    generation_stats.record(model, "validation_failures", len(errors))
+                    self.logger.error(
+                        "Dropped %d invalid batch items : %s", len(errors), errors[0]
+                    )
+                self.logger.info("Parsed %d batch questions", len(batch.questions))
+                # a batch with no valid item failed validation as a whole
+                outcome = "success" if batch.questions else "validation_failure"
+                GENERATION_ATTEMPTS.inc(model, question_type, outcome)
+                self._report(model, outcome, attempt_start)
+
+            except Exception as e:
+                self.logger.error("Error coming : %s", e, extra={"model": model})
+                outcome = self._attempt_outcome(e)
+                GENERATION_ATTEMPTS.inc(model, question_type, outcome)
+                self._report(model, outcome, attempt_start)
+
+        if not questions:
+            self._record_request(question_type, "failed", start)
+            raise CustomException(
+                f"Batch generation failed after {settings.MAX_RETRIES} attempts"
             )
+        self._record_request(question_type, "success", start)
+        return questions
+
+    def _cached(
+        self, prompt: PromptTemplate, topic, difficulty, avoid=None, lookup=True
+    ):
+        if self.cache is None:
+            return None, None
+
+        key = GenerationCache.make_key(self.model, prompt.template, topic, difficulty)
+        if not lookup:
+            return key, None
+        if avoid:
+            # a cached variant may be one of the questions to avoid
+            CACHE_LOOKUPS.inc(self.model, "bypass")
+            return key, None
+
+        question = self.cache.get(key)
+        if question is not None:
+            self.logger.info("Served question from generation cache")
+        CACHE_LOOKUPS.inc(self.model, "miss" if question is None else "hit")
+        return key, question
+
+    def _generate(
+        self,
+        prompt: PromptTemplate,
+        schema: type[BaseModel],
+        topic,
+        difficulty,
+        avoid=None,
+        use_cache=True,
+    ):
+        key, question = self._cached(prompt, topic, difficulty, avoid, use_cache)
+        if question is not None:
+            return question
 
-            if (
-                len(question.options) != 4
-                or question.correct_answer not in question.options
-            ):
-                raise ValueError("Invalid MCQ structure")
+        question = self._retry_and_parse(prompt, schema, topic, difficulty, avoid)
+
+        if key is not None:
+            self.cache.put(key, question)
+        return question
+
+    async def _agenerate(
+        self,
+        prompt: PromptTemplate,
+        schema: type[BaseModel],
+        topic,
+        difficulty,
+        avoid=None,
+        use_cache=True,
+    ):
+        # the cache's SQLite I/O stays off the shared event loop
+        key, question = await asyncio.to_thread(
+            self._cached, prompt, topic, difficulty, avoid, use_cache
+        )
+        if question is not None:
+            return question
+
+        question = await self._aretry_and_parse(
+            prompt, schema, topic, difficulty, avoid
+        )
+
+        if key is not None:
+            await asyncio.to_thread(self.cache.put, key, question)
+        return question
+
+    def generate_mcq(
+        self, topic: str, difficulty: str = "medium", avoid=None, use_cache=True
+    ) -> MCQQuestion:
+
+        try:
+            question = self._generate(
+                mcq_prompt_template, MCQQuestion, topic, difficulty, avoid, use_cache
+            )
+
+            self.logger.info("Generated a valid MCQ Question")
+            return question
+        except Exception as e:
+            self.logger.error("Failed to generate MCQ Question")
+            raise CustomException("MCQ generation failed", e)
+
+    async def agenerate_mcq(
+        self, topic: str, difficulty: str = "medium", avoid=None, use_cache=True
+    ) -> MCQQuestion:
+
+        try:
+            question = await self._agenerate(
+                mcq_prompt_template, MCQQuestion, topic, difficulty, avoid, use_cache
+            )
 
             self.logger.info("Generated a valid MCQ Question")
             return question
@@ -68,18 +514,38 @@ class QuestionGenerator:
             raise CustomException("MCQ generation failed", e)
 
     def generate_fill_blank(
-        self, topic: str, difficulty: str = "medium"
+        self, topic: str, difficulty: str = "medium", avoid=None, use_cache=True
     ) -> FillBlankQuestion:
 
         try:
-            parser = PydanticOutputParser(pydantic_object=FillBlankQuestion)
-
-            question = self._retry_and_parse(
-                fill_blank_prompt_template, parser, topic, difficulty
+            question = self._generate(
+                fill_blank_prompt_template,
+                FillBlankQuestion,
+                topic,
+                difficulty,
+                avoid,
+                use_cache,
             )
 
-            if "____" not in question.question:
-                raise ValueError("Fill in the blank should contain '____' ")
+            self.logger.info("Generated a valid fill blank Question")
+            return question
+        except Exception as e:
+            self.logger.error("Failed to generate fill blank Question")
+            raise CustomException("Fill blank generation failed", e)
+
+    async def agenerate_fill_blank(
+        self, topic: str, difficulty: str = "medium", avoid=None, use_cache=True
+    ) -> FillBlankQuestion:
+
+        try:
+            question = await self._agenerate(
+                fill_blank_prompt_template,
+                FillBlankQuestion,
+                topic,
+                difficulty,
+                avoid,
+                use_cache,
+            )
 
             self.logger.info("Generated a valid fill blank Question")
             return question
@@ -88,23 +554,94 @@ class QuestionGenerator:
             raise CustomException("Fill blank generation failed", e)
 
     def generate_multiple_answer(
-        self, topic: str, difficulty: str = "medium"
+        self, topic: str, difficulty: str = "medium", avoid=None, use_cache=True
     ) -> MultipleAnswerQuestion:
 
         try:
-            parser = PydanticOutputParser(pydantic_object=MultipleAnswerQuestion)
-
-            question = self._retry_and_parse(
-                multiple_answer_prompt_template, parser, topic, difficulty
+            question = self._generate(
+                multiple_answer_prompt_template,
+                MultipleAnswerQuestion,
+                topic,
+                difficulty,
+                avoid,
+                use_cache,
             )
 
-            if len(question.options) < 4 or not set(question.correct_answers).issubset(
-                set(question.options)
-            ):
-                raise ValueError("Invalid MCQ structure")
+            self.logger.info("Generated a valid MCQ Question")
+            return question
+        except Exception as e:
+            self.logger.error("Failed to generate MCQ Question")
+            raise CustomException("MCQ generation failed", e)
+
+    async def agenerate_multiple_answer(
+        self, topic: str, difficulty: str = "medium", avoid=None, use_cache=True
+    ) -> MultipleAnswerQuestion:
+
+        try:
+            question = await self._agenerate(
+                multiple_answer_prompt_template,
+                MultipleAnswerQuestion,
+                topic,
+                difficulty,
+                avoid,
+                use_cache,
+            )
 
             self.logger.info("Generated a valid MCQ Question")
             return question
         except Exception as e:
             self.logger.error("Failed to generate MCQ Question")
             raise CustomException("MCQ generation failed", e)
+
+    async def adraw_cached(
+        self, question_type: str, topic: str, difficulty: str, count: int
+    ):
+        """
+        Up to `count` distinct cached questions of the schema named
+        `question_type`. Lets callers serve cache hits as stock and generate
+        the rest with use_cache=False.
+        """
+        if self.cache is None:
+            return []
+        key = GenerationCache.make_key(
+            self.model, PROMPTS[question_type].template, topic, difficulty
+        )
+        questions = await asyncio.to_thread(self.cache.draw, key, count)
+        CACHE_LOOKUPS.inc(self.model, "hit", amount=len(questions))
+        CACHE_LOOKUPS.inc(self.model, "miss", amount=count - len(questions))
+        if questions:
+            self.logger.info(
+                "Served %d questions from generation cache", len(questions)
+            )
+        return questions
+
+    async def agenerate_mcq_batch(
+        self, topic: str, difficulty: str = "medium", count: int = 5, avoid=None
+    ) -> list[MCQQuestion]:
+        return await self._aretry_and_parse_batch(
+            mcq_batch_prompt_template, MCQQuestionBatch, topic, difficulty, count, avoid
+        )
+
+    async def agenerate_fill_blank_batch(
+        self, topic: str, difficulty: str = "medium", count: int = 5, avoid=None
+    ) -> list[FillBlankQuestion]:
+        return await self._aretry_and_parse_batch(
+            fill_blank_batch_prompt_template,
+            FillBlankQuestionBatch,
+            topic,
+            difficulty,
+            count,
+            avoid,
+        )
+
+    async def agenerate_multiple_answer_batch(
+        self, topic: str, difficulty: str = "medium", count: int = 5, avoid=None
+    ) -> list[MultipleAnswerQuestion]:
+        return await self._aretry_and_parse_batch(
+            multiple_answer_batch_prompt_template,
+            MultipleAnswerQuestionBatch,
+            topic,
+            difficulty,
+            count,
+            avoid,
+        )
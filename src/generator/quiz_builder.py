@@ -0,0 +1,545 @@
+import time
+import asyncio
+from contextlib import nullcontext
+from typing import TYPE_CHECKING
+from src.config.settings import settings
+from src.common.async_runner import run_async
+from src.common.metrics import registry
+from src.common.logger import get_logger
+from src.generator.dedup import get_deduplicator
+from src.generator.single_flight import get_single_flight
+
+if TYPE_CHECKING:
+    from src.generator.question_generator import QuestionGenerator
+
+QUESTION_SCHEMAS = {
+    "Single Choice": "MCQQuestion",
+    "Multiple Choice": "MultipleAnswerQuestion",
+    "Fill in the Blank": "FillBlankQuestion",
+}
+
+QUIZ_GENERATIONS = registry.counter(
+    "study_buddy_quiz_generations_total",
+    "Quiz generation requests by outcome (success, partial, failed).",
+    ("model", "question_type", "outcome"),
+)
+QUIZ_GENERATION_SECONDS = registry.histogram(
+    "study_buddy_quiz_generation_seconds",
+    "Wall time to generate a whole quiz.",
+    ("model", "question_type", "outcome"),
+)
+QUIZ_QUESTIONS = registry.counter(
+    "study_buddy_quiz_questions_total",
+    "Questions delivered in generated quizzes.",
+    ("model", "question_type"),
+)
+QUIZ_COALESCED = registry.counter(
+    "study_buddy_quiz_coalesced_total",
+    "Quiz requests by single-flight role (leader, follower).",
+    ("model", "question_type", "role"),
+)
+
+
+class QuizBuilder:
+    """
+    Builds a quiz without any Streamlit calls: prefetched stock and the
+    question bank first, then concurrent generation for the remaining slots,
+    deduplication and storing the new questions in the bank. Failed slots
+    come back as exceptions so callers decide how to report them.
+
+    semaphore: shared limit on concurrent LLM calls, for callers running many
+    quizzes at once. use_stock: serve prefetched and banked questions.
+    coalesce: share the generation with identical concurrent requests.
+    """
+
+    def __init__(
+        self,
+        user_id: str,
+        semaphore: asyncio.Semaphore = None,
+        use_stock=True,
+        coalesce=True,
+    ):
+        self.user_id = user_id
+        self.semaphore = semaphore
+        self.use_stock = use_stock
+        self.coalesce = coalesce
+        self.logger = get_logger(self.__class__.__name__)
+
+    def generate(
+        self,
+        generator: "QuestionGenerator",
+        topic,
+        question_type: str,
+        difficulty: str,
+        num_questions: int,
+    ):
+        return run_async(
+            self.agenerate(generator, topic, question_type, difficulty, num_questions)
+        )
+
+    async def agenerate(
+        self,
+        generator: "QuestionGenerator",
+        topic,
+        question_type: str,
+        difficulty: str,
+        num_questions: int,
+    ):
+        """
+        topic: a single topic string, or one context string per question
+        """
+        from src.generator.prefetch import interactive_generation
+
+        # background quizzes (batch jobs) do not hold the prefetcher back
+        in_flight = (
+            nullcontext()
+            if generator.priority == "background"
+            else interactive_generation()
+        )
+        start = time.perf_counter()
+        try:
+            with in_flight:
+                outcomes = await self._generate_coalesced(
+                    generator, topic, question_type, difficulty, num_questions
+                )
+        except Exception:
+            self._record(generator, question_type, "failed", start, 0)
+            raise
+
+        delivered = sum(not isinstance(o, Exception) for o in outcomes)
+        outcome = "success" if delivered == len(outcomes) else "partial"
+        if not delivered:
+            outcome = "failed"
+        self._record(generator, question_type, outcome, start, delivered)
+        return outcomes
+
+    @staticmethod
+    def _record(generator, question_type, outcome, start, delivered):
+        labels = (generator.model, question_type)
+        QUIZ_GENERATIONS.inc(*labels, outcome)
+        QUIZ_GENERATION_SECONDS.observe(time.perf_counter() - start, *labels, outcome)
+        QUIZ_QUESTIONS.inc(*labels, amount=delivered)
+
+    async def _generate_coalesced(
+        self,
+        generator: "QuestionGenerator",
+        topic,
+        question_type: str,
+        difficulty: str,
+        num_questions: int,
+    ):
+        single_flight = get_single_flight() if self.coalesce else None
+        if single_flight is None or not isinstance(topic, str):
+            return await self._generate_unique(
+                generator, topic, question_type, difficulty, num_questions
+            )
+
+        # stock is taken per requester, so bank questions follow each user's
+        # seen set; only generation of the remaining slots is shared
+        topics = [topic] * num_questions
+        outcomes, bank_ids = await self._take_stock(
+            generator, topic, topics, question_type, difficulty
+        )
+        missing = [slot for slot, outcome in enumerate(outcomes) if outcome is None]
+        if missing:
+            key = single_flight.make_key(
+                generator.model, question_type, difficulty, topic
+            )
+            pooled, leader = await single_flight.run(
+                key,
+                len(missing),
+                lambda size: self._generate_pool(
+                    generator, topic, question_type, difficulty, size
+                ),
+            )
+            for slot, outcome in zip(missing, pooled):
+                outcomes[slot] = outcome
+            QUIZ_COALESCED.inc(
+                generator.model, question_type, "leader" if leader else "follower"
+            )
+
+        # the pool was checked against the history when it was built
+        stocked = set(range(num_questions))
+        await self._finish(
+            generator,
+            topic,
+            topics,
+            question_type,
+            difficulty,
+            outcomes,
+            stocked,
+            bank_ids,
+        )
+        return outcomes
+
+    async def _generate_pool(
+        self,
+        generator: "QuestionGenerator",
+        topic: str,
+        question_type: str,
+        difficulty: str,
+        size: int,
+    ):
+        """Freshly generated questions shared by a single-flight, deduplicated."""
+        topics = [topic] * size
+        outcomes = await self._generate_concurrently(
+            generator, topics, question_type, difficulty, list(range(size))
+        )
+        await self._deduplicate(
+            generator, topic, topics, question_type, difficulty, outcomes, set(), {}
+        )
+        return outcomes
+
+    async def _generate_unique(
+        self,
+        generator: "QuestionGenerator",
+        topic,
+        question_type: str,
+        difficulty: str,
+        num_questions: int,
+    ):
+        topics = topic if isinstance(topic, list) else [topic] * num_questions
+        outcomes, bank_ids = await self._take_stock(
+            generator, topic, topics, question_type, difficulty
+        )
+        stocked = {slot for slot, outcome in enumerate(outcomes) if outcome is not None}
+
+        missing = [slot for slot, outcome in enumerate(outcomes) if outcome is None]
+        if missing:
+            generated = await self._generate_concurrently(
+                generator, topics, question_type, difficulty, missing
+            )
+            for slot, outcome in zip(missing, generated):
+                outcomes[slot] = outcome
+
+        await self._finish(
+            generator,
+            topic,
+            topics,
+            question_type,
+            difficulty,
+            outcomes,
+            stocked,
+            bank_ids,
+        )
+        return outcomes
+
+    async def _take_stock(
+        self,
+        generator: "QuestionGenerator",
+        topic,
+        topics: list,
+        question_type: str,
+        difficulty: str,
+    ):
+        """
+        Fills what it can from prefetched stock, this user's unseen bank
+        questions and the generation cache. Cached variants were remembered by
+        dedup when first served, so they are stock too and only checked
+        within the quiz.
+        """
+        outcomes = self._take_prefetched(
+            generator, topic, question_type, difficulty, len(topics)
+        )
+        bank_ids = await self._take_from_bank(
+            generator, topic, question_type, difficulty, outcomes
+        )
+        await self._take_cached(generator, topics, question_type, difficulty, outcomes)
+        return outcomes, bank_ids
+
+    async def _finish(
+        self,
+        generator: "QuestionGenerator",
+        topic,
+        topics: list,
+        question_type: str,
+        difficulty: str,
+        outcomes: list,
+        stocked: set,
+        bank_ids: dict,
+    ):
+        await self._deduplicate(
+            generator,
+            topic,
+            topics,
+            question_type,
+            difficulty,
+            outcomes,
+            stocked,
+            bank_ids,
+        )
+        await self._store_in_bank(generator, topic, difficulty, outcomes, bank_ids)
+
+    async def _deduplicate(
+        self,
+        generator: "QuestionGenerator",
+        topic,
+        topics: list,
+        question_type: str,
+        difficulty: str,
+        outcomes: list,
+        stocked: set,
+        bank_ids: dict,
+    ):
+        deduplicator = get_deduplicator()
+        if deduplicator is None:
+            return
+
+        key = deduplicator.history_key(topic, question_type)
+        signatures = {}
+        pending = list(range(len(outcomes)))
+
+        for round_number in range(settings.DEDUP_MAX_ROUNDS + 1):
+            rejected = []
+            for slot in pending:
+                if isinstance(outcomes[slot], Exception):
+                    continue
+                signature = deduplicator.signature(outcomes[slot])
+                # stocked questions are reused on purpose, only check them
+                # within the quiz
+                if deduplicator.is_duplicate(
+                    key, signature, signatures.values(), slot not in stocked
+                ):
+                    rejected.append(slot)
+                else:
+                    signatures[slot] = signature
+
+            if not rejected:
+                break
+
+            if round_number == settings.DEDUP_MAX_ROUNDS:
+                for slot in rejected:
+                    outcomes[slot] = ValueError(
+                        "Could not generate a distinct question"
+                    )
+                break
+
+            # regenerate only the rejected slots, steering away from what we have
+            avoid = [outcomes[slot].question for slot in sorted(signatures)]
+            regenerated = await self._generate_concurrently(
+                generator, topics, question_type, difficulty, rejected, avoid
+            )
+            for slot, outcome in zip(rejected, regenerated):
+                outcomes[slot] = outcome
+                stocked.discard(slot)
+                # the bank question was never served, its replacement is new
+                bank_ids.pop(slot, None)
+            pending = rejected
+
+        # only fresh questions enter the history; stock is served again on
+        # purpose and repeating its signatures would push real history out
+        deduplicator.remember(
+            key,
+            [
+                signature
+                for slot, signature in signatures.items()
+                if slot not in stocked
+            ],
+        )
+
+    def _take_prefetched(
+        self,
+        generator: "QuestionGenerator",
+        topic,
+        question_type: str,
+        difficulty: str,
+        num_questions: int,
+    ):
+        outcomes = [None] * num_questions
+
+        from src.generator.prefetch import get_prefetcher
+
+        prefetcher = get_prefetcher()
+        if prefetcher is None or not self.use_stock or not isinstance(topic, str):
+            return outcomes
+
+        key = prefetcher.make_key(generator.model, question_type, difficulty, topic)
+        prefetcher.record_request(key, topic)
+        stocked = prefetcher.take(key, num_questions)
+        outcomes[: len(stocked)] = stocked
+        return outcomes
+
+    @staticmethod
+    async def _take_cached(
+        generator: "QuestionGenerator",
+        topics: list,
+        question_type: str,
+        difficulty: str,
+        outcomes: list,
+    ):
+        if generator.cache is None:
+            return
+
+        slots_by_topic = {}
+        for slot, outcome in enumerate(outcomes):
+            if outcome is None:
+                slots_by_topic.setdefault(topics[slot], []).append(slot)
+
+        for topic, slots in slots_by_topic.items():
+            questions = await generator.adraw_cached(
+                QUESTION_SCHEMAS[question_type], topic, difficulty, len(slots)
+            )
+            for slot, question in zip(slots, questions):
+                outcomes[slot] = question
+
+    async def _take_from_bank(
+        self,
+        generator: "QuestionGenerator",
+        topic,
+        question_type: str,
+        difficulty: str,
+        outcomes: list,
+    ):
+        from src.storage.question_bank import get_question_bank
+
+        bank = get_question_bank()
+        missing = [slot for slot, outcome in enumerate(outcomes) if outcome is None]
+        if bank is None or not settings.QUESTION_BANK_SERVE or not missing:
+            return {}
+        if not self.use_stock or not isinstance(topic, str):
+            return {}
+
+        # SQLite calls stay off the shared event loop
+        sampled = await asyncio.to_thread(
+            bank.sample,
+            topic,
+            difficulty,
+            QUESTION_SCHEMAS[question_type],
+            len(missing),
+            user_id=self.user_id,
+            model=generator.model,
+            max_age_seconds=settings.QUESTION_BANK_MAX_AGE_SECONDS,
+        )
+
+        bank_ids = {}
+        for slot, (question_id, question) in zip(missing, sampled):
+            outcomes[slot] = question
+            bank_ids[slot] = question_id
+        return bank_ids
+
+    async def _store_in_bank(
+        self, generator: "QuestionGenerator", topic, difficulty: str, outcomes, bank_ids
+    ):
+        from src.storage.question_bank import get_question_bank
+
+        bank = get_question_bank()
+        if bank is None or not isinstance(topic, str):
+            return
+
+        try:
+            served = [
+                question_id
+                for slot, question_id in bank_ids.items()
+                if outcomes[slot] is not None
+                and not isinstance(outcomes[slot], Exception)
+            ]
+            new_questions = [
+                outcome
+                for slot, outcome in enumerate(outcomes)
+                if slot not in bank_ids and not isinstance(outcome, Exception)
+            ]
+            if new_questions:
+                served += await asyncio.to_thread(
+                    bank.add_questions,
+                    new_questions,
+                    topic,
+                    difficulty,
+                    generator.model,
+                )
+            await asyncio.to_thread(bank.mark_seen, self.user_id, served)
+        except Exception as e:
+            self.logger.error("Failed to store questions in the bank : %s", e)
+
+    async def _generate_concurrently(
+        self,
+        generator: "QuestionGenerator",
+        topics: list,
+        question_type: str,
+        difficulty: str,
+        slots: list,
+        avoid: list = None,
+    ):
+        if question_type == "Single Choice":
+            generate = generator.agenerate_mcq
+            generate_batch = generator.agenerate_mcq_batch
+        elif question_type == "Multiple Choice":
+            generate = generator.agenerate_multiple_answer
+            generate_batch = generator.agenerate_multiple_answer_batch
+        else:
+            generate = generator.agenerate_fill_blank
+            generate_batch = generator.agenerate_fill_blank_batch
+
+        semaphore = self.semaphore or asyncio.Semaphore(
+            max(1, settings.GENERATION_CONCURRENCY)
+        )
+        batch_size = settings.GENERATION_BATCH_SIZE
+
+        async def generate_one(slot):
+            async with semaphore:
+                # the cache was already consulted by _take_cached
+                return await generate(
+                    topic=topics[slot],
+                    difficulty=difficulty,
+                    avoid=avoid,
+                    use_cache=False,
+                )
+
+        async def generate_chunk(chunk):
+            # one call covers the chunk, so it gets every slot's context
+            material = "\n\n---\n\n".join(dict.fromkeys(topics[slot] for slot in chunk))
+            async with semaphore:
+                try:
+                    questions = await generate_batch(
+                        topic=material,
+                        difficulty=difficulty,
+                        count=len(chunk),
+                        avoid=avoid,
+                    )
+                except Exception as e:
+                    return [e] * len(chunk)
+            shortfall = len(chunk) - len(questions)
+            return (
+                questions
+                + [
+                    ValueError(
+                        f"Batch returned {len(questions)} of {len(chunk)} questions"
+                    )
+                ]
+                * shortfall
+            )
+
+        if batch_size <= 1:
+            # gather keeps the slot order, failed slots come back as exceptions
+            return await asyncio.gather(
+                *(generate_one(slot) for slot in slots), return_exceptions=True
+            )
+
+        chunks = await asyncio.gather(
+            *(
+                generate_chunk(slots[start : start + batch_size])
+                for start in range(0, len(slots), batch_size)
+            )
+        )
+        return [outcome for chunk in chunks for outcome in chunk]
+
+    @staticmethod
+    def to_question_dict(question_type: str, question):
+        if question_type == "Single Choice":
+            return {
+                "type": "MCQ",
+                "question": question.question,
+                "options": question.options,
+                "correct_answer": question.correct_answer,
+            }
+        elif question_type == "Multiple Choice":
+            return {
+                "type": "Multiple Answer",
+                "question": question.question,
+                "options": question.options,
+                "correct_answer": question.correct_answers,
+            }
+        return {
+            "type": "Fill in the Blank",
+            "question": question.question,
+            "correct_answer": question.answer,
+        }
@@ -0,0 +1,131 @@
+import random
+import asyncio
+import threading
+from src.config.settings import settings
+
+MODES = ("shared", "shuffle", "variants")
+
+
+class Flight:
+
+    def __init__(self, task: asyncio.Task, size: int):
+        self.task = task
+        self.size = size
+        self.followers = 0
+
+
+class SingleFlight:
+    """
+    Shares one quiz generation between identical requests. The first request
+    for a (model, question type, difficulty, topic) key starts a generation
+    and later ones attach to it while it runs, and for `linger_seconds`
+    after it finished, instead of calling the model again. Each requester
+    then draws its quiz from the shared pool according to `mode`:
+
+        shared    everyone gets the same questions in the same order
+        shuffle   the same questions, with questions and options reordered
+        variants  a pool `variant_pool_factor` times larger, sampled per requester
+    """
+
+    def __init__(
+        self,
+        mode: str = "shuffle",
+        variant_pool_factor: float = 2.0,
+        linger_seconds: float = 0.0,
+    ):
+        if mode not in MODES:
+            raise ValueError(f"unknown single-flight mode {mode}")
+        self.mode = mode
+        self.variant_pool_factor = variant_pool_factor
+        self.linger_seconds = linger_seconds
+        # flights run on the event loop that started them, so they are kept per loop
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model: str, question_type: str, difficulty: str, topic: str):
+        return (model, question_type, difficulty.lower(), " ".join(topic.lower().split()))
+
+    def pool_size(self, num_questions: int) -> int:
+        if self.mode == "variants":
+            return max(num_questions, round(num_questions * self.variant_pool_factor))
+        return num_questions
+
+    def _finished(self, loop, key, flight: Flight, task: asyncio.Task):
+        def forget():
+            with self._lock:
+                if self._flights.get((loop, key)) is flight:
+                    del self._flights[(loop, key)]
+
+        # failed or cancelled pools are not handed to late arrivals
+        if task.cancelled() or task.exception() is not None or not self.linger_seconds:
+            forget()
+        else:
+            loop.call_later(self.linger_seconds, forget)
+
+    async def run(self, key, num_questions: int, generate_pool):
+        """
+        generate_pool(size) is a coroutine function building the pool. Returns
+        this requester's outcomes and whether it led the flight.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            flight = self._flights.get((loop, key))
+            leader = flight is None or flight.size < num_questions
+            if leader:
+                size = self.pool_size(num_questions)
+                # a separate task, so a leader that gives up does not cancel it for the rest
+                task = loop.create_task(generate_pool(size))
+                flight = self._flights[(loop, key)] = Flight(task, size)
+                task.add_done_callback(
+                    lambda done, flight=flight: self._finished(loop, key, flight, done)
+                )
+            else:
+                flight.followers += 1
+
+        pool = await asyncio.shield(flight.task)
+        return self.draw(pool, num_questions, shuffle=not leader), leader
+
+    def draw(self, pool: list, num_questions: int, shuffle: bool = True):
+        if self.mode == "shared":
+            return list(pool[:num_questions])
+
+        if self.mode == "variants":
+            questions = [o for o in pool if not isinstance(o, Exception)]
+            failures = [o for o in pool if isinstance(o, Exception)]
+            picked = random.sample(questions, min(num_questions, len(questions)))
+            return picked + failures[: num_questions - len(picked)]
+
+        outcomes = list(pool[:num_questions])
+        if shuffle:
+            random.shuffle(outcomes)
+            outcomes = [shuffle_options(o) for o in outcomes]
+        return outcomes
+
+
+def shuffle_options(question):
+    options = getattr(question, "options", None)
+    if isinstance(question, Exception) or not options:
+        return question
+    # answers are stored as option text, so reordering keeps them valid
+    return question.model_copy(update={"options": random.sample(options, len(options))})
+
+
+_single_flight = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight():
+    global _single_flight
+
+    if not settings.SINGLE_FLIGHT_ENABLED:
+        return None
+
+    with _single_flight_lock:
+        if _single_flight is None:
+            _single_flight = SingleFlight(
+                mode=settings.SINGLE_FLIGHT_MODE,
+                variant_pool_factor=settings.SINGLE_FLIGHT_VARIANT_POOL_FACTOR,
+                linger_seconds=settings.SINGLE_FLIGHT_LINGER_SECONDS,
+            )
+        return _single_flight
@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+
+STUDENT_COLUMN = "student_id"
+
+# Each grader returns per-submission correct and answered flags plus the
+# answers in a hashable, normalized form for finding the most common wrong one.
+
+
+def _grade_mcq(column: pd.Series, question: dict):
+    correct = (column == question["correct_answer"]).to_numpy(dtype=bool)
+    return correct, column.notna().to_numpy(), column
+
+
+def _grade_fill_blank(column: pd.Series, question: dict):
+    normalized = column.astype("string").str.strip().str.lower()
+    expected = str(question["correct_answer"]).strip().lower()
+    correct = (normalized == expected).fillna(False).to_numpy(dtype=bool)
+    answered = (normalized.fillna("") != "").to_numpy(dtype=bool)
+    return correct, answered, normalized
+
+
+def _option_masks(column: pd.Series, options: list):
+    """One bitmask per answer, a bit per selected option and one for anything else."""
+    exploded = column.explode().dropna()
+    codes = pd.Categorical(exploded, categories=options).codes.astype(np.int64)
+    bits = np.where(codes >= 0, np.left_shift(1, codes), 1 << len(options))
+
+    masks = np.zeros(len(column), dtype=np.int64)
+    # rows are numbered from 0, and an option picked twice still counts once
+    np.bitwise_or.at(masks, exploded.index.to_numpy(), bits)
+    return masks
+
+
+def _grade_multiple_answer(column: pd.Series, question: dict):
+    options = list(question.get("options", []))
+    masks = _option_masks(column, options)
+
+    expected = 0
+    for option in set(question["correct_answer"]):
+        expected |= 1 << options.index(option) if option in options else 1 << len(options)
+
+    def describe(mask):
+        picked = [option for i, option in enumerate(options) if mask & (1 << i)]
+        if mask & (1 << len(options)):
+            picked.append("(other)")
+        return ", ".join(picked)
+
+    correct = (masks == expected) & column.notna().to_numpy()
+    answers = pd.Series(masks, index=column.index)
+    return correct, masks > 0, answers, describe
+
+
+GRADERS = {
+    "MCQ": _grade_mcq,
+    "Multiple Answer": _grade_multiple_answer,
+    "Fill in the Blank": _grade_fill_blank,
+}
+
+
+def _most_common(answers: pd.Series, selected, describe=None):
+    counts = answers[selected].value_counts()
+    if not len(counts):
+        return None
+    return describe(counts.index[0]) if describe else counts.index[0]
+
+
+def grade_submissions(questions, answers):
+    """
+    Grades many submissions of one quiz at once. questions are the dicts
+    built by QuizBuilder; answers is a DataFrame, or anything DataFrame()
+    accepts, with one row per submission, an optional student_id column and
+    one column per question in quiz order (None when unanswered).
+    Returns the per-question and per-student aggregates as DataFrames.
+    """
+    frame = answers if isinstance(answers, pd.DataFrame) else pd.DataFrame(answers)
+    frame = frame.reset_index(drop=True)
+
+    if STUDENT_COLUMN in frame.columns:
+        students = frame[STUDENT_COLUMN].to_numpy()
+        frame = frame.drop(columns=STUDENT_COLUMN)
+    else:
+        students = frame.index.to_numpy()
+
+    if len(frame.columns) != len(questions):
+        raise ValueError(
+            f"Expected {len(questions)} answer columns, got {len(frame.columns)}"
+        )
+
+    correct = np.zeros((len(frame), len(questions)), dtype=bool)
+    answered = np.zeros((len(frame), len(questions)), dtype=bool)
+    question_rows = []
+
+    for i, (question, name) in enumerate(zip(questions, frame.columns)):
+        graded = GRADERS[question["type"]](frame[name], question)
+        correct[:, i], answered[:, i] = graded[0], graded[1]
+
+        question_rows.append(
+            {
+                "question_number": i + 1,
+                "question": question["question"],
+                "question_type": question["type"],
+                "correct": int(correct[:, i].sum()),
+                "answered": int(answered[:, i].sum()),
+                "accuracy": float(correct[:, i].mean()) if len(frame) else 0.0,
+                "most_common_wrong_answer": _most_common(
+                    graded[2], answered[:, i] & ~correct[:, i], *graded[3:]
+                ),
+            }
+        )
+
+    correct_counts = correct.sum(axis=1)
+    per_student = pd.DataFrame(
+        {
+            STUDENT_COLUMN: students,
+            "correct": correct_counts,
+            "answered": answered.sum(axis=1),
+            "total": len(questions),
+            "score_percentage": (
+                correct_counts / len(questions) * 100 if questions else 0.0
+            ),
+        }
+    )
+    return pd.DataFrame(question_rows), per_student
@@ -0,0 +1,40 @@
+def is_correct(question: dict, answer) -> bool:
+    if answer is None:
+        return False
+
+    if question["type"] == "MCQ":
+        return answer == question["correct_answer"]
+
+    if question["type"] == "Multiple Answer":
+        return set(answer) == set(question["correct_answer"])
+
+    return answer.strip().lower() == question["correct_answer"].strip().lower()
+
+
+def grade_quiz(questions, user_answers):
+    """
+    Grades one attempt. questions are the dicts built by QuizBuilder and
+    user_answers holds one answer per question (None when unanswered).
+    Returns the per-question results and a score summary.
+    """
+    results = []
+    for i, (q, user_ans) in enumerate(zip(questions, user_answers)):
+        results.append(
+            {
+                "question_number": i + 1,
+                "question": q["question"],
+                "question_type": q["type"],
+                "user_answer": user_ans,
+                "correct_answer": q["correct_answer"],
+                "is_correct": is_correct(q, user_ans),
+                "options": q.get("options", []),
+            }
+        )
+
+    correct = sum(result["is_correct"] for result in results)
+    summary = {
+        "correct": correct,
+        "total": len(results),
+        "score_percentage": correct / len(results) * 100 if results else 0.0,
+    }
+    return results, summary
@@ -0,0 +1,178 @@
+import re
+import json
+import time
+import random
+import asyncio
+import threading
+from langchain_core.messages import AIMessage, AIMessageChunk
+from src.config.settings import settings
+
+VOCABULARY = (
+    "atom energy cell market vector theorem enzyme climate protocol river "
+    "empire algorithm voltage inflation genome orbit syntax treaty crystal "
+    "neuron tariff lattice photon dialect glacier ledger catalyst entropy "
+    "compiler mantle plasma axiom membrane quota harmonic sediment kernel "
+    "migration reactor sonnet frontier isotope gradient parliament"
+).split()
+
+BATCH_COUNT = re.compile(r"Generate (\d+) distinct")
+MALFORMED_SUFFIXES = ("", "```", "\n}", ",")
+
+
+class FakeChatModel:
+    """
+    Offline stand-in for a provider chat model. Quiz prompts get well-formed
+    JSON for the requested question type and anything else gets a short prose
+    answer, after a latency drawn from the configured distribution. Failures
+    and malformed JSON are injected at the configured rates. A fixed seed
+    makes the sequence of outcomes reproducible.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        latency: float = 0.2,
+        latency_spread: float = 0.5,
+        distribution: str = "lognormal",
+        failure_rate: float = 0.0,
+        malformed_rate: float = 0.0,
+        chunk_delay: float = 0.005,
+        seed: int = 0,
+    ):
+        self.model = model
+        self.latency = latency
+        self.latency_spread = latency_spread
+        self.distribution = distribution
+        self.failure_rate = failure_rate
+        self.malformed_rate = malformed_rate
+        self.chunk_delay = chunk_delay
+        self.calls = 0
+        self._random = random.Random(f"{seed}:{model}")
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, model: str):
+        return cls(
+            model,
+            latency=settings.FAKE_LLM_LATENCY,
+            latency_spread=settings.FAKE_LLM_LATENCY_SPREAD,
+            distribution=settings.FAKE_LLM_LATENCY_DISTRIBUTION,
+            failure_rate=settings.FAKE_LLM_FAILURE_RATE,
+            malformed_rate=settings.FAKE_LLM_MALFORMED_RATE,
+            seed=settings.FAKE_LLM_SEED,
+        )
+
+    def _delay(self) -> float:
+        if self.distribution == "fixed":
+            return self.latency
+        if self.distribution == "uniform":
+            spread = self.latency * self.latency_spread
+            return max(0.0, self._random.uniform(self.latency - spread, self.latency + spread))
+        # lognormal with the configured median and sigma gives a realistic tail
+        return self.latency * self._random.lognormvariate(0, self.latency_spread)
+
+    def _plan(self, input):
+        """Draws the latency, outcome and response text for one call."""
+        with self._lock:
+            self.calls += 1
+            delay = self._delay()
+            if self._random.random() < self.failure_rate:
+                return delay, RuntimeError(f"Fake {self.model} request failed"), None
+
+            text = self._respond(_prompt_text(input))
+            if text.startswith("{") and self._random.random() < self.malformed_rate:
+                cut = self._random.randint(1, len(text) - 1)
+                text = text[:cut] + self._random.choice(MALFORMED_SUFFIXES)
+            return delay, None, text
+
+    def _words(self, count: int) -> str:
+        return " ".join(self._random.choice(VOCABULARY) for _ in range(count))
+
+    def _question(self, kind: str):
+        options = [self._words(2) for _ in range(4)]
+        if kind == "fill_blank":
+            return {
+                "question": f"The {self._words(3)} depends on ____ and {self._words(2)}.",
+                "answer": self._words(1),
+            }
+        if kind == "multiple_answer":
+            return {
+                "question": f"Which of these relate to {self._words(4)}?",
+                "options": options,
+                "correct_answers": options[: self._random.randint(1, 3)],
+            }
+        return {
+            "question": f"What best explains {self._words(5)}?",
+            "options": options,
+            "correct_answer": self._random.choice(options),
+        }
+
+    def _respond(self, prompt: str) -> str:
+        if "fill-in-the-blank" in prompt:
+            kind = "fill_blank"
+        elif "multiple-answer" in prompt:
+            kind = "multiple_answer"
+        elif "multiple-choice" in prompt:
+            kind = "mcq"
+        elif "running summary" in prompt:
+            return "\n".join(f"- {self._words(6)}" for _ in range(4))
+        else:
+            return f"In short, {self._words(12)}. This matters because {self._words(10)}."
+
+        batch = BATCH_COUNT.search(prompt)
+        if batch:
+            count = int(batch.group(1))
+            return json.dumps({"questions": [self._question(kind) for _ in range(count)]})
+        return json.dumps(self._question(kind))
+
+    @staticmethod
+    def _message(text: str, input) -> AIMessage:
+        return AIMessage(
+            content=text,
+            usage_metadata={
+                "input_tokens": len(_prompt_text(input)) // 4,
+                "output_tokens": len(text) // 4,
+                "total_tokens": (len(_prompt_text(input)) + len(text)) // 4,
+            },
+        )
+
+    def invoke(self, input, **kwargs):
+        delay, error, text = self._plan(input)
+        time.sleep(delay)
+        if error:
+            raise error
+        return self._message(text, input)
+
+    async def ainvoke(self, input, **kwargs):
+        delay, error, text = self._plan(input)
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return self._message(text, input)
+
+    def stream(self, input, **kwargs):
+        delay, error, text = self._plan(input)
+        time.sleep(delay)
+        if error:
+            raise error
+        for word in text.split(" "):
+            yield AIMessageChunk(content=word + " ")
+            time.sleep(self.chunk_delay)
+
+    async def astream(self, input, **kwargs):
+        delay, error, text = self._plan(input)
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        for word in text.split(" "):
+            yield AIMessageChunk(content=word + " ")
+            await asyncio.sleep(self.chunk_delay)
+
+
+def _prompt_text(input) -> str:
+    if isinstance(input, str):
+        return input
+    return "\n".join(
+        m["content"] if isinstance(m, dict) else str(getattr(m, "content", m))
+        for m in input
+    )
@@ -0,0 +1,222 @@
+import time
+import asyncio
+import threading
+from src.config.settings import settings
+from src.common.logger import get_logger
+from src.common.metrics import registry
+from src.common.async_runner import run_async, iterate_async
+from src.llms.latency import latency_tracker
+
+logger = get_logger(__name__)
+
+
+class HedgeBudget:
+    """
+    Caps hedged requests to a fraction of all requests. Every request earns
+    `ratio` credit (up to `burst`) and every hedge spends one.
+    """
+
+    def __init__(self, ratio: float, burst: float):
+        self.ratio = ratio
+        self.burst = burst
+        self.credit = burst
+
+        self.requests = 0
+        self.hedges = 0
+        self.backup_wins = 0
+        self.denied = 0
+        self._lock = threading.Lock()
+
+    def on_request(self):
+        with self._lock:
+            self.requests += 1
+            self.credit = min(self.burst, self.credit + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self.credit < 1:
+                self.denied += 1
+                return False
+            self.credit -= 1
+            self.hedges += 1
+            return True
+
+    def on_backup_win(self):
+        with self._lock:
+            self.backup_wins += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hedges": self.hedges,
+                "backup_wins": self.backup_wins,
+                "denied": self.denied,
+                "hedge_rate": self.hedges / self.requests if self.requests else 0.0,
+            }
+
+
+hedge_budget = HedgeBudget(settings.HEDGE_BUDGET_RATIO, settings.HEDGE_BUDGET_BURST)
+
+HEDGE_EVENTS = ("requests", "hedges", "backup_wins", "denied")
+registry.callback(
+    "study_buddy_hedge_events_total",
+    "Hedged LLM calls by event (" + ", ".join(HEDGE_EVENTS) + ").",
+    ("event",),
+    lambda: {(event,): hedge_budget.stats()[event] for event in HEDGE_EVENTS},
+    kind="counter",
+)
+
+
+class HedgedLLM:
+    """
+    Wraps a primary chat model with a backup. When the primary has not
+    answered within a percentile of its recent latency, the same request is
+    sent to the backup and the first valid response wins; the other request
+    is cancelled.
+    """
+
+    def __init__(self, primary_model: str, primary, backup_model: str, backup):
+        self.primary_model = primary_model
+        self.primary = primary
+        self.backup_model = backup_model
+        self.backup = backup
+
+    def __getattr__(self, name):
+        return getattr(self.primary, name)
+
+    @staticmethod
+    def _hedge_delay(key: str) -> float:
+        if latency_tracker.count(key) < settings.HEDGE_MIN_SAMPLES:
+            return settings.HEDGE_DEFAULT_DELAY
+        return latency_tracker.percentile(key, settings.HEDGE_PERCENTILE)
+
+    @staticmethod
+    def _censor(primary, key: str, start: float):
+        """
+        A primary cancelled because the backup won would have taken at least
+        as long as it ran. Recording that lower bound keeps slow calls in the
+        window; dropping them would pull the hedge delay down.
+        """
+        if not primary.done():
+            latency_tracker.record(key, time.perf_counter() - start)
+
+    @staticmethod
+    async def _timed_invoke(model, llm, input, kwargs):
+        start = time.perf_counter()
+        result = await llm.ainvoke(input, **kwargs)
+        latency_tracker.record(model, time.perf_counter() - start)
+        return result
+
+    async def arace(self, input, validate=None, **kwargs):
+        hedge_budget.on_request()
+
+        start = time.perf_counter()
+        primary = asyncio.ensure_future(
+            self._timed_invoke(self.primary_model, self.primary, input, kwargs)
+        )
+        pending = {primary}
+
+        done, _ = await asyncio.wait(
+            pending, timeout=self._hedge_delay(self.primary_model)
+        )
+        if not done and hedge_budget.try_spend():
+            logger.info("Hedging %s with %s", self.primary_model, self.backup_model)
+            pending.add(
+                asyncio.ensure_future(
+                    self._timed_invoke(self.backup_model, self.backup, input, kwargs)
+                )
+            )
+
+        last_result, last_error = None, None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is not None:
+                        last_error = task.exception()
+                        continue
+
+                    last_result = task.result()
+                    if validate is None or validate(last_result):
+                        if task is not primary:
+                            hedge_budget.on_backup_win()
+                            self._censor(primary, self.primary_model, start)
+                        return last_result
+        finally:
+            for task in pending:
+                task.cancel()
+
+        # nothing valid came back; let the caller's retry loop decide
+        if last_result is not None:
+            return last_result
+        raise last_error
+
+    async def ainvoke(self, input, **kwargs):
+        return await self.arace(input, **kwargs)
+
+    def invoke(self, input, **kwargs):
+        return run_async(self.arace(input, **kwargs))
+
+    @staticmethod
+    async def _first_chunk(model, llm, input, kwargs):
+        start = time.perf_counter()
+        iterator = llm.astream(input, **kwargs).__aiter__()
+        first = await iterator.__anext__()
+        # streams are hedged on time to first token
+        latency_tracker.record(f"{model}:stream", time.perf_counter() - start)
+        return iterator, first
+
+    async def astream(self, input, **kwargs):
+        hedge_budget.on_request()
+
+        start = time.perf_counter()
+        primary = asyncio.ensure_future(
+            self._first_chunk(self.primary_model, self.primary, input, kwargs)
+        )
+        pending = {primary}
+
+        done, _ = await asyncio.wait(
+            pending, timeout=self._hedge_delay(f"{self.primary_model}:stream")
+        )
+        if not done and hedge_budget.try_spend():
+            logger.info(
+                "Hedging %s stream with %s", self.primary_model, self.backup_model
+            )
+            pending.add(
+                asyncio.ensure_future(
+                    self._first_chunk(self.backup_model, self.backup, input, kwargs)
+                )
+            )
+
+        winner, last_error = None, None
+        while pending and winner is None:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is not None:
+                    last_error = task.exception()
+                elif winner is None:
+                    winner = task
+                else:
+                    await task.result()[0].aclose()
+
+        if winner is not None and winner is not primary:
+            hedge_budget.on_backup_win()
+            self._censor(primary, f"{self.primary_model}:stream", start)
+        for task in pending:
+            task.cancel()
+
+        if winner is None:
+            raise last_error
+
+        iterator, first = winner.result()
+        yield first
+        async for chunk in iterator:
+            yield chunk
+
+    def stream(self, input, **kwargs):
+        return iterate_async(self.astream(input, **kwargs))
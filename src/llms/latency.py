@@ -0,0 +1,48 @@
+import bisect
+import threading
+from collections import defaultdict, deque
+
+# upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 32.0, float("inf"))
+
+
+class LatencyTracker:
+    """
+    Per-model latency histograms plus a rolling window of recent samples
+    used for percentile estimates.
+    """
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples = defaultdict(lambda: deque(maxlen=self.window))
+        self._buckets = defaultdict(lambda: [0] * len(LATENCY_BUCKETS))
+        self._lock = threading.Lock()
+
+    def record(self, model: str, seconds: float):
+        with self._lock:
+            self._samples[model].append(seconds)
+            self._buckets[model][bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def count(self, model: str) -> int:
+        with self._lock:
+            return len(self._samples.get(model, ()))
+
+    def percentile(self, model: str, percentile: float):
+        with self._lock:
+            samples = sorted(self._samples.get(model, ()))
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(percentile * len(samples)))
+        return samples[index]
+
+    def histogram(self, model: str):
+        with self._lock:
+            counts = list(self._buckets.get(model, [0] * len(LATENCY_BUCKETS)))
+        return dict(zip(LATENCY_BUCKETS, counts))
+
+    def models(self):
+        with self._lock:
+            return list(self._samples)
+
+
+latency_tracker = LatencyTracker()
@@ -1,15 +1,103 @@
-from langchain_groq import ChatGroq
-from langchain_openai import ChatOpenAI
+import threading
 from src.config.settings import settings
+from src.common.logger import get_logger
+from src.llms.hedging import HedgedLLM
+from src.llms.rate_limiter import RateLimitedLLM, get_rate_limiter
 
+logger = get_logger(__name__)
 
-def get_groq_llm(model):
-    return ChatGroq(
-        api_key=settings.GROQ_API_KEY, model=model, temperature=settings.TEMPERATURE
-    )
+# Process-wide registry, shared by every Streamlit session. Each client owns its
+# HTTP connection pool, so reusing the client keeps connections alive.
+_clients = {}
+_clients_lock = threading.Lock()
 
 
-def get_openai_llm(model):
-    return ChatOpenAI(
-        api_key=settings.OPENAI_API_KEY, model=model, temperature=settings.TEMPERATURE
-    )
+def get_provider(model):
+    return "openai" if model.startswith("gpt") else "groq"
+
+
+def _create_client(provider, model, temperature):
+    if settings.FAKE_LLM:
+        from src.llms.fake_llm import FakeChatModel
+
+        return FakeChatModel.from_settings(model)
+
+    # the provider SDKs are slow to import, so only load the ones in use
+    if provider == "openai":
+        from langchain_openai import ChatOpenAI
+
+        return ChatOpenAI(
+            api_key=settings.OPENAI_API_KEY, model=model, temperature=temperature
+        )
+    from langchain_groq import ChatGroq
+
+    return ChatGroq(api_key=settings.GROQ_API_KEY, model=model, temperature=temperature)
+
+
+def _get_client(provider, model, temperature=None):
+    temperature = settings.TEMPERATURE if temperature is None else temperature
+    key = (provider, model, temperature)
+
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _create_client(provider, model, temperature)
+                _clients[key] = client
+                logger.info("Created %s client for %s", provider, model)
+    return client
+
+
+def get_groq_llm(model, temperature=None):
+    return _get_client("groq", model, temperature)
+
+
+def get_openai_llm(model, temperature=None):
+    return _get_client("openai", model, temperature)
+
+
+def _limited_client(model, temperature, priority):
+    provider = get_provider(model)
+    client = _get_client(provider, model, temperature)
+    if not settings.RATE_LIMIT_ENABLED:
+        return client
+    return RateLimitedLLM(client, get_rate_limiter(provider, model), priority)
+
+
+def get_llm(model, temperature=None, priority="quiz"):
+    """priority orders calls waiting on the rate limiter: chat, quiz, background."""
+    if model == settings.AUTO_MODEL:
+        # the router builds the client of each model it picks through get_llm
+        from src.llms.router import RoutedLLM, get_model_router
+
+        return RoutedLLM(get_model_router(), temperature, priority)
+
+    client = _limited_client(model, temperature, priority)
+
+    if settings.HEDGING_ENABLED:
+        backup = settings.HEDGE_BACKUP_MODELS.get(model, settings.HEDGE_DEFAULT_BACKUP)
+        if backup and backup != model:
+            return HedgedLLM(
+                model,
+                client,
+                backup,
+                _limited_client(backup, temperature, priority),
+            )
+    return client
+
+
+def warm_up_clients(models=None):
+    warmed = []
+    for model in models or settings.MODELS:
+        try:
+            get_llm(model)
+            warmed.append(model)
+        except Exception as e:
+            logger.error("Failed to warm up client for %s : %s", model, e)
+    return warmed
+
+
+def clear_clients():
+    with _clients_lock:
+        _clients.clear()
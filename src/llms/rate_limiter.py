@@ -0,0 +1,403 @@
+import time
+import heapq
+import asyncio
+import itertools
+import threading
+from email.utils import parsedate_to_datetime
+from src.config.settings import settings
+from src.common.logger import get_logger
+from src.common.metrics import registry
+from src.common.custom_exception import CustomException
+from src.chat.tokens import estimate_tokens, message_tokens
+
+# lower value goes first
+PRIORITIES = {"chat": 0, "quiz": 1, "background": 2}
+
+RATE_LIMIT_QUEUE_DEPTH = registry.gauge(
+    "study_buddy_rate_limit_queue_depth",
+    "LLM calls waiting for a rate limit slot.",
+    ("model", "priority"),
+)
+RATE_LIMIT_WAIT_SECONDS = registry.histogram(
+    "study_buddy_rate_limit_wait_seconds",
+    "Time an LLM call waited for a rate limit slot.",
+    ("model", "priority"),
+)
+RATE_LIMIT_EVENTS = registry.counter(
+    "study_buddy_rate_limit_events_total",
+    "Rate limit events by kind (throttled, rate_limited, timed_out).",
+    ("model", "event"),
+)
+
+logger = get_logger(__name__)
+
+
+class TokenBucket:
+    """Refills `per_minute` units over a minute, holding at most a minute's worth."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        self._refill(now)
+        # a request larger than the bucket goes once the bucket is full
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount: float):
+        self.level -= amount
+
+    def give_back(self, amount: float):
+        self.level = min(self.capacity, self.level + amount)
+
+
+class RateLimiter:
+    """
+    Requests/min and tokens/min buckets for one model, shared by every thread
+    and event loop in the process. Calls that cannot go straight away wait in
+    a priority queue and only the head of the queue is admitted, so a chat
+    turn overtakes queued quiz and background generation. A 429 pauses the
+    whole queue for the provider's Retry-After.
+    """
+
+    def __init__(self, name: str, rpm: float = None, tpm: float = None):
+        self.name = name
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.paused_until = 0.0
+
+        self.admitted = 0
+        self.throttled = 0
+        self.rate_limited = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+        # entries are (priority, sequence, tokens, wake)
+        self._queue = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    def _delay(self, tokens: int, now: float) -> float:
+        delay = self.paused_until - now
+        if self.requests is not None:
+            delay = max(delay, self.requests.wait_time(1, now))
+        if self.tokens is not None:
+            delay = max(delay, self.tokens.wait_time(tokens, now))
+        return max(delay, 0.0)
+
+    def _take(self, tokens: int):
+        if self.requests is not None:
+            self.requests.take(1)
+        if self.tokens is not None:
+            self.tokens.take(tokens)
+
+    def _wake_head(self):
+        if self._queue:
+            self._queue[0][3]()
+
+    def _try_fast(self, tokens: int) -> bool:
+        with self._lock:
+            if self._queue or self._delay(tokens, time.monotonic()) > 0:
+                return False
+            self._take(tokens)
+            self.admitted += 1
+            return True
+
+    def _enqueue(self, tokens: int, priority: str, wake):
+        entry = (PRIORITIES[priority], next(self._sequence), tokens, wake)
+        with self._lock:
+            heapq.heappush(self._queue, entry)
+        RATE_LIMIT_QUEUE_DEPTH.inc(self.name, priority)
+        return entry
+
+    def _poll(self, entry):
+        """0 once admitted, else seconds to wait, or None to wait for a wake-up."""
+        with self._lock:
+            if self._queue[0] is not entry:
+                return None
+            delay = self._delay(entry[2], time.monotonic())
+            if delay > 0:
+                return delay
+            self._take(entry[2])
+            heapq.heappop(self._queue)
+            self.admitted += 1
+            self._wake_head()
+            return 0
+
+    def _leave(self, entry, priority: str, waited: float, admitted: bool):
+        if not admitted:
+            with self._lock:
+                if entry in self._queue:
+                    self._queue.remove(entry)
+                    heapq.heapify(self._queue)
+                    self._wake_head()
+        RATE_LIMIT_QUEUE_DEPTH.dec(self.name, priority)
+
+        with self._lock:
+            self.throttled += 1
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        RATE_LIMIT_EVENTS.inc(self.name, "throttled")
+        RATE_LIMIT_WAIT_SECONDS.observe(waited, self.name, priority)
+
+    def _timed_out(self, priority: str):
+        RATE_LIMIT_EVENTS.inc(self.name, "timed_out")
+        return CustomException(
+            f"Timed out waiting for the {self.name} rate limit ({priority})"
+        )
+
+    def acquire(self, tokens: int, priority: str = "quiz"):
+        if self._try_fast(tokens):
+            RATE_LIMIT_WAIT_SECONDS.observe(0.0, self.name, priority)
+            return
+
+        start = time.monotonic()
+        deadline = start + settings.RATE_LIMIT_MAX_WAIT_SECONDS
+        event = threading.Event()
+        entry = self._enqueue(tokens, priority, event.set)
+        admitted = False
+        try:
+            while True:
+                event.clear()
+                delay = self._poll(entry)
+                if delay == 0:
+                    admitted = True
+                    return
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise self._timed_out(priority)
+                event.wait(remaining if delay is None else min(delay, remaining))
+        finally:
+            self._leave(entry, priority, time.monotonic() - start, admitted)
+
+    async def aacquire(self, tokens: int, priority: str = "quiz"):
+        if self._try_fast(tokens):
+            RATE_LIMIT_WAIT_SECONDS.observe(0.0, self.name, priority)
+            return
+
+        start = time.monotonic()
+        deadline = start + settings.RATE_LIMIT_MAX_WAIT_SECONDS
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        # other threads and loops admit calls too, so wake-ups go through the loop
+        entry = self._enqueue(
+            tokens, priority, lambda: loop.call_soon_threadsafe(event.set)
+        )
+        admitted = False
+        try:
+            while True:
+                event.clear()
+                delay = self._poll(entry)
+                if delay == 0:
+                    admitted = True
+                    return
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise self._timed_out(priority)
+                try:
+                    await asyncio.wait_for(
+                        event.wait(), remaining if delay is None else min(delay, remaining)
+                    )
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._leave(entry, priority, time.monotonic() - start, admitted)
+
+    def settle(self, reserved: int, used: int = None):
+        """Replaces the reserved token estimate with the usage the provider reported."""
+        if self.tokens is None or used is None:
+            return
+        with self._lock:
+            if used < reserved:
+                self.tokens.give_back(reserved - used)
+                self._wake_head()
+            else:
+                self.tokens.take(used - reserved)
+
+    def on_error(self, error: Exception):
+        if not is_rate_limited(error):
+            return
+
+        delay = retry_after(error)
+        if delay is None:
+            delay = settings.RATE_LIMIT_DEFAULT_RETRY_AFTER
+        with self._lock:
+            self.rate_limited += 1
+            self.paused_until = max(self.paused_until, time.monotonic() + delay)
+        RATE_LIMIT_EVENTS.inc(self.name, "rate_limited")
+        logger.error(
+            "%s returned 429, pausing its queue for %.1fs",
+            self.name,
+            delay,
+            extra={"model": self.name},
+        )
+
+    def stats(self):
+        with self._lock:
+            now = time.monotonic()
+            queued = {priority: 0 for priority in PRIORITIES}
+            names = {value: key for key, value in PRIORITIES.items()}
+            for entry in self._queue:
+                queued[names[entry[0]]] += 1
+            return {
+                "queued": queued,
+                "admitted": self.admitted,
+                "throttled": self.throttled,
+                "rate_limited": self.rate_limited,
+                "mean_wait_seconds": (
+                    self.wait_seconds / self.throttled if self.throttled else 0.0
+                ),
+                "max_wait_seconds": self.max_wait_seconds,
+                "paused_for_seconds": max(0.0, self.paused_until - now),
+                "requests_available": (
+                    self.requests.level if self.requests is not None else None
+                ),
+                "tokens_available": (
+                    self.tokens.level if self.tokens is not None else None
+                ),
+            }
+
+
+def is_rate_limited(error: Exception) -> bool:
+    if getattr(error, "status_code", None) == 429:
+        return True
+    return getattr(getattr(error, "response", None), "status_code", None) == 429
+
+
+def retry_after(error: Exception):
+    """Seconds from the Retry-After headers of a provider error, if any."""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+
+    milliseconds = headers.get("retry-after-ms")
+    if milliseconds:
+        try:
+            return max(0.0, float(milliseconds) / 1000)
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def estimate_request_tokens(input) -> int:
+    if isinstance(input, str):
+        prompt = estimate_tokens(input)
+    else:
+        prompt = sum(
+            message_tokens(m)
+            if isinstance(m, dict)
+            else message_tokens({"content": str(getattr(m, "content", m))})
+            for m in input
+        )
+    return prompt + settings.RATE_LIMIT_OUTPUT_TOKENS
+
+
+def _used_tokens(message):
+    usage = getattr(message, "usage_metadata", None) or {}
+    return usage.get("total_tokens")
+
+
+class RateLimitedLLM:
+    """
+    Wraps a provider chat model so every call first waits for its model's
+    rate limiter at the given priority.
+    """
+
+    def __init__(self, client, limiter: RateLimiter, priority: str):
+        self.client = client
+        self.limiter = limiter
+        self.priority = priority
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    def invoke(self, input, **kwargs):
+        tokens = estimate_request_tokens(input)
+        self.limiter.acquire(tokens, self.priority)
+        try:
+            response = self.client.invoke(input, **kwargs)
+        except Exception as e:
+            self.limiter.on_error(e)
+            raise
+        self.limiter.settle(tokens, _used_tokens(response))
+        return response
+
+    async def ainvoke(self, input, **kwargs):
+        tokens = estimate_request_tokens(input)
+        await self.limiter.aacquire(tokens, self.priority)
+        try:
+            response = await self.client.ainvoke(input, **kwargs)
+        except Exception as e:
+            self.limiter.on_error(e)
+            raise
+        self.limiter.settle(tokens, _used_tokens(response))
+        return response
+
+    def stream(self, input, **kwargs):
+        tokens = estimate_request_tokens(input)
+        self.limiter.acquire(tokens, self.priority)
+        used = None
+        try:
+            for chunk in self.client.stream(input, **kwargs):
+                used = _used_tokens(chunk) or used
+                yield chunk
+        except Exception as e:
+            self.limiter.on_error(e)
+            raise
+        self.limiter.settle(tokens, used)
+
+    async def astream(self, input, **kwargs):
+        tokens = estimate_request_tokens(input)
+        await self.limiter.aacquire(tokens, self.priority)
+        used = None
+        try:
+            async for chunk in self.client.astream(input, **kwargs):
+                used = _used_tokens(chunk) or used
+                yield chunk
+        except Exception as e:
+            self.limiter.on_error(e)
+            raise
+        self.limiter.settle(tokens, used)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str, model: str) -> RateLimiter:
+    with _limiters_lock:
+        limiter = _limiters.get(model)
+        if limiter is None:
+            limits = settings.RATE_LIMITS.get(
+                model, settings.RATE_LIMIT_DEFAULTS.get(provider, {})
+            )
+            limiter = _limiters[model] = RateLimiter(
+                model, limits.get("rpm"), limits.get("tpm")
+            )
+        return limiter
+
+
+def rate_limit_stats():
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {model: limiter.stats() for model, limiter in limiters.items()}
@@ -0,0 +1,337 @@
+import time
+import random
+import threading
+from collections import deque
+from src.config.settings import settings
+from src.common.logger import get_logger
+from src.common.metrics import registry
+from src.llms.llm_client import get_llm, get_provider
+
+ROUTER_DECISIONS = registry.counter(
+    "study_buddy_router_decisions_total",
+    "Models picked by the Auto router, by reason (best, explore, probe, fallback).",
+    ("task", "model", "reason"),
+)
+ROUTER_CIRCUIT_OPEN = registry.gauge(
+    "study_buddy_router_circuit_open",
+    "1 while the Auto router skips a model after repeated errors.",
+    ("task", "model"),
+)
+
+logger = get_logger(__name__)
+
+
+class ModelHealth:
+    """
+    Rolling outcomes and response latencies of one model on one task, and the
+    circuit breaker that takes the model out of rotation after repeated errors.
+    """
+
+    def __init__(self, window: int):
+        self.outcomes = deque(maxlen=window)
+        # errors often fail fast, so only calls that got a response are timed
+        self.latencies = deque(maxlen=window)
+        self.consecutive_errors = 0
+        self.opened_at = None
+        self.cooldown = settings.ROUTER_BREAKER_COOLDOWN_SECONDS
+        self.probe_started = None
+
+    def is_open(self, now: float) -> bool:
+        return self.opened_at is not None and now < self.opened_at + self.cooldown
+
+    def is_half_open(self, now: float) -> bool:
+        return self.opened_at is not None and not self.is_open(now)
+
+    def available(self, now: float) -> bool:
+        if self.opened_at is None:
+            return True
+        if self.is_open(now):
+            return False
+        # one probe at a time; a probe that never reported is retried later
+        return self.probe_started is None or now - self.probe_started > self.cooldown
+
+    def record(self, outcome: str, latency: float, now: float) -> str:
+        """Returns "opened" or "closed" when the call changed the circuit."""
+        self.outcomes.append(outcome)
+        self.probe_started = None
+
+        if outcome != "error":
+            if latency is not None:
+                self.latencies.append(latency)
+            self.consecutive_errors = 0
+            if self.opened_at is not None:
+                self.opened_at = None
+                self.cooldown = settings.ROUTER_BREAKER_COOLDOWN_SECONDS
+                return "closed"
+            return None
+
+        self.consecutive_errors += 1
+        if self.opened_at is not None:
+            if not self.is_open(now):
+                # a failed probe keeps the circuit open for twice as long
+                self.cooldown = min(
+                    self.cooldown * 2, settings.ROUTER_BREAKER_MAX_COOLDOWN_SECONDS
+                )
+                self.opened_at = now
+            return None
+        if self.consecutive_errors >= settings.ROUTER_BREAKER_FAILURES:
+            self.opened_at = now
+            return "opened"
+        return None
+
+    def success_rate(self) -> float:
+        if not self.outcomes:
+            return 1.0
+        return sum(outcome == "success" for outcome in self.outcomes) / len(
+            self.outcomes
+        )
+
+    def latency(self, percentile: float):
+        samples = sorted(self.latencies)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(percentile * len(samples)))]
+
+    def cost(self, percentile: float) -> float:
+        """
+        Expected seconds per usable answer. A call that errors or does not
+        parse is retried after a backoff and brings the request closer to
+        failing, so each failed attempt adds a penalty, and the total is
+        divided by the success rate.
+        """
+        latency = self.latency(percentile)
+        if latency is None:
+            return float("inf")
+        success = self.success_rate()
+        penalty = (1 - success) * settings.ROUTER_FAILURE_PENALTY_SECONDS
+        return (latency + penalty) / max(success, settings.ROUTER_MIN_SUCCESS_RATE)
+
+
+class ModelRouter:
+    """
+    Picks the model for each request of a task (quiz, chat) from rolling
+    per-model stats. Models with fewer than `min_samples` outcomes are tried
+    first, a small share of requests keeps exploring, and the rest go to the
+    model with the lowest expected time per usable answer. Latency includes
+    time spent queued on the model's rate limiter, so a saturated model loses
+    traffic to the next best one.
+    """
+
+    def __init__(
+        self,
+        models,
+        window: int = 100,
+        min_samples: int = 3,
+        explore_rate: float = 0.05,
+        percentile: float = 0.9,
+        seed=None,
+    ):
+        self.models = list(models)
+        self.window = window
+        self.min_samples = min_samples
+        self.explore_rate = explore_rate
+        self.percentile = percentile
+        self._health = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _get(self, task: str, model: str) -> ModelHealth:
+        health = self._health.get((task, model))
+        if health is None:
+            health = self._health[(task, model)] = ModelHealth(self.window)
+        return health
+
+    def _pick(self, task: str, now: float):
+        healths = {model: self._get(task, model) for model in self.models}
+        available = [model for model, h in healths.items() if h.available(now)]
+        if not available:
+            # every circuit is open; the one closest to its probe is least bad
+            return (
+                min(healths, key=lambda m: healths[m].opened_at + healths[m].cooldown),
+                "fallback",
+            )
+
+        probes = [model for model in available if healths[model].is_half_open(now)]
+        if probes:
+            healths[probes[0]].probe_started = now
+            return probes[0], "probe"
+
+        unexplored = [
+            model
+            for model in available
+            if len(healths[model].outcomes) < self.min_samples
+        ]
+        if unexplored:
+            return self._random.choice(unexplored), "explore"
+        if self._random.random() < self.explore_rate:
+            return self._random.choice(available), "explore"
+        return (
+            min(available, key=lambda m: healths[m].cost(self.percentile)),
+            "best",
+        )
+
+    def choose(self, task: str) -> str:
+        with self._lock:
+            model, reason = self._pick(task, time.monotonic())
+        ROUTER_DECISIONS.inc(task, model, reason)
+        return model
+
+    def record(self, task: str, model: str, outcome: str, latency: float = None):
+        with self._lock:
+            change = self._get(task, model).record(outcome, latency, time.monotonic())
+
+        if change == "opened":
+            ROUTER_CIRCUIT_OPEN.set(1, task, model)
+            logger.error(
+                "Routing %s requests away from %s after %d errors",
+                task,
+                model,
+                settings.ROUTER_BREAKER_FAILURES,
+                extra={"model": model},
+            )
+        elif change == "closed":
+            ROUTER_CIRCUIT_OPEN.set(0, task, model)
+            logger.info(
+                "%s recovered, routing %s requests to it again",
+                model,
+                task,
+                extra={"model": model},
+            )
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            report = {}
+            for (task, model), health in self._health.items():
+                report.setdefault(task, {})[model] = {
+                    "samples": len(health.outcomes),
+                    "success_rate": health.success_rate(),
+                    "error_rate": (
+                        health.outcomes.count("error") / len(health.outcomes)
+                        if health.outcomes
+                        else 0.0
+                    ),
+                    "latency_p50": health.latency(0.5),
+                    "latency_p90": health.latency(0.9),
+                    "cost": health.cost(self.percentile),
+                    "circuit": (
+                        "open"
+                        if health.is_open(now)
+                        else "half_open" if health.is_half_open(now) else "closed"
+                    ),
+                }
+            return report
+
+
+def _task(priority: str) -> str:
+    return "chat" if priority == "chat" else "quiz"
+
+
+class RoutedLLM:
+    """
+    Chat model interface for the Auto choice: every call goes to the model
+    the router picks for its task, and its latency (time to first chunk for
+    streams) and errors are reported back. `last_model` is the model that
+    served the latest call.
+    """
+
+    def __init__(self, router: ModelRouter, temperature=None, priority: str = "quiz"):
+        self.router = router
+        self.temperature = temperature
+        self.priority = priority
+        self.task = _task(priority)
+        self.last_model = None
+
+    def _route(self):
+        model = self.router.choose(self.task)
+        self.last_model = model
+        return model, get_llm(model, self.temperature, self.priority)
+
+    def invoke(self, input, **kwargs):
+        model, llm = self._route()
+        start = time.perf_counter()
+        try:
+            response = llm.invoke(input, **kwargs)
+        except Exception:
+            self.router.record(self.task, model, "error")
+            raise
+        self.router.record(self.task, model, "success", time.perf_counter() - start)
+        return response
+
+    async def ainvoke(self, input, **kwargs):
+        model, llm = self._route()
+        start = time.perf_counter()
+        try:
+            response = await llm.ainvoke(input, **kwargs)
+        except Exception:
+            self.router.record(self.task, model, "error")
+            raise
+        self.router.record(self.task, model, "success", time.perf_counter() - start)
+        return response
+
+    def stream(self, input, **kwargs):
+        model, llm = self._route()
+        start = time.perf_counter()
+        recorded = False
+        try:
+            for chunk in llm.stream(input, **kwargs):
+                if not recorded:
+                    recorded = True
+                    self.router.record(
+                        self.task, model, "success", time.perf_counter() - start
+                    )
+                yield chunk
+        except Exception:
+            if not recorded:
+                self.router.record(self.task, model, "error")
+            raise
+
+    async def astream(self, input, **kwargs):
+        model, llm = self._route()
+        start = time.perf_counter()
+        recorded = False
+        try:
+            async for chunk in llm.astream(input, **kwargs):
+                if not recorded:
+                    recorded = True
+                    self.router.record(
+                        self.task, model, "success", time.perf_counter() - start
+                    )
+                yield chunk
+        except Exception:
+            if not recorded:
+                self.router.record(self.task, model, "error")
+            raise
+
+
+def _has_credentials(model: str) -> bool:
+    if settings.FAKE_LLM:
+        return True
+    if get_provider(model) == "openai":
+        return bool(settings.OPENAI_API_KEY)
+    return bool(settings.GROQ_API_KEY)
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_model_router() -> ModelRouter:
+    global _router
+
+    with _router_lock:
+        if _router is None:
+            # models without an API key would only ever trip their circuit
+            models = [m for m in settings.ROUTER_MODELS if _has_credentials(m)]
+            _router = ModelRouter(
+                models or settings.ROUTER_MODELS,
+                window=settings.ROUTER_WINDOW,
+                min_samples=settings.ROUTER_MIN_SAMPLES,
+                explore_rate=settings.ROUTER_EXPLORE_RATE,
+                percentile=settings.ROUTER_LATENCY_PERCENTILE,
+            )
+        return _router
+
+
+def router_stats():
+    return get_model_router().stats()
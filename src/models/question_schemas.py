@@ -1,5 +1,14 @@
-from typing import List
-from pydantic import BaseModel,Field,field_validator
+from typing import ClassVar, List, Type
+from pydantic import BaseModel,Field,field_validator,model_validator
+
+
+def _match_option(answer, options):
+    # tolerate case and whitespace differences between the answer and its option
+    normalized = answer.strip().lower()
+    for option in options:
+        if option.strip().lower() == normalized:
+            return option
+    return answer
 
 class MCQQuestion(BaseModel):
 
@@ -13,6 +22,13 @@ class MCQQuestion(BaseModel):
             return v.get('description' , str(v))
         return str(v)
 
+    @model_validator(mode='after')
+    def check_structure(self):
+        self.correct_answer = _match_option(self.correct_answer, self.options)
+        if len(self.options) != 4 or self.correct_answer not in self.options:
+            raise ValueError("Invalid MCQ structure")
+        return self
+
 class FillBlankQuestion(BaseModel):
 
     question: str = Field(description="The question text with '____' for the blank")
@@ -25,6 +41,12 @@ class FillBlankQuestion(BaseModel):
             return v.get('description' , str(v))
         return str(v)
 
+    @model_validator(mode='after')
+    def check_structure(self):
+        if "____" not in self.question:
+            raise ValueError("Fill in the blank should contain '____' ")
+        return self
+
 class MultipleAnswerQuestion(BaseModel):
     question: str = Field(description="The question text")
     options: List[str] = Field(min_items=4, description="List of answer options (4 or more)")
@@ -34,4 +56,43 @@ class MultipleAnswerQuestion(BaseModel):
     def clean_question(cls, v):
         if isinstance(v, dict):
             return v.get('description', str(v))
-        return str(v)
\ No newline at end of file
+        return str(v)
+
+    @model_validator(mode='after')
+    def check_structure(self):
+        self.correct_answers = [_match_option(a, self.options) for a in self.correct_answers]
+        if not self.correct_answers or not set(self.correct_answers).issubset(set(self.options)):
+            raise ValueError("Invalid multiple answer structure")
+        return self
+
+class QuestionBatch(BaseModel):
+    item_model: ClassVar[Type[BaseModel]]
+
+    @classmethod
+    def validate_items(cls, items):
+        """
+        Validate each raw item on its own so one malformed entry does not
+        discard the rest of the batch. Returns the batch and the item errors.
+        """
+        questions, errors = [], []
+        for item in items:
+            try:
+                questions.append(cls.item_model.model_validate(item))
+            except Exception as e:
+                errors.append(str(e))
+        return cls(questions=questions), errors
+
+
+class MCQQuestionBatch(QuestionBatch):
+    item_model: ClassVar[Type[BaseModel]] = MCQQuestion
+    questions: List[MCQQuestion] = Field(description="List of MCQ questions")
+
+
+class FillBlankQuestionBatch(QuestionBatch):
+    item_model: ClassVar[Type[BaseModel]] = FillBlankQuestion
+    questions: List[FillBlankQuestion] = Field(description="List of fill in the blank questions")
+
+
+class MultipleAnswerQuestionBatch(QuestionBatch):
+    item_model: ClassVar[Type[BaseModel]] = MultipleAnswerQuestion
+    questions: List[MultipleAnswerQuestion] = Field(description="List of multiple answer questions")
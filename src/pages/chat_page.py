@@ -1,9 +1,8 @@
-import os
 import streamlit as st
 from src.config.settings import settings
 from src.utils.helper_functions import rerun
-from src.chat.chat_engine import ChatEngine
-from src.prompts.templates import chat_prompt_template
+from src.chat.context_index import ConversationIndex
+from src.storage.chat_store import get_chat_store
 from src.pages.state import reset_quiz_state
 
 
@@ -11,36 +10,42 @@ def render_chat_page():
     st.sidebar.header("💬 chat")
 
     chat_model = st.sidebar.selectbox(
-        "Chat Model", settings.MODELS, index=len(settings.MODELS) - 1
+        "Chat Model", [settings.AUTO_MODEL, *settings.MODELS], index=0
     )
 
+    store = get_chat_store()
+    session_id = st.session_state.session_id
+    chat_ids = st.session_state.chat_ids
+
     if st.sidebar.button("➕ New Chat"):
-        chat_id = f"chat_{len(st.session_state.chat_sessions) + 1}"
-        st.session_state.chat_sessions[chat_id] = {
-            "model": chat_model,
-            "messages": [{"role": "system", "content": chat_prompt_template.template}],
-        }
+        chat_id = f"chat_{len(chat_ids) + 1}"
+        store.create(session_id, chat_id, chat_model)
+        chat_ids.append(chat_id)
         st.session_state.active_chat_id = chat_id
         rerun()
 
-    if not st.session_state.chat_sessions:
+    if not chat_ids:
         st.info("Create a chat to start studying.")
         return
 
-    if st.session_state.chat_sessions:
+    if chat_ids:
         st.session_state.active_chat_id = st.sidebar.selectbox(
             "Select Chat",
-            list(st.session_state.chat_sessions.keys()),
+            chat_ids,
             index=(
-                list(st.session_state.chat_sessions.keys()).index(
-                    st.session_state.active_chat_id
-                )
+                chat_ids.index(st.session_state.active_chat_id)
                 if st.session_state.active_chat_id
                 else 0
             ),
         )
 
-    chat = st.session_state.chat_sessions[st.session_state.active_chat_id]
+    # inactive chats are reloaded from disk when selected
+    chat = store.get(session_id, st.session_state.active_chat_id)
+    if chat is None:
+        chat_ids.remove(st.session_state.active_chat_id)
+        st.session_state.active_chat_id = None
+        st.warning("This chat has expired.")
+        return
 
     st.header("🧠 Study Conversation")
 
@@ -51,10 +56,27 @@ def render_chat_page():
     user_input = st.chat_input("Ask a question...")
 
     if user_input:
-        chat["messages"].append({"role": "user", "content": user_input})
-        engine = ChatEngine(chat["model"])
-        response = engine.respond(chat["messages"])
-        chat["messages"].append({"role": "assistant", "content": response})
+        store.append(chat, {"role": "user", "content": user_input})
+        st.chat_message("user").write(user_input)
+
+        if settings.API_BASE_URL:
+            # thin client, the service manages the context window
+            from src.api.client import get_api_client
+
+            with st.chat_message("assistant"):
+                response = st.write_stream(get_api_client().stream_chat(chat))
+        else:
+            # langchain is only imported once the first message is sent
+            from src.chat.chat_engine import ChatEngine
+            from src.chat.context_window import ChatContextWindow
+
+            engine = ChatEngine(chat["model"])
+            messages = ChatContextWindow(chat["model"], engine.llm).prepare(chat)
+            with st.chat_message("assistant"):
+                response = st.write_stream(engine.stream(messages))
+            chat.setdefault("metrics", []).append(engine.last_metrics)
+
+        store.append(chat, {"role": "assistant", "content": response})
         rerun()
 
     if st.session_state.quiz_manager.has_meaningful_chat(chat["messages"]):
@@ -64,6 +86,11 @@ def render_chat_page():
             st.session_state.quiz_context = (
                 st.session_state.quiz_manager.chat_to_context(chat["messages"])
             )
+            if "context_index" not in chat:
+                chat["context_index"] = ConversationIndex()
+            st.session_state.quiz_context_index = chat["context_index"].update(
+                chat["messages"]
+            )
             st.session_state.page = "quiz"
             rerun()
     else:
@@ -1,9 +1,8 @@
-import os
 import streamlit as st
+from datetime import datetime
 from src.config.settings import settings
-from src.utils.helper_functions import rerun
+from src.utils.helper_functions import paginate
 from src.pages.state import reset_quiz_state
-from src.generator.question_generator import QuestionGenerator
 
 
 def render_quiz_page():
@@ -38,7 +37,9 @@ def render_quiz_page():
         "Number of questions", min_value=1, max_value=10, value=5
     )
 
-    llm = st.sidebar.selectbox("Model", settings.MODELS, index=len(settings.MODELS) - 1)
+    llm = st.sidebar.selectbox(
+        "Model", [settings.AUTO_MODEL, *settings.MODELS], index=0
+    )
 
     if st.sidebar.button("Generate Quiz"):
         # st.session_state.quiz_generated = False
@@ -56,17 +57,37 @@ def render_quiz_page():
             st.warning("Please provide a topic or select a chat.")
             return
 
-        generator = QuestionGenerator(llm)
-        success = st.session_state.quiz_manager.generate_questions(
-            generator=generator,
-            topic=context,
-            question_type=question_type,
-            difficulty=difficulty,
-            num_questions=num_questions,
-        )
+        if (
+            st.session_state.quiz_source == "chat"
+            and st.session_state.quiz_context_index is not None
+        ):
+            # one relevant slice of the conversation per question
+            context = st.session_state.quiz_context_index.slices(num_questions)
+
+        reset_quiz_state()
+        if settings.API_BASE_URL:
+            from src.api.client import get_api_client
+
+            success = st.session_state.quiz_manager.generate_questions_remote(
+                client=get_api_client(),
+                model=llm,
+                topic=context,
+                question_type=question_type,
+                difficulty=difficulty,
+                num_questions=num_questions,
+            )
+        else:
+            from src.generator.question_generator import QuestionGenerator
+
+            success = st.session_state.quiz_manager.generate_questions(
+                generator=QuestionGenerator(llm),
+                topic=context,
+                question_type=question_type,
+                difficulty=difficulty,
+                num_questions=num_questions,
+            )
 
         st.session_state.quiz_generated = success
-        rerun()
 
     if st.session_state.quiz_generated and st.session_state.quiz_manager.questions:
         st.header("📋 Quiz")
@@ -75,39 +96,43 @@ def render_quiz_page():
         if st.button("Submit Quiz"):
             st.session_state.quiz_manager.evaluate_quiz()
             st.session_state.quiz_submitted = True
-            rerun()
 
     if st.session_state.quiz_submitted:
         st.header("📊 Results")
-        results_df = st.session_state.quiz_manager.generate_result_dataframe()
-
-        if not results_df.empty:
-            correct_count = results_df["is_correct"].sum()
-            total_questions = len(results_df)
-            score_percentage = (correct_count / total_questions) * 100
-            st.write(f"Score: {score_percentage}%")
-
-            for _, result in results_df.iterrows():
-                question_num = result["question_number"]
-                if result["is_correct"]:
-                    st.success(f"✅ Question {question_num} : {result['question']}")
-                else:
-                    st.error(f"❌ Question {question_num} : {result['question']}")
-                    st.write(f"Your answer : {result['user_answer']}")
-                    st.write(f"Correct answer : {result['correct_answer']}")
-
-                st.markdown("------------")
+        render_results(st.session_state.quiz_manager)
 
         if st.button("Save Results"):
-            saved_file = st.session_state.quiz_manager.save_to_csv()
-
-            if saved_file:
-                with open(saved_file, "rb") as f:
-                    st.download_button(
-                        label="Downlaod Results",
-                        data=f.read(),
-                        file_name=os.path.basename(saved_file),
-                        mime="text/csv",
-                    )
+            quiz_id = st.session_state.quiz_manager.save_results()
+
+            if quiz_id:
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                st.download_button(
+                    label="Downlaod Results",
+                    data=st.session_state.quiz_manager.export_csv(),
+                    file_name=f"quiz_results_{timestamp}.csv",
+                    mime="text/csv",
+                )
             else:
                 st.warning("No results avialble")
+
+
+@st.fragment
+def render_results(quiz_manager):
+    # results are computed once by evaluate_quiz, paging reruns only this fragment
+    results = quiz_manager.results
+    if not results:
+        return
+
+    st.write(f"Score: {quiz_manager.summary['score_percentage']}%")
+
+    start, end = paginate(len(results), "results_page_index")
+    for result in results[start:end]:
+        question_num = result["question_number"]
+        if result["is_correct"]:
+            st.success(f"✅ Question {question_num} : {result['question']}")
+        else:
+            st.error(f"❌ Question {question_num} : {result['question']}")
+            st.write(f"Your answer : {result['user_answer']}")
+            st.write(f"Correct answer : {result['correct_answer']}")
+
+        st.markdown("------------")
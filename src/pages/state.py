@@ -1,3 +1,4 @@
+import uuid
 import streamlit as st
 from src.utils.helper_functions import QuizManager
 
@@ -11,7 +12,11 @@ def init_session_state():
         "quiz_submitted": False,
         "quiz_source": "topic",
         "quiz_context": None,
-        "chat_sessions": {},
+        "quiz_context_index": None,
+        "quiz_page_index": 0,
+        "results_page_index": 0,
+        "session_id": uuid.uuid4().hex,
+        "chat_ids": [],
         "active_chat_id": None,
         "rerun_trigger": False,
     }
@@ -25,6 +30,9 @@ def reset_quiz_state():
     st.session_state.quiz_generated = False
     st.session_state.quiz_submitted = False
 
+    st.session_state.quiz_page_index = 0
+    st.session_state.results_page_index = 0
+
     for k in ("user_answers", "submitted"):
         st.session_state.pop(k, None)
 
@@ -18,6 +18,7 @@ mcq_prompt_template = PromptTemplate(
         "  • scenario-based reasoning\n"
         "  • identifying misconceptions\n"
         "- Ensure exactly ONE correct answer\n\n"
+        "{avoid}"
         "Return ONLY a JSON object with these exact fields:\n"
         "- 'question': A clear, specific question\n"
         "- 'options': An array of exactly 4 possible answers\n"
@@ -30,6 +31,7 @@ mcq_prompt_template = PromptTemplate(
         "}}\n\n"
         "Your response:"
     ),
+    partial_variables={"avoid": ""},
 )
 
 
@@ -45,6 +47,7 @@ fill_blank_prompt_template = PromptTemplate(
         "- Use '____' for the blank\n"
         "- The blank should test understanding, not memorization\n"
         "-  If material is minimal, infer a general principle stated or implied\n\n"
+        "{avoid}"
         "Return ONLY a JSON object with these exact fields:\n"
         "- 'question': A sentence with '____' marking where the blank should be\n"
         "- 'answer': The correct word or phrase that belongs in the blank\n\n"
@@ -55,6 +58,7 @@ fill_blank_prompt_template = PromptTemplate(
         "}}\n\n"
         "Your response:"
     ),
+    partial_variables={"avoid": ""},
 )
 
 multiple_answer_prompt_template = PromptTemplate(
@@ -70,6 +74,7 @@ multiple_answer_prompt_template = PromptTemplate(
         "- If content is short, generalize cautiously without adding new facts\n"
         "- There may be one or more correct answers\n"
         "- All correct answers must come from the options\n\n"
+        "{avoid}"
         "Return ONLY a JSON object with these exact fields:\n"
         "- 'question': A clear, specific question\n"
         "- 'options': An array of 4 or more possible answers\n"
@@ -82,6 +87,7 @@ multiple_answer_prompt_template = PromptTemplate(
         "}}\n\n"
         "Your response:"
     ),
+    partial_variables={"avoid": ""},
 )
 
 chat_prompt_template = PromptTemplate(
@@ -90,3 +96,120 @@ chat_prompt_template = PromptTemplate(
         "Avoid unnecessary elaboration or excessive detail in your responses."
     )
 )
+
+mcq_batch_prompt_template = PromptTemplate(
+    input_variables=["topic", "difficulty", "count"],
+    template=(
+        "You are an expert quiz generator.\n\n"
+        "Generate {count} distinct {difficulty} multiple-choice questions "
+        "based ONLY on the following study material.\n\n"
+        "Study material:\n"
+        "{topic}\n\n"
+        "Rules:\n"
+        "- If the study material is short or narrow, generalize thoughtfully without adding external facts\n"
+        "- Every question must test a different idea; do not rephrase an earlier question\n"
+        "- Mix angles such as application, comparison, cause-effect, scenario-based reasoning "
+        "and identifying misconceptions\n"
+        "- Each question has exactly ONE correct answer\n\n"
+        "{avoid}"
+        "Return ONLY a JSON object with a single field 'questions' holding an array of {count} objects, "
+        "each with these exact fields:\n"
+        "- 'question': A clear, specific question\n"
+        "- 'options': An array of exactly 4 possible answers\n"
+        "- 'correct_answer': One of the options that is the correct answer\n\n"
+        "Example format:\n"
+        "{{\n"
+        '    "questions": [\n'
+        "        {{\n"
+        '            "question": "What is the capital of France?",\n'
+        '            "options": ["London", "Berlin", "Paris", "Madrid"],\n'
+        '            "correct_answer": "Paris"\n'
+        "        }}\n"
+        "    ]\n"
+        "}}\n\n"
+        "Your response:"
+    ),
+    partial_variables={"avoid": ""},
+)
+
+fill_blank_batch_prompt_template = PromptTemplate(
+    input_variables=["topic", "difficulty", "count"],
+    template=(
+        "You are an expert quiz generator.\n\n"
+        "Generate {count} distinct {difficulty} fill-in-the-blank questions "
+        "based ONLY on the following study material.\n\n"
+        "Study material:\n"
+        "{topic}\n\n"
+        "Rules:\n"
+        "- Use '____' for the blank\n"
+        "- The blank should test understanding, not memorization\n"
+        "- Every question must blank out a different idea\n"
+        "- If material is minimal, infer general principles stated or implied\n\n"
+        "{avoid}"
+        "Return ONLY a JSON object with a single field 'questions' holding an array of {count} objects, "
+        "each with these exact fields:\n"
+        "- 'question': A sentence with '____' marking where the blank should be\n"
+        "- 'answer': The correct word or phrase that belongs in the blank\n\n"
+        "Example format:\n"
+        "{{\n"
+        '    "questions": [\n'
+        "        {{\n"
+        '            "question": "The capital of France is ____.",\n'
+        '            "answer": "Paris"\n'
+        "        }}\n"
+        "    ]\n"
+        "}}\n\n"
+        "Your response:"
+    ),
+    partial_variables={"avoid": ""},
+)
+
+multiple_answer_batch_prompt_template = PromptTemplate(
+    input_variables=["topic", "difficulty", "count"],
+    template=(
+        "You are an expert quiz generator.\n\n"
+        "Generate {count} distinct {difficulty} multiple-answer questions "
+        "based ONLY on the following study material.\n\n"
+        "Study material:\n"
+        "{topic}\n\n"
+        "Rules:\n"
+        "- Focus on identifying applicable concepts, properties, or outcomes\n"
+        "- If content is short, generalize cautiously without adding new facts\n"
+        "- Every question must cover a different idea\n"
+        "- Each question may have one or more correct answers\n"
+        "- All correct answers must come from the options\n\n"
+        "{avoid}"
+        "Return ONLY a JSON object with a single field 'questions' holding an array of {count} objects, "
+        "each with these exact fields:\n"
+        "- 'question': A clear, specific question\n"
+        "- 'options': An array of 4 or more possible answers\n"
+        "- 'correct_answers': An array containing 1 or more correct answers from the options\n\n"
+        "Example format:\n"
+        "{{\n"
+        '    "questions": [\n'
+        "        {{\n"
+        '            "question": "Which of the following are programming languages?",\n'
+        '            "options": ["Python", "HTML", "JavaScript", "Photoshop"],\n'
+        '            "correct_answers": ["Python", "JavaScript"]\n'
+        "        }}\n"
+        "    ]\n"
+        "}}\n\n"
+        "Your response:"
+    ),
+    partial_variables={"avoid": ""},
+)
+
+chat_summary_prompt_template = PromptTemplate(
+    input_variables=["summary", "conversation"],
+    template=(
+        "You maintain a running summary of a study conversation.\n\n"
+        "Current summary:\n"
+        "{summary}\n\n"
+        "New conversation turns:\n"
+        "{conversation}\n\n"
+        "Update the summary so it also covers the new turns. Keep the topics studied, "
+        "key facts and explanations, and open questions. Be concise and use at most "
+        "8 short bullet points.\n\n"
+        "Updated summary:"
+    ),
+)
@@ -0,0 +1,219 @@
+import os
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from src.config.settings import settings
+from src.common.logger import get_logger
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chats (
+    session_id TEXT NOT NULL,
+    chat_id TEXT NOT NULL,
+    model TEXT NOT NULL,
+    system_prompt TEXT NOT NULL,
+    summary TEXT NOT NULL DEFAULT '',
+    summarized_upto INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    last_active REAL NOT NULL,
+    PRIMARY KEY (session_id, chat_id)
+);
+CREATE INDEX IF NOT EXISTS idx_chats_last_active ON chats (last_active);
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    chat_id TEXT NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_messages_chat ON messages (session_id, chat_id, id);
+"""
+
+# chat state that is persisted next to the messages; anything else on the
+# chat (context index, metrics) is rebuilt after a reload
+PERSISTED_STATE = ("summary", "summarized_upto")
+
+_system_messages = {}
+
+
+def system_message(name: str):
+    """
+    Shared system message for a prompt name. Every chat references the same
+    dict instead of holding its own copy, and only the name is persisted.
+    """
+    if name not in _system_messages:
+        from src.prompts.templates import chat_prompt_template
+
+        prompts = {"study": chat_prompt_template.template}
+        _system_messages[name] = {"role": "system", "content": prompts[name]}
+    return _system_messages[name]
+
+
+class ChatSessionStore:
+    """
+    Chat sessions for every Streamlit session in the process. Messages are
+    written through to an append-only SQLite log as they are added, so only
+    the `max_active` most recently used chats are kept in memory; the rest are
+    reloaded from disk when they are selected again.
+    """
+
+    def __init__(self, path: str, max_active: int = 200, max_age_seconds=None):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.max_active = max_active
+        self._active = OrderedDict()
+        self.loads = 0
+        self.evictions = 0
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self.logger = get_logger(self.__class__.__name__)
+
+        if max_age_seconds:
+            self.prune(max_age_seconds)
+
+    def _remember(self, key, chat):
+        self._active[key] = chat
+        self._active.move_to_end(key)
+        while len(self._active) > self.max_active:
+            self._active.popitem(last=False)
+            self.evictions += 1
+
+    def create(self, session_id: str, chat_id: str, model: str, system_prompt="study"):
+        now = time.time()
+        chat = {
+            "session_id": session_id,
+            "chat_id": chat_id,
+            "model": model,
+            "system_prompt": system_prompt,
+            "messages": [system_message(system_prompt)],
+        }
+
+        with self._lock:
+            with self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO chats (session_id, chat_id, model, "
+                    "system_prompt, created_at, last_active) VALUES (?, ?, ?, ?, ?, ?)",
+                    (session_id, chat_id, model, system_prompt, now, now),
+                )
+            self._remember((session_id, chat_id), chat)
+        return chat
+
+    def get(self, session_id: str, chat_id: str):
+        key = (session_id, chat_id)
+        with self._lock:
+            chat = self._active.get(key)
+            if chat is None:
+                chat = self._load(session_id, chat_id)
+                if chat is None:
+                    return None
+            self._remember(key, chat)
+            return chat
+
+    def _load(self, session_id: str, chat_id: str):
+        row = self._db.execute(
+            "SELECT model, system_prompt, summary, summarized_upto FROM chats "
+            "WHERE session_id = ? AND chat_id = ?",
+            (session_id, chat_id),
+        ).fetchone()
+        if row is None:
+            return None
+
+        model, system_prompt, summary, summarized_upto = row
+        rows = self._db.execute(
+            "SELECT role, content FROM messages WHERE session_id = ? AND chat_id = ? "
+            "ORDER BY id",
+            (session_id, chat_id),
+        ).fetchall()
+
+        self.loads += 1
+        self.logger.info("Reloaded chat %s with %d messages", chat_id, len(rows))
+        return {
+            "session_id": session_id,
+            "chat_id": chat_id,
+            "model": model,
+            "system_prompt": system_prompt,
+            "messages": [system_message(system_prompt)]
+            + [{"role": role, "content": content} for role, content in rows],
+            "summary": summary,
+            "summarized_upto": summarized_upto,
+        }
+
+    def append(self, chat, message):
+        """
+        Adds a message to the chat and the log, along with any summary state
+        the context window has stored on the chat since the last message.
+        """
+        chat["messages"].append(message)
+        session_id, chat_id = chat["session_id"], chat["chat_id"]
+
+        with self._lock:
+            with self._db:
+                self._db.execute(
+                    "INSERT INTO messages (session_id, chat_id, role, content) "
+                    "VALUES (?, ?, ?, ?)",
+                    (session_id, chat_id, message["role"], message["content"]),
+                )
+                self._db.execute(
+                    "UPDATE chats SET summary = ?, summarized_upto = ?, last_active = ? "
+                    "WHERE session_id = ? AND chat_id = ?",
+                    (
+                        chat.get("summary", ""),
+                        chat.get("summarized_upto", 0),
+                        time.time(),
+                        session_id,
+                        chat_id,
+                    ),
+                )
+            self._remember((session_id, chat_id), chat)
+
+    def prune(self, max_age_seconds: float):
+        cutoff = time.time() - max_age_seconds
+        with self._lock:
+            with self._db:
+                self._db.execute(
+                    "DELETE FROM messages WHERE (session_id, chat_id) IN "
+                    "(SELECT session_id, chat_id FROM chats WHERE last_active < ?)",
+                    (cutoff,),
+                )
+                removed = self._db.execute(
+                    "DELETE FROM chats WHERE last_active < ?", (cutoff,)
+                ).rowcount
+        if removed:
+            self.logger.info("Pruned %d inactive chats", removed)
+        return removed
+
+    def stats(self):
+        with self._lock:
+            return {
+                "active": len(self._active),
+                "max_active": self.max_active,
+                "loads": self.loads,
+                "evictions": self.evictions,
+            }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_chat_store():
+    global _store
+
+    with _store_lock:
+        if _store is None:
+            _store = ChatSessionStore(
+                settings.CHAT_STORE_PATH,
+                max_active=settings.CHAT_STORE_MAX_ACTIVE,
+                max_age_seconds=settings.CHAT_STORE_MAX_AGE_SECONDS,
+            )
+        return _store
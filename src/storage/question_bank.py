@@ -0,0 +1,212 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from src.models.question_schemas import (
+    MCQQuestion,
+    FillBlankQuestion,
+    MultipleAnswerQuestion,
+)
+from src.config.settings import settings
+from src.common.logger import get_logger
+
+QUESTION_MODELS = {
+    model.__name__: model
+    for model in (MCQQuestion, FillBlankQuestion, MultipleAnswerQuestion)
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    id INTEGER PRIMARY KEY,
+    fingerprint TEXT NOT NULL UNIQUE,
+    topic TEXT NOT NULL,
+    topic_key TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    question_type TEXT NOT NULL,
+    model TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_questions_lookup
+    ON questions (topic_key, difficulty, question_type, created_at);
+CREATE INDEX IF NOT EXISTS idx_questions_model ON questions (model, created_at);
+CREATE INDEX IF NOT EXISTS idx_questions_created ON questions (created_at);
+CREATE TABLE IF NOT EXISTS seen (
+    user_id TEXT NOT NULL,
+    question_id INTEGER NOT NULL,
+    seen_at REAL NOT NULL,
+    PRIMARY KEY (user_id, question_id)
+) WITHOUT ROWID;
+"""
+
+
+def topic_key(topic: str) -> str:
+    normalized = " ".join(topic.lower().split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class QuestionBank:
+    """
+    Persistent store of generated questions in SQLite, indexed on topic,
+    difficulty, type, model and creation time, with a per-user record of the
+    questions already served.
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self.logger = get_logger(self.__class__.__name__)
+
+    @staticmethod
+    def _fingerprint(question) -> str:
+        # options are sorted, so a question served with its options shuffled
+        # maps to the same row
+        data = question.model_dump()
+        if "options" in data:
+            data["options"] = sorted(data["options"])
+        payload = f"{type(question).__name__}|{json.dumps(data, sort_keys=True)}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def add_questions(self, questions, topic: str, difficulty: str, model: str):
+        """
+        Bulk insert parsed questions. Returns the row id of every question,
+        including ones that were already in the bank.
+        """
+        now = time.time()
+        key = topic_key(topic)
+        fingerprints = [self._fingerprint(q) for q in questions]
+        rows = [
+            (
+                fingerprint,
+                topic,
+                key,
+                difficulty.lower(),
+                type(question).__name__,
+                model,
+                now,
+                question.model_dump_json(),
+            )
+            for fingerprint, question in zip(fingerprints, questions)
+        ]
+
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO questions (fingerprint, topic, topic_key, "
+                "difficulty, question_type, model, created_at, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            ids = {}
+            for start in range(0, len(fingerprints), 500):
+                chunk = fingerprints[start : start + 500]
+                ids.update(
+                    self._db.execute(
+                        "SELECT fingerprint, id FROM questions WHERE fingerprint IN "
+                        f"({', '.join('?' * len(chunk))})",
+                        chunk,
+                    ).fetchall()
+                )
+        return [ids[fingerprint] for fingerprint in fingerprints]
+
+    def sample(
+        self,
+        topic: str,
+        difficulty: str,
+        question_type: str,
+        limit: int,
+        user_id: str = None,
+        model: str = None,
+        max_age_seconds: int = None,
+    ):
+        """
+        Random questions matching the filters, skipping ones already served
+        to `user_id`. Returns (question_id, question) pairs.
+        """
+        query = (
+            "SELECT id, question_type, payload FROM questions "
+            "WHERE topic_key = ? AND difficulty = ? AND question_type = ?"
+        )
+        params = [topic_key(topic), difficulty.lower(), question_type]
+
+        if model:
+            query += " AND model = ?"
+            params.append(model)
+        if max_age_seconds:
+            query += " AND created_at > ?"
+            params.append(time.time() - max_age_seconds)
+        if user_id:
+            query += (
+                " AND NOT EXISTS (SELECT 1 FROM seen "
+                "WHERE seen.user_id = ? AND seen.question_id = questions.id)"
+            )
+            params.append(user_id)
+
+        query += " ORDER BY RANDOM() LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+
+        return [
+            (
+                question_id,
+                QUESTION_MODELS[question_type].model_validate(json.loads(payload)),
+            )
+            for question_id, question_type, payload in rows
+        ]
+
+    def mark_seen(self, user_id: str, question_ids):
+        now = time.time()
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO seen (user_id, question_id, seen_at) "
+                "VALUES (?, ?, ?)",
+                [(user_id, question_id, now) for question_id in question_ids],
+            )
+
+    def count(
+        self, topic: str = None, difficulty: str = None, question_type: str = None
+    ):
+        query = "SELECT COUNT(*) FROM questions WHERE 1 = 1"
+        params = []
+        if topic:
+            query += " AND topic_key = ?"
+            params.append(topic_key(topic))
+        if difficulty:
+            query += " AND difficulty = ?"
+            params.append(difficulty.lower())
+        if question_type:
+            query += " AND question_type = ?"
+            params.append(question_type)
+
+        with self._lock:
+            return self._db.execute(query, params).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_bank = None
+_bank_lock = threading.Lock()
+
+
+def get_question_bank():
+    global _bank
+
+    if not settings.QUESTION_BANK_ENABLED:
+        return None
+
+    with _bank_lock:
+        if _bank is None:
+            _bank = QuestionBank(settings.QUESTION_BANK_PATH)
+        return _bank
@@ -0,0 +1,296 @@
+import os
+import json
+import time
+import atexit
+import sqlite3
+import threading
+from src.config.settings import settings
+from src.common.logger import get_logger
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY,
+    quiz_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    question_type TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    model TEXT NOT NULL,
+    question_number INTEGER NOT NULL,
+    question TEXT NOT NULL,
+    user_answer TEXT,
+    correct_answer TEXT,
+    is_correct INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_attempts_quiz ON attempts (quiz_id);
+CREATE INDEX IF NOT EXISTS idx_attempts_user ON attempts (user_id, created_at);
+CREATE TABLE IF NOT EXISTS quizzes (
+    quiz_id TEXT PRIMARY KEY,
+    saved_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS topic_stats (
+    topic TEXT PRIMARY KEY,
+    answered INTEGER NOT NULL,
+    correct INTEGER NOT NULL,
+    quizzes INTEGER NOT NULL,
+    last_attempt REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS user_stats (
+    user_id TEXT PRIMARY KEY,
+    answered INTEGER NOT NULL,
+    correct INTEGER NOT NULL,
+    quizzes INTEGER NOT NULL,
+    last_attempt REAL NOT NULL
+);
+"""
+
+UPSERT_STATS = """
+INSERT INTO {table} ({column}, answered, correct, quizzes, last_attempt)
+VALUES (?, ?, ?, 1, ?)
+ON CONFLICT({column}) DO UPDATE SET
+    answered = answered + excluded.answered,
+    correct = correct + excluded.correct,
+    quizzes = quizzes + 1,
+    last_attempt = excluded.last_attempt
+"""
+
+
+class ResultsStore:
+    """
+    Append-only log of quiz attempts in a single SQLite database (WAL mode).
+    Attempts are buffered and written in batches, at the latest
+    `flush_seconds` after they were appended; per-topic and per-user
+    aggregates are updated in the same transaction so reading them never
+    rescans the log. Each quiz is recorded once. The WAL is checkpointed
+    every `compact_every` flushes.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = 50,
+        flush_seconds: float = 5.0,
+        compact_every: int = 100,
+    ):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.compact_every = compact_every
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+
+        self._buffer = []
+        self._buffered_quizzes = set()
+        self._last_flush = time.monotonic()
+        self._flushes = 0
+        self._timer = None
+        self._lock = threading.Lock()
+        self.logger = get_logger(self.__class__.__name__)
+
+    def append(
+        self,
+        quiz_id: str,
+        user_id: str,
+        results,
+        topic: str,
+        difficulty: str,
+        model: str,
+        flush: bool = False,
+    ) -> bool:
+        """
+        flush: write now instead of with the next batch, for saves the user
+        is told about. Returns False when the quiz was already recorded.
+        """
+        now = time.time()
+        rows = [
+            (
+                quiz_id,
+                user_id,
+                topic,
+                result["question_type"],
+                difficulty,
+                model,
+                result["question_number"],
+                result["question"],
+                json.dumps(result["user_answer"]),
+                json.dumps(result["correct_answer"]),
+                int(bool(result["is_correct"])),
+                now,
+            )
+            for result in results
+        ]
+
+        if not rows:
+            return False
+
+        with self._lock:
+            if quiz_id in self._buffered_quizzes or self._is_recorded(quiz_id):
+                return False
+            self._buffer.append(rows)
+            self._buffered_quizzes.add(quiz_id)
+            pending = sum(len(batch) for batch in self._buffer)
+            due = time.monotonic() - self._last_flush >= self.flush_seconds
+            if flush or pending >= self.batch_size or due:
+                self._flush_locked()
+            elif self._timer is None:
+                # nothing else may append soon, so a timer bounds the delay
+                self._timer = threading.Timer(self.flush_seconds, self._timed_flush)
+                self._timer.daemon = True
+                self._timer.start()
+        return True
+
+    def _is_recorded(self, quiz_id: str) -> bool:
+        return (
+            self._db.execute(
+                "SELECT 1 FROM quizzes WHERE quiz_id = ?", (quiz_id,)
+            ).fetchone()
+            is not None
+        )
+
+    def _timed_flush(self):
+        with self._lock:
+            self._timer = None
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._buffer:
+            return
+
+        with self._db:
+            # another process may have recorded the same quiz since append
+            fresh = [
+                rows
+                for rows in self._buffer
+                if self._db.execute(
+                    "INSERT OR IGNORE INTO quizzes (quiz_id, saved_at) VALUES (?, ?)",
+                    (rows[0][0], rows[0][11]),
+                ).rowcount
+            ]
+            self._db.executemany(
+                "INSERT INTO attempts (quiz_id, user_id, topic, question_type, "
+                "difficulty, model, question_number, question, user_answer, "
+                "correct_answer, is_correct, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [row for batch in fresh for row in batch],
+            )
+            for rows in fresh:
+                answered = len(rows)
+                correct = sum(row[10] for row in rows)
+                _, user_id, topic = rows[0][:3]
+                created_at = rows[0][11]
+                self._db.execute(
+                    UPSERT_STATS.format(table="topic_stats", column="topic"),
+                    (topic, answered, correct, created_at),
+                )
+                self._db.execute(
+                    UPSERT_STATS.format(table="user_stats", column="user_id"),
+                    (user_id, answered, correct, created_at),
+                )
+
+        self._buffer = []
+        self._buffered_quizzes.clear()
+        self._last_flush = time.monotonic()
+        self._flushes += 1
+        if self._flushes % self.compact_every == 0:
+            self._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def compact(self):
+        with self._lock:
+            self._flush_locked()
+            self._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def _aggregates(self, table: str, column: str, key=None):
+        query = (
+            f"SELECT {column}, answered, correct, quizzes, last_attempt FROM {table}"
+        )
+        params = []
+        if key is not None:
+            query += f" WHERE {column} = ?"
+            params.append(key)
+
+        with self._lock:
+            self._flush_locked()
+            rows = self._db.execute(query, params).fetchall()
+
+        return [
+            {
+                column: name,
+                "answered": answered,
+                "correct": correct,
+                "accuracy": correct / answered if answered else 0.0,
+                "quizzes": quizzes,
+                "last_attempt": last_attempt,
+            }
+            for name, answered, correct, quizzes, last_attempt in rows
+        ]
+
+    def topic_aggregates(self, topic: str = None):
+        return self._aggregates("topic_stats", "topic", topic)
+
+    def user_aggregates(self, user_id: str = None):
+        return self._aggregates("user_stats", "user_id", user_id)
+
+    def quiz_attempts(self, quiz_id: str):
+        with self._lock:
+            self._flush_locked()
+            rows = self._db.execute(
+                "SELECT question_number, question, question_type, user_answer, "
+                "correct_answer, is_correct FROM attempts WHERE quiz_id = ? "
+                "ORDER BY question_number",
+                (quiz_id,),
+            ).fetchall()
+
+        return [
+            {
+                "question_number": number,
+                "question": question,
+                "question_type": question_type,
+                "user_answer": json.loads(user_answer),
+                "correct_answer": json.loads(correct_answer),
+                "is_correct": bool(is_correct),
+            }
+            for (
+                number,
+                question,
+                question_type,
+                user_answer,
+                correct_answer,
+                is_correct,
+            ) in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._flush_locked()
+            self._db.close()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_results_store():
+    global _store
+
+    with _store_lock:
+        if _store is None:
+            _store = ResultsStore(
+                settings.RESULTS_DB_PATH,
+                batch_size=settings.RESULTS_BATCH_SIZE,
+                flush_seconds=settings.RESULTS_FLUSH_SECONDS,
+            )
+            atexit.register(_store.flush)
+        return _store
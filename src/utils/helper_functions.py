@@ -1,75 +1,152 @@
 import os
-import pandas as pd
+import uuid
 import streamlit as st
-from src.generator.question_generator import QuestionGenerator
+from typing import TYPE_CHECKING
+from src.config.settings import settings
+from src.generator.quiz_builder import QuizBuilder
+from src.grading.grader import grade_quiz
+from src.storage.results_store import get_results_store
+from src.common.logger import get_logger
 from datetime import datetime
 
+# pandas, langchain and the pydantic schemas are imported where they are used so
+# that the first page render does not pay for them
+if TYPE_CHECKING:
+    from src.generator.question_generator import QuestionGenerator
+
 
 def rerun():
     st.session_state["rerun_trigger"] = not st.session_state.get("rerun_trigger", False)
 
 
+def _turn_page(key: str, step: int):
+    st.session_state[key] = st.session_state.get(key, 0) + step
+
+
+def paginate(total: int, key: str):
+    """Renders page controls and returns the (start, end) slice to show."""
+    page_size = settings.QUIZ_PAGE_SIZE
+    if not page_size or total <= page_size:
+        return 0, total
+
+    pages = (total + page_size - 1) // page_size
+    page = min(max(st.session_state.get(key, 0), 0), pages - 1)
+    st.session_state[key] = page
+
+    previous, label, following = st.columns([1, 2, 1])
+    previous.button(
+        "◀ Previous",
+        key=f"{key}_previous",
+        disabled=page == 0,
+        on_click=_turn_page,
+        args=(key, -1),
+    )
+    label.write(f"Page {page + 1} of {pages}")
+    following.button(
+        "Next ▶",
+        key=f"{key}_next",
+        disabled=page == pages - 1,
+        on_click=_turn_page,
+        args=(key, 1),
+    )
+    return page * page_size, min(total, (page + 1) * page_size)
+
+
 class QuizManager:
 
     def __init__(self):
+        self.user_id = uuid.uuid4().hex
+        self.logger = get_logger(self.__class__.__name__)
         self.questions = []
         self.user_answers = []
         self.results = []
+        self.summary = {}
+        self.quiz_info = {}
+        self._results_df = None
 
     def generate_questions(
         self,
-        generator: QuestionGenerator,
-        topic: str,
+        generator: "QuestionGenerator",
+        topic,
         question_type: str,
         difficulty: str,
         num_questions: int,
     ):
-        self.questions = []
-        self.user_answers = []
-        self.results = []
+        """
+        topic: a single topic string, or one context string per question
+        """
+        self._start_quiz(topic, difficulty, generator.model)
 
         try:
-            for _ in range(num_questions):
-                if question_type == "Single Choice":
-                    question = generator.generate_mcq(
-                        topic=topic, difficulty=difficulty
-                    )
-                    self.questions.append(
-                        {
-                            "type": "MCQ",
-                            "question": question.question,
-                            "options": question.options,
-                            "correct_answer": question.correct_answer,
-                        }
-                    )
-                elif question_type == "Multiple Choice":
-                    question = generator.generate_multiple_answer(
-                        topic=topic, difficulty=difficulty
-                    )
-                    self.questions.append(
-                        {
-                            "type": "Multiple Answer",
-                            "question": question.question,
-                            "options": question.options,
-                            "correct_answer": question.correct_answers,
-                        }
-                    )
-                else:
-                    question = generator.generate_fill_blank(
-                        topic=topic, difficulty=difficulty
-                    )
-                    self.questions.append(
-                        {
-                            "type": "Fill in the Blank",
-                            "question": question.question,
-                            "correct_answer": question.answer,
-                        }
-                    )
+            outcomes = QuizBuilder(self.user_id).generate(
+                generator, topic, question_type, difficulty, num_questions
+            )
+        except Exception as e:
+            st.error(f"Error generating question {e}")
+            return False
 
+        questions = [
+            QuizBuilder.to_question_dict(question_type, o)
+            for o in outcomes
+            if not isinstance(o, Exception)
+        ]
+        errors = [str(o) for o in outcomes if isinstance(o, Exception)]
+        return self._load_questions(questions, errors, num_questions)
+
+    def generate_questions_remote(
+        self,
+        client,
+        model: str,
+        topic,
+        question_type: str,
+        difficulty: str,
+        num_questions: int,
+    ):
+        """Same as generate_questions, through the API service."""
+        self._start_quiz(topic, difficulty, model)
+
+        try:
+            response = client.generate_quiz(
+                model=model,
+                topic=topic,
+                question_type=question_type,
+                difficulty=difficulty,
+                count=num_questions,
+                user_id=self.user_id,
+            )
         except Exception as e:
             st.error(f"Error generating question {e}")
             return False
 
+        return self._load_questions(
+            response["questions"], response["errors"], num_questions
+        )
+
+    def _start_quiz(self, topic, difficulty: str, model: str):
+        self.questions = []
+        self.user_answers = []
+        self.results = []
+        self.summary = {}
+        self._results_df = None
+        self.quiz_info = {
+            "quiz_id": uuid.uuid4().hex,
+            "topic": topic if isinstance(topic, str) else "Chat Conversation",
+            "difficulty": difficulty,
+            "model": model,
+        }
+
+    def _load_questions(self, questions, errors, num_questions: int):
+        self.questions = questions
+
+        if errors and not self.questions:
+            st.error(f"Error generating question {errors[0]}")
+            return False
+
+        if errors:
+            st.warning(
+                f"{len(errors)} of {num_questions} questions failed to generate: {errors[0]}"
+            )
+
         return True
 
     def attempt_quiz(self):
@@ -80,81 +157,65 @@ class QuizManager:
         if "submitted" not in st.session_state:
             st.session_state.submitted = [False] * len(self.questions)
 
-        for i, q in enumerate(self.questions):
-            st.markdown(f"**Question {i+1}: {q['question']}**")
-
-            user_answer = None
-
-            if q["type"] == "MCQ":
-                user_answer = st.radio(
-                    f"Select and answer for Question {i+1}",
-                    q["options"],
-                    key=f"mcq_{i+1}",
-                    index=None,
-                )
-
-            elif q["type"] == "Multiple Answer":
-                user_answer = st.multiselect(
-                    f"Select one or more answers for Question {i+1}",
-                    q["options"],
-                    key=f"multi_{i+1}",
-                )
-
-            else:
-                user_answer = st.text_input(
-                    f"Fill in the blank for Question {i+1}", key=f"fill_blank_{i}"
-                )
-
-            # Disable submit button if already submitted
-            if st.session_state.submitted[i]:
-                st.success("Answer submitted.")
-                st.write(f"Your answer: {st.session_state.user_answers[i]}")
-                continue  # Skip showing the submit button again
-
-            submit_button = st.button(
-                f"Submit Answer for Question {i+1}", key=f"submit_{i+1}"
+        start, end = paginate(len(self.questions), "quiz_page_index")
+        for i in range(start, end):
+            self._render_question(i)
+
+    # answering a question only reruns that question's fragment
+    @st.fragment
+    def _render_question(self, i):
+        q = self.questions[i]
+        st.markdown(f"**Question {i+1}: {q['question']}**")
+
+        user_answer = None
+
+        if q["type"] == "MCQ":
+            user_answer = st.radio(
+                f"Select and answer for Question {i+1}",
+                q["options"],
+                key=f"mcq_{i+1}",
+                index=None,
+            )
+
+        elif q["type"] == "Multiple Answer":
+            user_answer = st.multiselect(
+                f"Select one or more answers for Question {i+1}",
+                q["options"],
+                key=f"multi_{i+1}",
+            )
+
+        else:
+            user_answer = st.text_input(
+                f"Fill in the blank for Question {i+1}", key=f"fill_blank_{i}"
             )
 
-            if submit_button:
-                st.session_state.user_answers[i] = user_answer
-                st.session_state.submitted[i] = True
-                st.success("Answer submitted.")
+        # Disable submit button if already submitted
+        if st.session_state.submitted[i]:
+            st.success("Answer submitted.")
+            st.write(f"Your answer: {st.session_state.user_answers[i]}")
+            return  # Skip showing the submit button again
+
+        submit_button = st.button(
+            f"Submit Answer for Question {i+1}", key=f"submit_{i+1}"
+        )
+
+        if submit_button:
+            st.session_state.user_answers[i] = user_answer
+            st.session_state.submitted[i] = True
+            st.success("Answer submitted.")
 
     def evaluate_quiz(self):
 
         self.results = []
+        self.summary = {}
+        self._results_df = None
         user_answers = st.session_state.get("user_answers", [])
         if not user_answers or len(user_answers) < len(self.questions):
             st.warning("Please answer all questions before submitting.")
             return
 
-        for i, (q, user_ans) in enumerate(zip(self.questions, user_answers)):
-            result_dict = {
-                "question_number": i + 1,
-                "question": q["question"],
-                "question_type": q["type"],
-                "user_answer": user_ans,
-                "correct_answer": q["correct_answer"],
-                "is_correct": False,
-            }
-
-            if q["type"] == "MCQ":
-                result_dict["options"] = q["options"]
-                result_dict["is_correct"] = user_ans == q["correct_answer"]
-
-            elif q["type"] == "Multiple Answer":
-                result_dict["options"] = q["options"]
-                correct_set = set(q["correct_answer"])
-                user_set = set(user_ans)
-                result_dict["is_correct"] = user_set == correct_set
-
-            else:
-                result_dict["options"] = []
-                result_dict["is_correct"] = (
-                    user_ans.strip().lower() == q["correct_answer"].strip().lower()
-                )
-
-            self.results.append(result_dict)
+        self.results, self.summary = grade_quiz(self.questions, user_answers)
+
         if "user_answers" in st.session_state:
             del st.session_state["user_answers"]
 
@@ -162,11 +223,15 @@ class QuizManager:
             del st.session_state["submitted"]
 
     def generate_result_dataframe(self):
+        import pandas as pd
 
         if not self.results:
             return pd.DataFrame()
 
-        return pd.DataFrame(self.results)
+        # built once per submission, evaluate_quiz clears it
+        if self._results_df is None:
+            self._results_df = pd.DataFrame(self.results)
+        return self._results_df
 
     def chat_to_context(self, messages):
         lines = []
@@ -180,6 +245,36 @@ class QuizManager:
         roles = {msg["role"] for msg in messages}
         return "user" in roles and "assistant" in roles
 
+    def save_results(self):
+
+        if not self.results:
+            st.warning("No results to save!!")
+            return None
+
+        try:
+            # written before reporting success; a second click is a no-op
+            saved = get_results_store().append(
+                quiz_id=self.quiz_info.get("quiz_id", uuid.uuid4().hex),
+                user_id=self.user_id,
+                results=self.results,
+                topic=self.quiz_info.get("topic", ""),
+                difficulty=self.quiz_info.get("difficulty", ""),
+                model=self.quiz_info.get("model", ""),
+                flush=True,
+            )
+            if not saved:
+                st.info("These results are already saved.")
+                return self.quiz_info.get("quiz_id")
+            st.success("Results saved sucesfully....")
+            return self.quiz_info.get("quiz_id")
+
+        except Exception as e:
+            st.error(f"Failed to save results {e}")
+            return None
+
+    def export_csv(self):
+        return self.generate_result_dataframe().to_csv(index=False).encode("utf-8")
+
     def save_to_csv(self, filename_prefix="quiz_results"):
 
         if not self.results: